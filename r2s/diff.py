@@ -0,0 +1,36 @@
+from dataclasses import dataclass, field
+from typing import Dict, Generic, List, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Changes(Generic[T]):
+    """Rows added, changed and removed between two snapshots, by row key."""
+
+    added: Dict[str, T] = field(default_factory=dict)
+    changed: Dict[str, T] = field(default_factory=dict)
+    removed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+class SnapshotDiff(Generic[T]):
+    """Remembers the last snapshot a watcher posted and diffs new ones."""
+
+    def __init__(self) -> None:
+        self.previous: Dict[str, T] = {}
+
+    def update(self, current: Dict[str, T]) -> Changes[T]:
+        added: Dict[str, T] = {}
+        changed: Dict[str, T] = {}
+        for key, value in current.items():
+            old = self.previous.get(key)
+            if old is None:
+                added[key] = value
+            elif old != value:
+                changed[key] = value
+        removed = [key for key in self.previous if key not in current]
+        self.previous = current
+        return Changes(added=added, changed=changed, removed=removed)
@@ -1,9 +1,38 @@
-from r2s.ui import UI 
+from argparse import ArgumentParser
+
+from r2s.startup import StartupProfile
 
 
 def main(*args, **kwargs):
-    app = UI()
+    startup = StartupProfile()
+    parser = ArgumentParser(prog="r2s", description="A TUI for ROS 2")
+    parser.add_argument(
+        "--workspace",
+        help="colcon workspace to show packages of "
+        "(default: $R2S_WORKSPACE or the current directory)",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="start up, print how long each step took and exit",
+    )
+    options = parser.parse_args()
+
+    # Imported here so --help does not wait for textual to load.
+    import textual.app
+
+    startup.mark("import textual")
+    from r2s.ui import UI
+
+    startup.mark("import r2s.ui")
+    app = UI(
+        workspace=options.workspace,
+        startup=startup if options.profile_startup else None,
+    )
+    startup.mark("app created")
     app.run()
+    if options.profile_startup:
+        startup.report()
 
 
 if __name__ == "__main__":
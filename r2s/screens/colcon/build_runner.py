@@ -0,0 +1,338 @@
+import asyncio
+import os
+import re
+import signal
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Tuple
+
+from textual import log, work
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.containers import Horizontal
+from textual.reactive import reactive
+from textual.screen import Screen
+from textual.widgets import ContentSwitcher, Footer
+
+from r2s.diff import Changes
+from r2s.screens.colcon.build_state import Duration
+from r2s.widgets import DataGrid, Header, LogView
+from r2s.widgets.data_grid.virtual_table import VirtualTable
+from r2s.widgets.log_view.log_lines import LogLines
+from r2s.widgets.log_view.store import LineStore
+
+# colcon's console_start_end event handler reports jobs like these.
+JOB_LINE = re.compile(r"^(Starting >>>|Finished <<<|Failed +<<<|Aborted +<<<) (\S+)")
+
+# Bytes read from a pipe or log file at a time.
+READ_SIZE = 256 * 1024
+
+
+@dataclass(frozen=True)
+class BuildJob:
+    name: str
+    status: str = "queued"
+    started: float | None = None
+    duration: Duration | None = None
+    lines: int = 0
+
+
+class LineBuffer:
+    """Splits a byte stream into lines, holding on to a partial last line.
+
+    A line longer than `limit` is cut, so a stream without newlines cannot
+    grow the buffer without bound.
+    """
+
+    def __init__(self, limit: int = 64 * 1024) -> None:
+        self.limit = limit
+        self.partial = b""
+
+    def feed(self, data: bytes) -> List[str]:
+        lines = (self.partial + data).replace(b"\r\n", b"\n").split(b"\n")
+        self.partial = lines.pop()
+        if len(self.partial) > self.limit:
+            lines.append(self.partial)
+            self.partial = b""
+        return [line.decode("utf-8", "replace") for line in lines]
+
+    def flush(self) -> List[str]:
+        partial, self.partial = self.partial, b""
+        return [partial.decode("utf-8", "replace")] if partial else []
+
+
+class BuildJobGrid(DataGrid):
+    title: reactive[str] = reactive("Jobs")
+
+    def columns(self):
+        return ["Package", "Status", "Time", "Lines"]
+
+    def row_values(self, job: BuildJob) -> Tuple:
+        duration = job.duration
+        if duration is None and job.started is not None:
+            duration = Duration(round(time.monotonic() - job.started, 1))
+        return (job.name, job.status, duration or "", job.lines)
+
+
+class BuildRunnerScreen(Screen):
+    """Runs `colcon <verb>` for some packages and shows its progress.
+
+    colcon's own output is read from a pipe and drives the job list. The
+    output of each package is tailed from its log file in colcon's log
+    directory. Lines are queued and handed to the log views at most every
+    `flush_interval` seconds, and each view keeps a bounded store, so
+    verbose parallel jobs cannot stall the event loop or exhaust memory.
+
+    Leaving the screen stops colcon, so while it runs, going back has to be
+    confirmed by pressing esc again within `confirm_timeout` seconds.
+    """
+
+    DEFAULT_CSS = """
+    BuildRunnerScreen BuildJobGrid {
+        width: 50;
+    }
+    BuildRunnerScreen ContentSwitcher {
+        width: 1fr;
+    }
+    """
+
+    BINDINGS = [
+        Binding("escape", "back", "Back", key_display="esc"),
+        Binding("a", "show_output('all')", "All Output"),
+        Binding("x", "stop", "Stop"),
+    ]
+
+    flush_interval: float = 0.1
+    poll_interval: float = 0.1
+    max_pending: int = 20_000
+    stop_timeout: float = 5.0
+    confirm_timeout: float = 3.0
+    memory_limit: int = 4 * 1024 * 1024
+
+    def __init__(self, workspace: Path, verb: str, packages: List[str]) -> None:
+        self.workspace = workspace
+        self.verb = verb
+        self.packages = packages
+        self.jobs: Dict[str, BuildJob] = {
+            name: BuildJob(name) for name in sorted(packages)
+        }
+        self.stores: Dict[str, LineStore] = {}
+        self.pending: Dict[str, List[str]] = {}
+        self.dropped: Dict[str, int] = {}
+        self.process: asyncio.subprocess.Process | None = None
+        self.finished = asyncio.Event()
+        self.back_requested: float | None = None
+        super().__init__()
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        with Horizontal():
+            yield BuildJobGrid()
+            with ContentSwitcher(initial="all"):
+                yield LogView(id="all", store=self.store("all"))
+        yield Footer()
+
+    def on_mount(self) -> None:
+        grid = self.query_one(BuildJobGrid)
+        grid.apply_changes(Changes(added=dict(self.jobs)))
+        self.set_interval(self.flush_interval, self.flush)
+        self.set_interval(1.0, self.tick)
+        self.run_colcon()
+
+    async def on_unmount(self) -> None:
+        await self.stop_colcon()
+        for store in self.stores.values():
+            store.close()
+
+    async def stop_colcon(self) -> None:
+        """Interrupt colcon, and terminate it if it does not exit in time."""
+        process = self.process
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            if process is None or process.returncode is not None:
+                return
+            self.signal_colcon(sig)
+            try:
+                await asyncio.wait_for(process.wait(), self.stop_timeout)
+            except asyncio.TimeoutError:
+                log.warning(f"colcon did not exit on {sig.name}")
+
+    def store(self, name: str) -> LineStore:
+        """The lines of a package, or of colcon itself for "all"."""
+        if name not in self.stores:
+            self.stores[name] = LineStore(memory_limit=self.memory_limit)
+        return self.stores[name]
+
+    def command(self) -> List[str]:
+        return ["colcon", self.verb, "--packages-select", *self.packages]
+
+    def emit(self, target: str, lines: List[str]) -> None:
+        """Queue lines for a log view, dropping the oldest beyond a limit."""
+        if not lines:
+            return
+        pending = self.pending.setdefault(target, [])
+        pending.extend(lines)
+        if len(pending) > self.max_pending:
+            excess = len(pending) - self.max_pending
+            del pending[:excess]
+            self.dropped[target] = self.dropped.get(target, 0) + excess
+        job = self.jobs.get(target)
+        if job is not None:
+            self.jobs[target] = replace(job, lines=job.lines + len(lines))
+
+    def flush(self) -> None:
+        pending, self.pending = self.pending, {}
+        for target, lines in pending.items():
+            dropped = self.dropped.pop(target, 0)
+            if dropped:
+                lines.insert(0, f"[r2s] {dropped} lines dropped")
+            views = self.query(f"#{self.view_id(target)} LogLines")
+            if views:
+                views.first(LogLines).extend(lines)
+            else:
+                self.store(target).extend(lines)
+
+    def tick(self) -> None:
+        """Update the times and line counts of the jobs."""
+        grid = self.query_one(BuildJobGrid)
+        changed = {
+            name: job for name, job in self.jobs.items() if grid.records[name] != job
+        }
+        changed.update(
+            (name, job) for name, job in self.jobs.items() if job.status == "building"
+        )
+        if changed:
+            grid.apply_changes(Changes(changed=changed))
+        done = sum(job.status in ("finished", "failed") for job in self.jobs.values())
+        grid.filter = f"{self.verb} {done}/{len(self.jobs)}"
+
+    @staticmethod
+    def view_id(name: str) -> str:
+        return "all" if name == "all" else "package-" + re.sub(r"\W", "_", name)
+
+    def action_show_output(self, name: str) -> None:
+        view_id = self.view_id(name)
+        switcher = self.query_one(ContentSwitcher)
+        if not switcher.query(f"#{view_id}"):
+            switcher.mount(LogView(id=view_id, store=self.store(name)))
+        switcher.current = view_id
+
+    def on_virtual_table_row_selected(self, message: VirtualTable.RowSelected) -> None:
+        message.stop()
+        self.action_show_output(message.row_key)
+
+    def running(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    def action_back(self) -> None:
+        requested, self.back_requested = self.back_requested, time.monotonic()
+        if self.running() and (
+            requested is None or time.monotonic() - requested > self.confirm_timeout
+        ):
+            self.notify(f"colcon {self.verb} is running; press esc again to stop it")
+            return
+        self.app.pop_screen()
+
+    def action_stop(self) -> None:
+        # colcon cleans up after its jobs on SIGINT.
+        self.signal_colcon(signal.SIGINT)
+
+    def signal_colcon(self, sig: signal.Signals) -> None:
+        """Send a signal to colcon's session, which includes its jobs."""
+        process = self.process
+        if process is not None and process.returncode is None:
+            try:
+                os.killpg(process.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def update_job(self, name: str, **changes) -> None:
+        job = self.jobs.get(name)
+        if job is None:
+            job = self.jobs[name] = BuildJob(name)
+            self.query_one(BuildJobGrid).apply_changes(Changes(added={name: job}))
+        self.jobs[name] = replace(job, **changes)
+
+    @work(exclusive=True, group="colcon")
+    async def run_colcon(self) -> None:
+        command = self.command()
+        self.emit("all", ["$ " + " ".join(command)])
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                *command,
+                cwd=self.workspace,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                env=dict(os.environ, PYTHONUNBUFFERED="1"),
+                start_new_session=True,
+            )
+        except OSError as ex:
+            self.emit("all", [f"Cannot run colcon: {ex}"])
+            return
+        buffer = LineBuffer()
+        tails = []
+        while data := await self.process.stdout.read(READ_SIZE):
+            lines = buffer.feed(data)
+            self.emit("all", lines)
+            for line in lines:
+                match = JOB_LINE.match(line)
+                if match is None:
+                    continue
+                event, name = match.groups()
+                if event.startswith("Starting"):
+                    self.update_job(name, status="building", started=time.monotonic())
+                    tails.append(asyncio.create_task(self.tail(name)))
+                    continue
+                job = self.jobs.get(name)
+                started = job.started if job is not None else None
+                duration = None
+                if started is not None:
+                    duration = Duration(round(time.monotonic() - started, 1))
+                status = "finished" if event.startswith("Finished") else "failed"
+                self.update_job(name, status=status, duration=duration)
+        self.emit("all", buffer.flush())
+        returncode = await self.process.wait()
+        self.finished.set()
+        await asyncio.gather(*tails, return_exceptions=True)
+        self.emit("all", [f"colcon {self.verb} exited with {returncode}"])
+        for name, job in self.jobs.items():
+            if job.status in ("queued", "building"):
+                status = "skipped" if job.status == "queued" else "aborted"
+                self.update_job(name, status=status)
+
+    @staticmethod
+    def open_log(path: Path) -> BinaryIO | None:
+        try:
+            return open(path, "rb")
+        except OSError:
+            return None
+
+    async def tail(self, name: str) -> None:
+        """Stream the output of a package from its colcon log file.
+
+        The file is opened once and read in a thread, so a slow disk holds
+        up only this package's output, not the event loop.
+        """
+        log_dir = self.workspace / "log" / f"latest_{self.verb}"
+        path = log_dir / name / "stdout_stderr.log"
+        buffer = LineBuffer()
+        output = None
+        try:
+            while True:
+                done = self.finished.is_set() or self.jobs[name].status != "building"
+                if output is None:
+                    # colcon may not have created the file yet.
+                    output = await asyncio.to_thread(self.open_log, path)
+                data = b""
+                if output is not None:
+                    data = await asyncio.to_thread(output.read, READ_SIZE)
+                self.emit(name, buffer.feed(data))
+                if len(data) < READ_SIZE:
+                    if done:
+                        break
+                    await asyncio.sleep(self.poll_interval)
+        finally:
+            if output is not None:
+                output.close()
+        self.emit(name, buffer.flush())
@@ -0,0 +1,158 @@
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, Tuple
+
+# Job events in a colcon events.log, e.g.
+# [12.345678] (my_package) JobEnded: {'identifier': 'my_package', 'rc': 0}
+JOB_EVENT = re.compile(
+    r"^\[(?P<time>[\d.]+)\] \((?P<name>[^)]+)\) (?P<event>JobStarted|JobEnded): "
+    r"(?P<data>.*)$"
+)
+RETURN_CODE = re.compile(r"'rc': (?P<rc>[^,}]+)")
+
+
+@dataclass(frozen=True, order=True)
+class Duration:
+    """A time span that sorts by length and prints like 1m 05.2s."""
+
+    seconds: float
+
+    def __str__(self) -> str:
+        minutes, seconds = divmod(self.seconds, 60)
+        if minutes:
+            return f"{minutes:.0f}m {seconds:04.1f}s"
+        return f"{seconds:.1f}s"
+
+
+@dataclass(frozen=True)
+class BuildState:
+    status: str = ""
+    duration: Duration | None = None
+
+
+class BuildLog:
+    """The job events of the latest colcon build, read incrementally.
+
+    events.log also records every line of build output, so it can grow to
+    many megabytes during a build. Only the bytes appended since the last
+    read are parsed, unless the file was replaced by a new build.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._reset(None)
+
+    def _reset(self, file_id: Tuple[int, int] | None) -> None:
+        self._file_id = file_id
+        self._offset = 0
+        self._partial = b""
+        self.started: Dict[str, float] = {}
+        self.ended: Dict[str, Tuple[float, str]] = {}
+
+    def update(self) -> bool:
+        """Read new events, returning True if the state may have changed."""
+        try:
+            stat = self.path.stat()
+        except OSError:
+            if self._file_id is None:
+                return False
+            self._reset(None)
+            return True
+        file_id = (stat.st_dev, stat.st_ino)
+        replaced = file_id != self._file_id or stat.st_size < self._offset
+        if replaced:
+            self._reset(file_id)
+        if stat.st_size == self._offset:
+            return replaced
+        try:
+            with open(self.path, "rb") as events:
+                events.seek(self._offset)
+                data = events.read(stat.st_size - self._offset)
+        except OSError:
+            return replaced
+        self._offset += len(data)
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        for line in lines:
+            if b") Job" in line:
+                self._parse(line.decode("utf-8", "replace"))
+        return True
+
+    def _parse(self, line: str) -> None:
+        match = JOB_EVENT.match(line)
+        if match is None:
+            return
+        name, time = match["name"], float(match["time"])
+        if match["event"] == "JobStarted":
+            self.started[name] = time
+            self.ended.pop(name, None)
+        else:
+            rc = RETURN_CODE.search(match["data"])
+            self.ended[name] = (time, rc["rc"].strip() if rc else "0")
+
+
+@dataclass
+class Listing:
+    """The entries of a directory, read again only when its mtime changes."""
+
+    path: Path
+    mtime_ns: int | None = None
+    names: FrozenSet[str] = field(default_factory=frozenset)
+
+    def update(self) -> bool:
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns == self.mtime_ns:
+            return False
+        self.mtime_ns = mtime_ns
+        try:
+            names = frozenset(entry.name for entry in os.scandir(self.path))
+        except OSError:
+            names = frozenset()
+        changed = names != self.names
+        self.names = names
+        return changed
+
+
+class BuildStates:
+    """Build status and last build duration of the packages of a workspace.
+
+    A package is installed if it has a directory in install/ (isolated) or
+    install/share/ (merged), built if it only has one in build/, and building
+    or failed according to the latest build's events.log.
+    """
+
+    def __init__(self, workspace: Path) -> None:
+        self.log = BuildLog(workspace / "log" / "latest_build" / "events.log")
+        self.build = Listing(workspace / "build")
+        self.install = Listing(workspace / "install")
+        self.install_share = Listing(workspace / "install" / "share")
+
+    def update(self) -> bool:
+        """Check the workspace, returning True if any state may have changed."""
+        changed = self.log.update()
+        for listing in (self.build, self.install, self.install_share):
+            changed = listing.update() or changed
+        return changed
+
+    def state(self, name: str) -> BuildState:
+        duration = None
+        started = self.log.started.get(name)
+        ended = self.log.ended.get(name)
+        if started is not None and ended is not None:
+            duration = Duration(round(ended[0] - started, 1))
+        if started is not None and ended is None:
+            status = "building"
+        elif ended is not None and ended[1] != "0":
+            status = "failed"
+        elif name in self.install.names or name in self.install_share.names:
+            status = "installed"
+        elif name in self.build.names:
+            status = "built"
+        else:
+            status = ""
+        return BuildState(status, duration)
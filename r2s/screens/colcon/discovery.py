@@ -0,0 +1,297 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+# Keep this module free of textual imports, so pool workers start quickly.
+
+# Manifests in the order colcon identifies packages by.
+MANIFESTS = ("package.xml", "setup.cfg", "setup.py", "CMakeLists.txt")
+IGNORE_MARKERS = ("COLCON_IGNORE", "AMENT_IGNORE", "CATKIN_IGNORE")
+DEPEND_TAGS = (
+    "depend",
+    "build_depend",
+    "buildtool_depend",
+    "build_export_depend",
+    "buildtool_export_depend",
+    "exec_depend",
+    "run_depend",
+    "test_depend",
+)
+
+CACHE_VERSION = 2
+
+# Below this many changed manifests, starting a pool costs more than it saves.
+POOL_THRESHOLD = 32
+
+
+@dataclass(frozen=True)
+class Package:
+    name: str
+    path: Path
+    type: str
+    version: str | None
+    dependencies: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class Stamp:
+    """What a cached manifest is keyed by, besides its path."""
+
+    mtime_ns: int
+    size: int
+
+
+def workspace_root(path: str | None = None) -> Path:
+    """The workspace to show: `path`, else $R2S_WORKSPACE, else the cwd."""
+    path = path or os.environ.get("R2S_WORKSPACE") or os.getcwd()
+    return Path(path).expanduser().resolve()
+
+
+def source_root(workspace: Path) -> Path:
+    """The directory to crawl for packages; `src` if the workspace has one."""
+    src = workspace / "src"
+    return src if src.is_dir() else workspace
+
+
+def find_manifests(root: Path, visited: List[Path] | None = None) -> Iterator[Path]:
+    """The manifest identifying each package under `root`.
+
+    Like colcon, a directory that is a package is not searched further, and
+    directories with an ignore marker or a leading dot are skipped. The
+    directories searched are added to `visited`, if given.
+    """
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return
+    if visited is not None:
+        visited.append(root)
+    names = {entry.name for entry in entries}
+    if names.intersection(IGNORE_MARKERS):
+        return
+    for manifest in MANIFESTS:
+        if manifest in names:
+            yield root / manifest
+            return
+    for entry in sorted(entries, key=lambda entry: entry.name):
+        if entry.name.startswith(".") or not entry.is_dir(follow_symlinks=True):
+            continue
+        yield from find_manifests(Path(entry.path), visited)
+
+
+def stamp(manifest: Path) -> Stamp | None:
+    try:
+        stat = manifest.stat()
+    except OSError:
+        return None
+    return Stamp(stat.st_mtime_ns, stat.st_size)
+
+
+def parse_manifest(manifest: Path) -> Package | None:
+    """Identify the package a manifest describes, or None if it is not one."""
+    try:
+        if manifest.name == "package.xml":
+            return _parse_package_xml(manifest)
+        text = manifest.read_text(errors="replace")
+    except (OSError, ET.ParseError):
+        return None
+    if manifest.name == "CMakeLists.txt":
+        match = re.search(r"^\s*project\s*\(\s*([\w.+-]+)", text, re.M | re.I)
+        name, kind = match and match.group(1), "cmake"
+    elif manifest.name == "setup.py":
+        name, kind = _setup_py_name(text, manifest.parent.name), "python"
+    else:
+        match = re.search(r"^\s*name\s*[=:]\s*([\w.-]+)", text, re.M)
+        name, kind = match and match.group(1), "python"
+    if name is None:
+        return None
+    return Package(name=name, path=manifest.parent, type=kind, version=None)
+
+
+def _setup_py_name(text: str, default: str) -> str | None:
+    """The `name` passed to `setup()`, without running the script.
+
+    A name given as a variable, as in `name=package_name`, is looked up in
+    the variable's assignment, else taken to be the directory's name.
+    """
+    match = re.search(r"""\bname\s*=\s*(?:(['"])([\w.-]+)\1|([A-Za-z_]\w*))""", text)
+    if match is None:
+        return None
+    if match.group(2):
+        return match.group(2)
+    variable = re.escape(match.group(3))
+    match = re.search(rf"""^\s*{variable}\s*=\s*(['"])([\w.-]+)\1""", text, re.M)
+    return match.group(2) if match else default
+
+
+def _parse_package_xml(manifest: Path) -> Package | None:
+    root = ET.parse(manifest).getroot()
+    name = root.findtext("name")
+    if not name:
+        return None
+    build_type = root.findtext("export/build_type") or "catkin"
+    dependencies = {
+        element.text.strip()
+        for tag in DEPEND_TAGS
+        for element in root.iter(tag)
+        if element.text and element.text.strip()
+    }
+    return Package(
+        name=name.strip(),
+        path=manifest.parent,
+        type=f"ros.{build_type.strip()}",
+        version=(root.findtext("version") or "").strip() or None,
+        dependencies=tuple(sorted(dependencies)),
+    )
+
+
+POOL_WORKERS = min(8, os.cpu_count() or 1)
+
+_pool: ProcessPoolExecutor | None = None
+_pool_failed = False
+_pool_lock = threading.Lock()
+
+
+def parse_pool() -> ProcessPoolExecutor | None:
+    """The pool manifests are parsed on, started on first use and kept.
+
+    Spawning the workers is the costly part, so one pool serves every parse
+    of the session. There is none on a single CPU, where it cannot help, or
+    once the workers failed to start.
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is None and POOL_WORKERS > 1 and not _pool_failed:
+            # Forking a process with running threads is unsafe, so spawn workers.
+            context = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(POOL_WORKERS, mp_context=context)
+        return _pool
+
+
+def close_parse_pool() -> None:
+    """Stop the workers of the parse pool, if it was started."""
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def parse_manifests(manifests: List[Path]) -> List[Package | None]:
+    """Parse manifests, spreading them over a process pool if there are many."""
+    global _pool_failed
+
+    pool = parse_pool() if len(manifests) >= POOL_THRESHOLD else None
+    if pool is not None:
+        chunksize = max(1, len(manifests) // (4 * POOL_WORKERS))
+        try:
+            return list(pool.map(parse_manifest, manifests, chunksize=chunksize))
+        except (OSError, RuntimeError, BrokenProcessPool):
+            # E.g. the main module cannot be imported again by the workers.
+            _pool_failed = True
+            close_parse_pool()
+    return [parse_manifest(manifest) for manifest in manifests]
+
+
+def default_cache_path(workspace: Path) -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    digest = hashlib.sha1(str(workspace).encode()).hexdigest()[:16]
+    return Path(cache_home) / "r2s" / f"packages-{digest}.json"
+
+
+class PackageCache:
+    """Parsed manifests of one workspace, persisted between runs.
+
+    Entries are keyed by manifest path and checked against its size and
+    modification time, so a warm start only stats the manifests and parses
+    the ones that changed.
+    """
+
+    def __init__(self, workspace: Path, path: Path | None = None) -> None:
+        self.workspace = workspace
+        self.path = path or default_cache_path(workspace)
+        self.entries: Dict[Path, Tuple[Stamp, Package | None]] = {}
+        self.dirty = False
+        self.load()
+
+    def load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") != CACHE_VERSION:
+            return
+        for manifest, entry in data.get("manifests", {}).items():
+            package = entry["package"]
+            if package is not None:
+                package = Package(
+                    name=package["name"],
+                    path=Path(package["path"]),
+                    type=package["type"],
+                    version=package["version"],
+                    dependencies=tuple(package["dependencies"]),
+                )
+            self.entries[Path(manifest)] = (Stamp(*entry["stamp"]), package)
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        manifests = {}
+        for manifest, (key, package) in self.entries.items():
+            if package is not None:
+                package = dict(asdict(package), path=str(package.path))
+            manifests[str(manifest)] = {
+                "stamp": [key.mtime_ns, key.size],
+                "package": package,
+            }
+        data = {"version": CACHE_VERSION, "manifests": manifests}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            partial = self.path.with_suffix(f".{os.getpid()}.tmp")
+            partial.write_text(json.dumps(data))
+            os.replace(partial, self.path)
+        except OSError:
+            return
+        self.dirty = False
+
+    def packages(self, manifests: List[Path]) -> List[Package]:
+        """The packages of the given manifests, parsing only changed ones."""
+        stamps = {
+            manifest: key
+            for manifest in manifests
+            if (key := stamp(manifest)) is not None
+        }
+        stale = [
+            manifest
+            for manifest, key in stamps.items()
+            if manifest not in self.entries or self.entries[manifest][0] != key
+        ]
+        for manifest, package in zip(stale, parse_manifests(stale)):
+            self.entries[manifest] = (stamps[manifest], package)
+        forgotten = self.entries.keys() - stamps.keys()
+        for manifest in forgotten:
+            del self.entries[manifest]
+        self.dirty |= bool(stale or forgotten)
+        return [
+            package
+            for manifest in stamps
+            if (package := self.entries[manifest][1]) is not None
+        ]
+
+    def discover(self, visited: List[Path] | None = None) -> List[Package]:
+        """Crawl the workspace and return its packages."""
+        manifests = list(find_manifests(source_root(self.workspace), visited))
+        packages = self.packages(manifests)
+        self.save()
+        return packages
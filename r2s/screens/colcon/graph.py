@@ -0,0 +1,98 @@
+from typing import Dict, Iterable, List, Tuple
+
+from r2s.screens.colcon.discovery import Package
+
+
+def bits(mask: int) -> Iterable[int]:
+    """The indexes of the set bits of `mask`."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class PackageGraph:
+    """The dependency DAG of the packages of a workspace, precomputed.
+
+    Packages are sorted topologically once, and the transitive closure of
+    both dependencies and dependents is kept as one integer bitset per
+    package, indexed by topological position. Asking which packages rebuild
+    after touching one is then a single lookup. Dependencies on packages
+    outside the workspace are ignored. Packages in a dependency cycle are
+    placed after all others and get no depth.
+    """
+
+    def __init__(self, packages: Iterable[Package]) -> None:
+        packages = {package.name: package for package in packages}
+        direct = {
+            name: sorted(
+                {dep for dep in package.dependencies if dep in packages} - {name}
+            )
+            for name, package in packages.items()
+        }
+        self.order, self.acyclic = self._sort(direct)
+        self.index = {name: i for i, name in enumerate(self.order)}
+        self.depth: Dict[str, int | None] = {}
+        self.dependencies: List[int] = [0] * len(self.order)
+        self.dependents: List[int] = [0] * len(self.order)
+
+        for i, name in enumerate(self.order):
+            closure = 0
+            depth = 0
+            for dep in direct[name]:
+                j = self.index[dep]
+                closure |= self.dependencies[j] | (1 << j)
+                if depth is not None:
+                    dep_depth = self.depth.get(dep)
+                    depth = None if dep_depth is None else max(depth, dep_depth + 1)
+            self.dependencies[i] = closure
+            self.depth[name] = depth if i < self.acyclic else None
+        for i in range(len(self.order) - 1, -1, -1):
+            for j in bits(self.dependencies[i]):
+                self.dependents[j] |= 1 << i
+
+    @staticmethod
+    def _sort(direct: Dict[str, List[str]]) -> Tuple[List[str], int]:
+        """Kahn's algorithm, by name among packages that are ready together.
+
+        Returns the order and how many packages are not in a cycle.
+        """
+        remaining = {name: len(deps) for name, deps in direct.items()}
+        users: Dict[str, List[str]] = {name: [] for name in direct}
+        for name, deps in direct.items():
+            for dep in deps:
+                users[dep].append(name)
+        ready = sorted(name for name, count in remaining.items() if count == 0)
+        order: List[str] = []
+        while ready:
+            order.extend(ready)
+            released = []
+            for name in ready:
+                for user in users[name]:
+                    remaining[user] -= 1
+                    if remaining[user] == 0:
+                        released.append(user)
+            ready = sorted(released)
+        cyclic = sorted(name for name, count in remaining.items() if count > 0)
+        return order + cyclic, len(order)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def names(self, mask: int) -> List[str]:
+        return [self.order[i] for i in bits(mask)]
+
+    def dependents_of(self, name: str) -> List[str]:
+        """Every package that depends on `name`, directly or not."""
+        return self.names(self.dependents[self.index[name]])
+
+    def dependencies_of(self, name: str) -> List[str]:
+        """Every package `name` depends on, directly or not."""
+        return self.names(self.dependencies[self.index[name]])
+
+    def rebuild_set(self, name: str) -> List[str]:
+        """The packages to rebuild after changing `name`, in build order."""
+        return self.names(self.dependents[self.index[name]] | 1 << self.index[name])
+
+    def dependent_count(self, name: str) -> int:
+        return self.dependents[self.index[name]].bit_count()
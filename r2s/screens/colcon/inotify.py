@@ -0,0 +1,121 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+# Changes to the entries of a directory, but not to the contents of files
+# being written, which would flood the queue during edits.
+DIRECTORY_EVENTS = (
+    IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+
+EVENT = struct.Struct("iIII")
+
+
+class InotifyError(OSError):
+    pass
+
+
+def _libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class Inotify:
+    """Directory watches through the Linux inotify API, by way of ctypes.
+
+    The descriptor is non-blocking: `read` returns the events queued since
+    the last call, as (directory, name, mask) tuples. Raises `InotifyError`
+    if inotify is not available or a watch cannot be added, e.g. because
+    fs.inotify.max_user_watches was reached.
+    """
+
+    def __init__(self, mask: int = DIRECTORY_EVENTS) -> None:
+        self.mask = mask | IN_ONLYDIR
+        self.libc = _libc()
+        if self.libc is None:
+            raise InotifyError("inotify is not available")
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            self._raise("inotify_init1")
+        self.watches: Dict[int, Path] = {}
+        self.paths: Dict[Path, int] = {}
+
+    def _raise(self, call: str, path: Path | None = None):
+        code = ctypes.get_errno()
+        raise InotifyError(code, f"{call}: {os.strerror(code)}", path)
+
+    def add(self, paths: Iterable[Path]) -> None:
+        for path in paths:
+            if path in self.paths:
+                continue
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.mask)
+            if wd < 0:
+                if ctypes.get_errno() in (errno.ENOENT, errno.ENOTDIR):
+                    # The directory went away before it could be watched.
+                    continue
+                self._raise("inotify_add_watch", path)
+            self.watches[wd] = path
+            self.paths[path] = wd
+
+    def remove(self, paths: Iterable[Path]) -> None:
+        for path in paths:
+            wd = self.paths.pop(path, None)
+            if wd is not None:
+                del self.watches[wd]
+                self.libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self) -> List[Tuple[Path | None, str, int]]:
+        events: List[Tuple[Path | None, str, int]] = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT.unpack_from(data, offset)
+                offset += EVENT.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                events.append((self.watches.get(wd), name, mask))
+                if mask & IN_IGNORED:
+                    # The kernel dropped the watch, e.g. as its directory is gone.
+                    path = self.watches.pop(wd, None)
+                    if path is not None:
+                        self.paths.pop(path, None)
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+        self.watches.clear()
+        self.paths.clear()
@@ -1,115 +1,302 @@
 import os
-from argparse import ArgumentParser
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import FrozenSet, List, Set, Tuple
 
-from colcon_core.location import set_default_config_path  # noqa: E402
-from colcon_core.package_selection import add_arguments as add_packages_arguments
-from colcon_core.package_selection import get_package_descriptors
 from textual import log
 from textual.app import ComposeResult
+from textual.binding import Binding
 from textual.message import Message
-from textual.screen import Screen
+from textual.reactive import reactive
 from textual.widget import Widget
-from textual.widgets import DataTable
+from textual.widgets import Footer
 
+from r2s.diff import Changes, SnapshotDiff
+from r2s.screens.colcon.build_runner import BuildRunnerScreen
+from r2s.screens.colcon.build_state import BuildState, BuildStates
+from r2s.screens.colcon.discovery import (
+    IGNORE_MARKERS,
+    MANIFESTS,
+    Package,
+    PackageCache,
+    close_parse_pool,
+    find_manifests,
+    source_root,
+)
+from r2s.screens.colcon.graph import PackageGraph
+from r2s.screens.colcon.inotify import IN_ISDIR, IN_Q_OVERFLOW, Inotify, InotifyError
+from r2s.screens.watcher_screen import WatcherScreen
 from r2s.watcher import WatcherBase
 from r2s.widgets import DataGrid, Header
+from r2s.widgets.data_grid.virtual_table import VirtualTable
 
 
-@dataclass(frozen=True, eq=False)
-class Package:
-    name: str
-    path: Path
-    type: str
-    version: str | None
+@dataclass(frozen=True)
+class PackageInfo:
+    package: Package
+    depth: int | None
+    dependents: int
+    build: BuildState
 
 
-class PackagesFetched(Message):
-    def __init__(self, package_list: List[Package]) -> None:
-        self.package_list = package_list
+class BuildRequested(Message):
+    def __init__(self, verb: str, packages: List[str]) -> None:
+        self.verb = verb
+        self.packages = packages
+        super().__init__()
+
+
+class PackagesChanged(Message):
+    def __init__(self, changes: Changes[PackageInfo], graph: PackageGraph) -> None:
+        self.changes = changes
+        self.graph = graph
         super().__init__()
 
 
 class PackageListWatcher(WatcherBase):
+    """Keeps the packages of a workspace up to date.
+
+    The first poll crawls the workspace through a `PackageCache`. After that,
+    inotify watches on the crawled directories tell which parts of the tree
+    changed, only those are crawled again, and the cache re-parses only the
+    manifests that changed. Where inotify is not available, the workspace is
+    crawled again every `fallback_interval` seconds instead.
+
+    The dependency graph is rebuilt whenever the packages change, and build
+    states are checked on every poll.
+    """
 
     target: Widget | None = None
 
-    def run(self) -> None:
-        command_name = "colcon"
-        set_default_config_path(
-            path=(Path("~") / f".{command_name}").expanduser(),
-            env_var=f"{command_name}_HOME".upper(),
-        )
+    interval: float = 0.5
+    max_interval: float = 2.0
+    fallback_interval: float = 10.0
+
+    def __init__(self, workspace: Path) -> None:
+        self.workspace = workspace
+        self.root = source_root(workspace)
+        self.cache: PackageCache | None = None
+        self.diff: SnapshotDiff[PackageInfo] = SnapshotDiff()
+        self.manifests: Set[Path] = set()
+        self.inotify: Inotify | None = None
+        self.packages: List[Package] = []
+        self.graph = PackageGraph(())
+        self.builds = BuildStates(workspace)
+        super().__init__()
+
+    def close(self) -> None:
+        super().close()
+        close_parse_pool()
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
+
+    def poll(self) -> bool:
+        if self.cache is None:
+            # Loading the cache reads a file, so keep it off the UI thread too.
+            self.cache = PackageCache(self.workspace)
+            try:
+                self.inotify = Inotify()
+            except InotifyError as ex:
+                self._fall_back(ex)
+            self.crawl(self.root)
+            crawled = True
+        elif self.inotify is not None:
+            roots = self.affected(self.inotify.read())
+            for root in roots:
+                self.crawl(root)
+            crawled = bool(roots)
+        else:
+            self.crawl(self.root)
+            crawled = True
+
+        built = self.builds.update()
+        if not crawled and not built:
+            return False
+        if crawled:
+            self.packages = self.cache.packages(sorted(self.manifests))
+            self.cache.save()
+            self.graph = PackageGraph(self.packages)
+
+        infos = {}
+        for package in self.packages:
+            name = package.name
+            infos[os.path.relpath(package.path, self.root)] = PackageInfo(
+                package=package,
+                depth=self.graph.depth.get(name),
+                dependents=self.graph.dependent_count(name),
+                build=self.builds.state(name),
+            )
+        changes = self.diff.update(infos)
+        if changes and self.target is not None:
+            self.target.post_message(PackagesChanged(changes, self.graph))
+        return bool(changes)
+
+    def _fall_back(self, ex: OSError) -> None:
+        log(f"Watching {self.root} by polling: {ex!r}")
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
+        self.interval = self.max_interval = self.fallback_interval
+
+    def affected(self, events: List[Tuple[Path | None, str, int]]) -> Set[Path]:
+        """The directories to crawl again after some inotify events."""
+        roots: Set[Path] = set()
+        for directory, name, mask in events:
+            if mask & IN_Q_OVERFLOW:
+                return {self.root}
+            if directory is None:
+                continue
+            if mask & IN_ISDIR:
+                if not name.startswith("."):
+                    roots.add(directory / name)
+            elif not name or name in MANIFESTS or name in IGNORE_MARKERS:
+                roots.add(directory)
+        # Crawling a directory covers everything below it.
+        return {root for root in roots if not any(p in roots for p in root.parents)}
 
-        parser = ArgumentParser()
-        add_packages_arguments(parser)
-        args = parser.parse_args()
-        args.base_paths = ["/usr/local/google/home/mjcarroll/workspaces/ros2_rolling"]
-
-        while not self._exit_event.is_set():
-            descriptors = get_package_descriptors(args)
-
-            packages: List[Package] = []
-
-            for descrip in descriptors:
-                log(descrip)
-                vv = None
-                if "version" in descrip.metadata:
-                    vv = descrip.metadata["version"]
-                packages.append(
-                    Package(
-                        name=descrip.name,
-                        path=descrip.path,
-                        type=descrip.type,
-                        version=vv,
-                    )
-                )
-            if self.target is not None:
-                self.target.post_message(PackagesFetched(packages))
-            break
+    def crawl(self, root: Path) -> None:
+        """Find the packages under `root` again, and watch what was searched."""
+        packages = {manifest.parent for manifest in self.manifests}
+        if root != self.root and any(p in packages for p in root.parents):
+            # Nothing inside a package is a package of its own.
+            return
+        self.manifests = {m for m in self.manifests if not m.is_relative_to(root)}
+        visited: List[Path] = []
+        self.manifests.update(find_manifests(root, visited))
+        if self.inotify is None:
+            return
+        searched = set(visited)
+        self.inotify.remove(
+            [
+                p
+                for p in self.inotify.paths
+                if p.is_relative_to(root) and p not in searched
+            ]
+        )
+        try:
+            self.inotify.add(visited)
+        except InotifyError as ex:
+            self._fall_back(ex)
 
 
 class PackageListGrid(DataGrid):
-    base_path: str = "/usr/local/google/home/mjcarroll/workspaces/ros2_rolling"
+    BINDINGS = [
+        Binding("d", "toggle_rebuild_set", "Rebuild Set"),
+        Binding("b", "run_colcon('build')", "Build"),
+        Binding("t", "run_colcon('test')", "Test"),
+    ]
+
+    title: reactive[str] = reactive("Packages")
+
+    def __init__(self, workspace: Path) -> None:
+        super().__init__()
+        self.base_path = source_root(workspace)
+        self.graph = PackageGraph(())
+        self.rebuild_root: str | None = None
+        self.rebuild_set: FrozenSet[str] = frozenset()
+
+    def on_mount(self) -> None:
+        self.set_filter()
+
+    def set_filter(self) -> None:
+        if self.rebuild_root is None:
+            self.filter = "all"
+        else:
+            self.filter = f"rebuild {self.rebuild_root}: {len(self.rebuild_set)}"
 
     def columns(self):
-        return ["Name", "Version", "Type", "Path"]
+        return [
+            "Name",
+            "Version",
+            "Type",
+            "Status",
+            "Last Build",
+            "Depth",
+            "Dependents",
+            "Path",
+        ]
 
-    def on_packages_fetched(self, message: PackagesFetched) -> None:
-        """Method called to process each fetched snapshot."""
-        message.stop()
-        table = self.query_one("#data_table", DataTable)
+    def filter_row(self, info: PackageInfo) -> bool:
+        return self.rebuild_root is None or info.package.name in self.rebuild_set
 
-        for package in message.package_list:
-            pp = os.path.relpath(package.path, os.path.join(self.base_path, "src"))
-            if pp not in table.rows:
-                table.add_row(
-                    package.name,
-                    package.version if package.version else "",
-                    package.type,
-                    pp,
-                    key=pp,
-                )
+    def row_values(self, info: PackageInfo) -> Tuple:
+        package = info.package
+        return (
+            package.name,
+            package.version if package.version else "",
+            package.type,
+            info.build.status,
+            info.build.duration or "",
+            "" if info.depth is None else info.depth,
+            info.dependents,
+            os.path.relpath(package.path, self.base_path),
+        )
 
+    def action_toggle_rebuild_set(self) -> None:
+        """Show only the packages that rebuild after changing the selected one"""
+        if self.rebuild_root is not None:
+            self.rebuild_root = None
+        else:
+            info = self.records.get(self.query_one(VirtualTable).cursor_key)
+            if info is None or info.package.name not in self.graph:
+                return
+            self.rebuild_root = info.package.name
+        self.update_rebuild_set()
+        self.populate_rows()
 
-class PackageListScreen(Screen):
+    def action_run_colcon(self, verb: str) -> None:
+        """Build or test the rebuild set if it is shown, else the selected package."""
+        if self.rebuild_root is not None:
+            packages = self.graph.rebuild_set(self.rebuild_root)
+        else:
+            info = self.records.get(self.query_one(VirtualTable).cursor_key)
+            if info is None:
+                return
+            packages = [info.package.name]
+        self.post_message(BuildRequested(verb, packages))
+
+    def update_rebuild_set(self) -> None:
+        if self.rebuild_root is None or self.rebuild_root not in self.graph:
+            self.rebuild_root = None
+            self.rebuild_set = frozenset()
+        else:
+            self.rebuild_set = frozenset(self.graph.rebuild_set(self.rebuild_root))
+        self.set_filter()
+
+    def on_packages_changed(self, message: PackagesChanged) -> None:
+        message.stop()
+        graph_changed = message.graph is not self.graph
+        self.graph = message.graph
+        if graph_changed and self.rebuild_root is not None:
+            self.update_rebuild_set()
+            self.apply_changes(message.changes)
+            self.populate_rows()
+        else:
+            self.apply_changes(message.changes)
+
+
+class PackageListScreen(WatcherScreen):
     CSS = """
     PackageListScreen {}
     """
 
-    def __init__(self):
-        self.watcher = PackageListWatcher()
+    def __init__(self, workspace: Path):
+        self.workspace = workspace
+        self.watcher = PackageListWatcher(workspace)
         super().__init__()
 
     async def on_mount(self) -> None:
         self.watcher.target = self.query_one(PackageListGrid)
         self.watcher.start()
 
-    def on_unmount(self) -> None:
-        self.watcher.close()
+    def on_build_requested(self, message: BuildRequested) -> None:
+        message.stop()
+        self.app.push_screen(
+            BuildRunnerScreen(self.workspace, message.verb, message.packages)
+        )
 
     def compose(self) -> ComposeResult:
         yield Header()
-        yield PackageListGrid()
+        yield PackageListGrid(self.workspace)
+        yield Footer()
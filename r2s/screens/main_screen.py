@@ -1,21 +1,18 @@
-import time
-
 from textual import log
 from textual.app import ComposeResult
-from textual.screen import Screen
 
+from r2s.screens.watcher_screen import WatcherScreen
 from r2s.watcher import WatcherBase
 from r2s.widgets import DataGrid, Header
 
 
 class NodeWatcher(WatcherBase):
-    def run(self) -> None:
-        while not self._exit_event.is_set():
-            time.sleep(1.0)
-            log("Watching")
+    def poll(self) -> bool:
+        log("Watching")
+        return False
 
 
-class MainScreen(Screen):
+class MainScreen(WatcherScreen):
     CSS = """
     MainScreen {}
     """
@@ -27,9 +24,6 @@ class MainScreen(Screen):
     async def on_mount(self) -> None:
         self.watcher.start()
 
-    def on_unmount(self) -> None:
-        self.watcher.close()
-
     def compose(self) -> ComposeResult:
         yield Header()
         yield DataGrid()
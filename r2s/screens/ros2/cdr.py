@@ -0,0 +1,383 @@
+import re
+import struct
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+PRIMITIVES: Dict[str, str] = {
+    "bool": "?",
+    "boolean": "?",
+    "byte": "B",
+    "octet": "B",
+    "char": "B",
+    "int8": "b",
+    "uint8": "B",
+    "int16": "h",
+    "uint16": "H",
+    "int32": "i",
+    "uint32": "I",
+    "int64": "q",
+    "uint64": "Q",
+    "float": "f",
+    "float32": "f",
+    "double": "d",
+    "float64": "d",
+}
+
+# Elements of primitive sequences shown before eliding the rest.
+PREVIEW = 8
+
+
+@dataclass(frozen=True)
+class FieldType:
+    """The type of a message field, parsed from its rosidl type string."""
+
+    kind: str  # "primitive", "string", "message", "sequence" or "array"
+    name: str
+    element: "FieldType | None" = None
+    length: int = 0
+
+    @property
+    def code(self) -> str:
+        return PRIMITIVES[self.name]
+
+
+def parse_type(text: str) -> FieldType:
+    text = text.strip()
+    if match := re.fullmatch(r"sequence<(.+?)(?:,\s*\d+)?>", text):
+        return FieldType("sequence", text, parse_type(match.group(1)))
+    if match := re.fullmatch(r"(.+)\[(<=\d+)?\]", text):
+        return FieldType("sequence", text, parse_type(match.group(1)))
+    if match := re.fullmatch(r"(.+)\[(\d+)\]", text):
+        return FieldType("array", text, parse_type(match.group(1)), int(match.group(2)))
+    if match := re.fullmatch(r"(w?string)(<=\d+)?", text):
+        return FieldType("string", match.group(1))
+    if text in PRIMITIVES:
+        return FieldType("primitive", text)
+    return FieldType("message", message_type_name(text))
+
+
+def message_type_name(name: str) -> str:
+    """Normalize `pkg/Type` to `pkg/msg/Type`."""
+    parts = name.split("/")
+    if len(parts) == 2:
+        return f"{parts[0]}/msg/{parts[1]}"
+    return name
+
+
+Layout = Tuple[Tuple[str, FieldType], ...]
+
+
+@lru_cache(maxsize=None)
+def message_layout(type_name: str) -> Layout:
+    """The fields of a message type, in serialization order."""
+    from rosidl_runtime_py.utilities import get_message
+
+    fields = get_message(type_name).get_fields_and_field_types()
+    return tuple((name, parse_type(type)) for name, type in fields.items())
+
+
+@dataclass(frozen=True)
+class Row:
+    """A field found in a buffer, at the offset where its value starts."""
+
+    depth: int
+    label: str
+    path: str
+    type: FieldType | None
+    offset: int
+
+
+class CdrReader:
+    """Reads message fields straight out of a serialized CDR buffer.
+
+    Nothing is deserialized up front: `rows` walks the buffer to find where
+    each field starts, which only reads string and sequence lengths, and a
+    field's value is unpacked from a memoryview when it is asked for.
+    Primitive sequences come back as NumPy arrays over the buffer itself.
+    """
+
+    def __init__(
+        self, data: bytes, layout: Callable[[str], Layout] = message_layout
+    ) -> None:
+        self.data = memoryview(data)
+        if len(data) < 4 or data[0] != 0 or data[1] not in (0, 1):
+            raise ValueError("only plain CDR encapsulation is supported")
+        self.endian = "<" if data[1] == 1 else ">"
+        self.layout = layout
+
+    @staticmethod
+    def align(offset: int, size: int) -> int:
+        return offset + (-offset % min(size, 8))
+
+    def unpack(self, code: str, offset: int) -> Any:
+        # Offsets are relative to the payload, after the encapsulation header.
+        return struct.unpack_from(self.endian + code, self.data, 4 + offset)[0]
+
+    def count(self, type: FieldType, offset: int) -> Tuple[int, int]:
+        """The element count of an array or sequence, and where elements start."""
+        if type.kind == "array":
+            return type.length, offset
+        offset = self.align(offset, 4)
+        return self.unpack("I", offset), offset + 4
+
+    def skip(self, type: FieldType, offset: int) -> int:
+        """The offset just past the value of `type` starting at `offset`."""
+        if type.kind == "primitive":
+            size = struct.calcsize(type.code)
+            return self.align(offset, size) + size
+        if type.kind == "string":
+            if type.name == "wstring":
+                raise ValueError("wstring fields are not supported")
+            length, offset = self.count(FieldType("sequence", "string"), offset)
+            return offset + length
+        if type.kind == "message":
+            layout = self.layout(type.name)
+            if not layout:
+                # Empty messages are serialized with a single placeholder byte.
+                return offset + 1
+            for _, field in layout:
+                offset = self.skip(field, offset)
+            return offset
+        count, offset = self.count(type, offset)
+        element = type.element
+        if element.kind == "primitive":
+            size = struct.calcsize(element.code)
+            return self.align(offset, size) + count * size if count else offset
+        for _ in range(count):
+            offset = self.skip(element, offset)
+        return offset
+
+    def rows(self, type_name: str, limit: int = 64) -> List[Row]:
+        """Locate every field of a message, up to `limit` sequence elements."""
+        rows: List[Row] = []
+        self._walk(FieldType("message", type_name), 0, 0, "", rows, limit)
+        return rows
+
+    def _walk(
+        self,
+        type: FieldType,
+        offset: int,
+        depth: int,
+        path: str,
+        rows: List[Row],
+        limit: int,
+    ) -> int:
+        layout = self.layout(type.name)
+        if not layout:
+            return offset + 1
+        for name, field in layout:
+            field_path = f"{path}.{name}" if path else name
+            rows.append(Row(depth, name, field_path, field, offset))
+            if field.kind == "message":
+                offset = self._walk(field, offset, depth + 1, field_path, rows, limit)
+            elif field.kind in ("array", "sequence") and (
+                field.element.kind != "primitive"
+            ):
+                count, offset = self.count(field, offset)
+                element = field.element
+                for index in range(count):
+                    if index >= limit:
+                        offset = self.skip(element, offset)
+                        continue
+                    element_path = f"{field_path}[{index}]"
+                    rows.append(
+                        Row(depth + 1, f"[{index}]", element_path, element, offset)
+                    )
+                    if element.kind == "message":
+                        offset = self._walk(
+                            element, offset, depth + 2, element_path, rows, limit
+                        )
+                    else:
+                        offset = self.skip(element, offset)
+                if count > limit:
+                    rows.append(
+                        Row(depth + 1, f"... {count - limit} more", "", None, offset)
+                    )
+            else:
+                offset = self.skip(field, offset)
+        return offset
+
+    def array(self, row: Row) -> np.ndarray:
+        """A primitive array or sequence field, as a view of the buffer."""
+        count, offset = self.count(row.type, row.offset)
+        element = row.type.element
+        dtype = np.dtype(self.endian + element.code)
+        if count:
+            offset = self.align(offset, dtype.itemsize)
+        return np.frombuffer(self.data, dtype=dtype, count=count, offset=4 + offset)
+
+    def value(self, row: Row) -> Any:
+        """Decode the value of a primitive, string or primitive array field."""
+        type = row.type
+        if type is None or type.kind == "message":
+            return None
+        if type.kind == "primitive":
+            size = struct.calcsize(type.code)
+            return self.unpack(type.code, self.align(row.offset, size))
+        if type.kind == "string":
+            end = self.skip(type, row.offset)
+            start = self.align(row.offset, 4) + 4
+            # Strings are NUL terminated, and the length includes the NUL.
+            raw = self.data[4 + start : 4 + end].tobytes()
+            return raw.rstrip(b"\0").decode("utf-8", "replace")
+        if type.element.kind == "primitive":
+            return self.array(row)
+        return self.count(type, row.offset)[0]
+
+    def describe(self, row: Row) -> str:
+        """Format the value of a field for display."""
+        if row.type is None:
+            return ""
+        if row.type.kind == "message":
+            return row.type.name
+        value = self.value(row)
+        if isinstance(value, np.ndarray):
+            return describe_array(value)
+        if row.type.kind in ("array", "sequence"):
+            return f"[{value} x {row.type.element.name}]"
+        if isinstance(value, str):
+            return repr(value)
+        return str(value)
+
+
+def describe_array(values: np.ndarray) -> str:
+    preview = ", ".join(str(v) for v in values[:PREVIEW].tolist())
+    if len(values) <= PREVIEW:
+        return f"[{preview}]"
+    text = f"[{len(values)} x {values.dtype.name}] [{preview}, ...]"
+    if values.dtype.kind in "iuf":
+        with np.errstate(all="ignore"):
+            text += (
+                f" min {np.nanmin(values):g} max {np.nanmax(values):g}"
+                f" mean {np.nanmean(values):g}"
+            )
+    return text
+
+
+def field_values(reader: CdrReader, rows: List[Row]) -> Callable[[str], Any]:
+    by_path = {row.path: row for row in rows}
+    return lambda path: reader.value(by_path[path])
+
+
+IMAGE_ENCODINGS: Dict[str, Tuple[str, int]] = {
+    "mono8": ("u1", 1),
+    "8UC1": ("u1", 1),
+    "rgb8": ("u1", 3),
+    "bgr8": ("u1", 3),
+    "8UC3": ("u1", 3),
+    "rgba8": ("u1", 4),
+    "bgra8": ("u1", 4),
+    "8UC4": ("u1", 4),
+    "mono16": ("u2", 1),
+    "16UC1": ("u2", 1),
+    "16SC1": ("i2", 1),
+    "32SC1": ("i4", 1),
+    "32FC1": ("f4", 1),
+    "64FC1": ("f8", 1),
+}
+
+# sensor_msgs/msg/PointField datatypes.
+POINT_TYPES: Dict[int, str] = {
+    1: "i1",
+    2: "u1",
+    3: "i2",
+    4: "u2",
+    5: "i4",
+    6: "u4",
+    7: "f4",
+    8: "f8",
+}
+
+
+def stats_line(label: str, values: np.ndarray) -> str:
+    if not values.size:
+        return f"{label}: empty"
+    with np.errstate(all="ignore"):
+        return (
+            f"{label}: min {np.nanmin(values):g} max {np.nanmax(values):g}"
+            f" mean {np.nanmean(values):g}"
+        )
+
+
+def summarize_image(reader: CdrReader, rows: List[Row]) -> List[str]:
+    get = field_values(reader, rows)
+    height, width, step = get("height"), get("width"), get("step")
+    encoding = get("encoding")
+    data = get("data")
+    lines = [f"{width}x{height} {encoding}, {data.size} bytes"]
+    if encoding not in IMAGE_ENCODINGS or data.size < height * step:
+        return lines
+    code, channels = IMAGE_ENCODINGS[encoding]
+    dtype = np.dtype((">" if get("is_bigendian") else "<") + code)
+    row_bytes = width * channels * dtype.itemsize
+    pixels = data[: height * step].reshape(height, step)[:, :row_bytes]
+    if step != row_bytes:
+        pixels = np.ascontiguousarray(pixels)
+    pixels = pixels.view(dtype).reshape(height * width, channels)
+    for channel in range(channels):
+        lines.append(stats_line(f"channel {channel}", pixels[:, channel]))
+    return lines
+
+
+def summarize_point_cloud(reader: CdrReader, rows: List[Row]) -> List[str]:
+    get = field_values(reader, rows)
+    count = get("width") * get("height")
+    names, formats, offsets = [], [], []
+    for index in range(get("fields")):
+        prefix = f"fields[{index}]"
+        datatype = POINT_TYPES.get(get(f"{prefix}.datatype"))
+        if datatype is None:
+            continue
+        names.append(get(f"{prefix}.name"))
+        formats.append((datatype, (get(f"{prefix}.count"),)))
+        offsets.append(get(f"{prefix}.offset"))
+    data = get("data")
+    point_step = get("point_step")
+    lines = [f"{count} points, {point_step} bytes each"]
+    if not names or data.size < count * point_step:
+        return lines
+    endian = ">" if get("is_bigendian") else "<"
+    dtype = np.dtype(
+        {
+            "names": names,
+            "formats": [(endian + f, shape) for f, shape in formats],
+            "offsets": offsets,
+            "itemsize": point_step,
+        }
+    )
+    points = data[: count * point_step].view(dtype)
+    for name in names:
+        lines.append(stats_line(name, points[name].reshape(-1)))
+    return lines
+
+
+def summarize_occupancy_grid(reader: CdrReader, rows: List[Row]) -> List[str]:
+    get = field_values(reader, rows)
+    width, height = get("info.width"), get("info.height")
+    data = get("data")
+    lines = [f"{width}x{height} cells at {get('info.resolution'):g} m"]
+    if data.size:
+        # The occupied threshold matches the nav2 map server default.
+        for label, cells in (
+            ("unknown", data < 0),
+            ("free", data == 0),
+            ("occupied", data >= 65),
+        ):
+            lines.append(f"{label}: {100 * np.count_nonzero(cells) / data.size:.1f}%")
+    return lines
+
+
+SUMMARIES: Dict[str, Callable[[CdrReader, List[Row]], List[str]]] = {
+    "sensor_msgs/msg/Image": summarize_image,
+    "sensor_msgs/msg/PointCloud2": summarize_point_cloud,
+    "nav_msgs/msg/OccupancyGrid": summarize_occupancy_grid,
+}
+
+
+def summarize(type_name: str, reader: CdrReader, rows: List[Row]) -> List[str]:
+    """Summary lines for message types that are too large to read field by field."""
+    summary = SUMMARIES.get(message_type_name(type_name))
+    return summary(reader, rows) if summary else []
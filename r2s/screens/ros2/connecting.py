@@ -0,0 +1,21 @@
+from textual.app import ComposeResult
+from textual.screen import Screen
+from textual.widgets import Footer, Static
+
+from r2s.screens.ros2.header import RosHeader
+
+
+class ConnectingScreen(Screen):
+    """Shown while rclpy is imported and the r2s node joins the graph."""
+
+    DEFAULT_CSS = """
+    ConnectingScreen Static#connecting {
+        height: 1fr;
+        content-align: center middle;
+    }
+    """
+
+    def compose(self) -> ComposeResult:
+        yield RosHeader()
+        yield Static("Connecting to ROS…", id="connecting")
+        yield Footer()
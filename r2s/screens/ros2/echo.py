@@ -0,0 +1,227 @@
+from typing import List
+
+from rich.markup import escape
+from rich.text import Text
+from textual import log, work
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.cache import LRUCache
+from textual.geometry import Size
+from textual.message import Message
+from textual.reactive import reactive
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.widget import Widget
+from textual.widgets import Footer
+from textual.worker import get_current_worker
+
+from r2s.screens.ros2.cdr import CdrReader, Row, summarize
+from r2s.screens.ros2.header import RosHeader
+from r2s.screens.watcher_screen import WatcherScreen
+from r2s.watcher import WatcherBase
+
+
+class TopicMessage(Message):
+    def __init__(self, data: bytes, error: str | None = None) -> None:
+        self.data = data
+        self.error = error
+        super().__init__()
+
+
+class EchoWatcher(WatcherBase):
+    """Keeps the latest serialized message of a topic.
+
+    The subscription callback only stores a reference to the raw buffer, so
+    a high-rate topic costs nothing beyond receiving it. The newest buffer is
+    posted to `target` at most once per `interval`.
+    """
+
+    target: Widget
+
+    interval: float = 0.5
+    max_interval: float = 0.5
+
+    def __init__(self, node, topic: str, type: str) -> None:
+        self.node = node
+        self.topic = topic
+        self.type = type
+        self.latest: bytes | None = None
+        self.posted: bytes | None = None
+        self.subscription = None
+        self.failed = False
+        super().__init__()
+
+    def receive(self, data: bytes) -> None:
+        self.latest = data
+
+    def close(self) -> None:
+        super().close()
+        if self.subscription is not None:
+            self.node.destroy_subscription(self.subscription)
+            self.subscription = None
+
+    def subscribe(self) -> None:
+        from rclpy.qos import qos_profile_sensor_data
+        from rosidl_runtime_py.utilities import get_message
+
+        self.subscription = self.node.create_subscription(
+            get_message(self.type),
+            self.topic,
+            self.receive,
+            qos_profile_sensor_data,
+            raw=True,
+        )
+
+    def poll(self) -> bool:
+        if self.failed:
+            return False
+        if self.subscription is None:
+            try:
+                self.subscribe()
+            except Exception as ex:
+                self.failed = True
+                self.target.post_message(TopicMessage(b"", error=repr(ex)))
+                return False
+        data = self.latest
+        if data is None or data is self.posted:
+            return False
+        self.posted = data
+        self.target.post_message(TopicMessage(data))
+        return True
+
+
+class MessageLines(ScrollView):
+    """Shows the fields of a message, decoding only the lines on screen."""
+
+    DEFAULT_CSS = """
+    MessageLines {
+        height: 1fr;
+        background: $surface;
+        color: $text;
+        border: $success-lighten-1;
+        border-title-align: center;
+        border-title-color: $success-lighten-1;
+    }
+    MessageLines > .message-lines--summary {
+        color: $success-lighten-2;
+        text-style: bold;
+    }
+    MessageLines > .message-lines--label {
+        color: $text-muted;
+    }
+    """
+
+    COMPONENT_CLASSES = {
+        "message-lines--summary",
+        "message-lines--label",
+    }
+
+    def __init__(self, id: str | None = None) -> None:
+        super().__init__(id=id)
+        self.reader: CdrReader | None = None
+        self.rows: List[Row] = []
+        self.summary: List[str] = []
+        self._strips: LRUCache[int, Strip] = LRUCache(256)
+
+    def show(self, reader: CdrReader | None, rows: List[Row], summary: List[str]):
+        self.reader = reader
+        self.rows = rows
+        self.summary = summary
+        self._strips.clear()
+        self.virtual_size = Size(self.size.width, len(summary) + len(rows))
+        self.refresh()
+
+    def notify_style_update(self) -> None:
+        self._strips.clear()
+
+    def _line(self, index: int) -> Text:
+        if index < len(self.summary):
+            style = self.get_component_rich_style("message-lines--summary")
+            return Text(self.summary[index], style=style)
+        row = self.rows[index - len(self.summary)]
+        style = self.get_component_rich_style("message-lines--label")
+        line = Text("  " * row.depth + row.label, style=style)
+        try:
+            value = self.reader.describe(row)
+        except Exception as ex:
+            value = f"<{ex}>"
+        if value:
+            line.append(": ")
+            line.append(value)
+        return line
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        width = self.size.width
+        index = scroll_y + y
+        if index >= len(self.summary) + len(self.rows):
+            return Strip.blank(width, self.rich_style)
+        strip = self._strips.get(index)
+        if strip is None:
+            line = self._line(index)
+            line.no_wrap = True
+            strip = Strip(line.render(self.app.console), line.cell_len)
+            self._strips[index] = strip
+        return strip.crop_extend(scroll_x, scroll_x + width, self.rich_style)
+
+
+class TopicEchoScreen(WatcherScreen):
+    BINDINGS = [
+        Binding("escape", "app.pop_screen", "Back", key_display="esc"),
+        Binding("space", "toggle_pause", "Pause"),
+    ]
+
+    paused: reactive[bool] = reactive(False, init=False)
+
+    def __init__(self, node, topic: str, type: str) -> None:
+        self.topic = topic
+        self.type = type
+        self.watcher = EchoWatcher(node, topic, type)
+        super().__init__()
+
+    async def on_mount(self) -> None:
+        self.watch_paused(self.paused)
+        self.watcher.target = self
+        self.watcher.start()
+
+    def compose(self) -> ComposeResult:
+        yield RosHeader()
+        yield MessageLines()
+        yield Footer()
+
+    def action_toggle_pause(self) -> None:
+        self.paused = not self.paused
+
+    def watch_paused(self, paused: bool) -> None:
+        lines = self.query_one(MessageLines)
+        title = escape(f"{self.topic} [{self.type}]")
+        lines.border_title = title + " (paused)" if paused else title
+
+    def on_topic_message(self, message: TopicMessage) -> None:
+        message.stop()
+        lines = self.query_one(MessageLines)
+        if message.error is not None:
+            lines.show(None, [], [f"Cannot subscribe: {message.error}"])
+            return
+        if self.paused:
+            return
+        self.decode(lines, message.data)
+
+    @work(thread=True, exclusive=True, group="echo-decode")
+    def decode(self, lines: MessageLines, data: bytes) -> None:
+        """Lay out and summarize a message off the UI thread.
+
+        Walking a large message, like an image or a point cloud, and
+        summarizing its arrays takes long enough to hold up input. `lines`
+        is looked up by the caller, since the DOM is not safe to query here.
+        """
+        try:
+            reader = CdrReader(data)
+            rows = reader.rows(self.type)
+            summary = summarize(self.type, reader, rows)
+        except Exception as ex:
+            log(f"Cannot read {self.topic}: {ex!r}")
+            reader, rows, summary = None, [], [f"Cannot read message: {ex}"]
+        # A newer message may have replaced this one while it was decoded.
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(lines.show, reader, rows, summary)
@@ -1,8 +1,5 @@
 import os
 
-import rclpy
-from rclpy.parameter import Parameter
-
 import threading
 import time
 
@@ -16,11 +13,30 @@ RCLPY_NODE = None
 
 
 class NodeWrapper:
+    """The r2s node, spun by a multi-threaded executor on a background thread.
+
+    Subscription callbacks and service responses run in separate callback
+    groups on the executor's threads, so a busy topic does not hold up the
+    service calls watchers wait on. Graph queries go straight to rcl and do
+    not involve the executor. Subscriptions and clients are created and
+    destroyed under a lock, so watchers may do so from their own threads.
+    """
 
     nodes_and_namespaces = []
     topic_names_and_types = []
 
+    executor_threads: int = 4
+    shutdown_timeout: float = 2.0
+
     def __init__(self, node_name, *args):
+        self._lock = threading.Lock()
+        self._stopped = False
+
+        import rclpy
+        from rclpy.callback_groups import ReentrantCallbackGroup
+        from rclpy.executors import MultiThreadedExecutor
+        from rclpy.parameter import Parameter
+
         node_name_suffix = getattr(args, "node_name_suffix", "_%d" % os.getpid())
         start_parameter_services = getattr(args, "start_parameter_services", False)
         use_sim_time = getattr(args, "use_sim_time", False)
@@ -46,28 +62,83 @@ class NodeWrapper:
             )
         except Exception as e:
             log("Exception caught when creating node:  ", e)
-            exit(1)
-
-        self.spinning = True
-        self.spinner = threading.Thread(target=self.spin)
+            raise RuntimeError(f"Cannot create the r2s node: {e}") from e
+
+        self.subscription_group = ReentrantCallbackGroup()
+        self.client_group = ReentrantCallbackGroup()
+        self.executor = MultiThreadedExecutor(num_threads=self.executor_threads)
+        self.executor.add_node(self.node)
+        self.spinner = threading.Thread(
+            target=self.spin, name="r2s-executor", daemon=True
+        )
         self.spinner.start()
 
+    def create_subscription(self, msg_type, topic: str, callback, qos, raw=False):
+        with self._lock:
+            self._check_running()
+            return self.node.create_subscription(
+                msg_type,
+                topic,
+                callback,
+                qos,
+                callback_group=self.subscription_group,
+                raw=raw,
+            )
+
+    def destroy_subscription(self, subscription) -> None:
+        with self._lock:
+            if not self._stopped:
+                self.node.destroy_subscription(subscription)
+
+    def create_client(self, srv_type, srv_name: str):
+        with self._lock:
+            self._check_running()
+            return self.node.create_client(
+                srv_type, srv_name, callback_group=self.client_group
+            )
+
+    def destroy_client(self, client) -> None:
+        with self._lock:
+            if not self._stopped:
+                self.node.destroy_client(client)
+
+    def _check_running(self) -> None:
+        if self._stopped:
+            raise RuntimeError("The r2s node has been stopped")
+
     def stop(self):
-        self.spinning = False
-        self.spinner.join()
+        """Stop the executor, wait for its threads and destroy the node."""
+        if not hasattr(self, "executor"):
+            # Creating the node failed, so there is nothing to stop.
+            return
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+        self.executor.shutdown(timeout_sec=self.shutdown_timeout)
+        self.spinner.join(self.shutdown_timeout)
+        self.node.destroy_node()
 
     def __del__(self):
         self.stop()
 
     def spin(self):
+        from rclpy.executors import ExternalShutdownException
+
         log("start spinning")
-        while self.spinning:
-            rclpy.spin_once(self.node, timeout_sec=0.5)
+        try:
+            self.executor.spin()
+        except ExternalShutdownException:
+            pass
 
 
 def get_node(*args, node_name=None):
     global RCLPY_INIT, RCLPY_NODE
 
+    # rclpy is imported on first use so that the UI can be driven by another
+    # NodeWrapper, e.g. a simulated graph, without ROS installed.
+    import rclpy
+
     if not RCLPY_INIT:
         log("Creating context")
         rclpy.init()
@@ -0,0 +1,354 @@
+import time
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+from textual import log
+
+from r2s.watcher import WatcherBase
+
+
+HIDDEN_PREFIX = "_"
+
+
+def is_hidden_name(name: str) -> bool:
+    """Whether a topic or service name has a hidden token, as in rclpy."""
+    return any(token.startswith(HIDDEN_PREFIX) for token in name.split("/"))
+
+
+def fully_qualified_name(namespace: str, name: str) -> str:
+    """Join a node namespace and name into a fully qualified node name."""
+    if name.startswith("/"):
+        return name
+    if namespace.endswith("/"):
+        return namespace + name
+    return namespace + "/" + name
+
+
+def endpoint_nodes(endpoints: Iterable) -> FrozenSet[str]:
+    """Fully qualified names of the nodes owning a list of TopicEndpointInfo."""
+    return frozenset(
+        fully_qualified_name(e.node_namespace, e.node_name) for e in endpoints
+    )
+
+
+@dataclass(frozen=True)
+class TopicInfo:
+    name: str
+    types: Tuple[str, ...]
+    publishers: FrozenSet[str]
+    subscribers: FrozenSet[str]
+
+
+@dataclass(frozen=True)
+class NodeInfo:
+    name: str
+    namespace: str
+    full_name: str
+    servers: Dict[str, Tuple[str, ...]]
+    clients: Dict[str, Tuple[str, ...]]
+
+    @property
+    def hidden(self) -> bool:
+        return self.name.startswith(HIDDEN_PREFIX)
+
+
+@dataclass(frozen=True)
+class GraphSnapshot:
+    generation: int = 0
+    nodes: Dict[str, NodeInfo] = field(default_factory=dict)
+    topics: Dict[str, TopicInfo] = field(default_factory=dict)
+    services: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    actions: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+
+
+@dataclass
+class NodeCounts:
+    subscribers: int = 0
+    publishers: int = 0
+    service_servers: int = 0
+    service_clients: int = 0
+
+
+class GraphIndex:
+    """Per-node endpoint counts built in a single pass over a snapshot.
+
+    Hidden topics and services are skipped in the counts, matching `ros2
+    node info`. The same pass records which nodes serve and call each
+    service and action. An action is owned by the nodes serving or calling
+    its hidden send_goal service, so no per-action graph queries are needed.
+    """
+
+    LIFECYCLE_SERVICE = "lifecycle_msgs/srv/GetState"
+    ACTION_GOAL_SERVICE = "/_action/send_goal"
+
+    def __init__(self, snapshot: GraphSnapshot) -> None:
+        self.generation = snapshot.generation
+        self.counts: Dict[str, NodeCounts] = {n: NodeCounts() for n in snapshot.nodes}
+        self.lifecycle_nodes: Set[str] = set()
+        self.service_servers: Dict[str, Set[str]] = {}
+        self.service_clients: Dict[str, Set[str]] = {}
+        self.action_servers: Dict[str, Set[str]] = {}
+        self.action_clients: Dict[str, Set[str]] = {}
+
+        for topic in snapshot.topics.values():
+            if is_hidden_name(topic.name):
+                continue
+            for name in topic.publishers:
+                self._counts(name).publishers += 1
+            for name in topic.subscribers:
+                self._counts(name).subscribers += 1
+
+        for node in snapshot.nodes.values():
+            counts = self.counts[node.full_name]
+            counts.service_servers = sum(not is_hidden_name(s) for s in node.servers)
+            counts.service_clients = sum(not is_hidden_name(s) for s in node.clients)
+            get_state = node.servers.get(node.full_name + "/get_state", ())
+            if self.LIFECYCLE_SERVICE in get_state:
+                self.lifecycle_nodes.add(node.full_name)
+            self._own(
+                node.full_name, node.servers, self.service_servers, self.action_servers
+            )
+            self._own(
+                node.full_name, node.clients, self.service_clients, self.action_clients
+            )
+
+    def _own(
+        self,
+        full_name: str,
+        services: Iterable[str],
+        service_owners: Dict[str, Set[str]],
+        action_owners: Dict[str, Set[str]],
+    ) -> None:
+        suffix = self.ACTION_GOAL_SERVICE
+        for service in services:
+            service_owners.setdefault(service, set()).add(full_name)
+            if service.endswith(suffix):
+                action = service[: -len(suffix)]
+                action_owners.setdefault(action, set()).add(full_name)
+
+    def _counts(self, full_name: str) -> NodeCounts:
+        # Endpoints can be reported before their node shows up in the list.
+        return self.counts.setdefault(full_name, NodeCounts())
+
+    def node_counts(self, full_name: str) -> NodeCounts:
+        return self.counts.get(full_name, NodeCounts())
+
+    def service_endpoints(self, name: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        """The nodes serving and calling a service."""
+        return (
+            frozenset(self.service_servers.get(name, ())),
+            frozenset(self.service_clients.get(name, ())),
+        )
+
+    def action_endpoints(self, name: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        """The nodes serving and calling an action."""
+        return (
+            frozenset(self.action_servers.get(name, ())),
+            frozenset(self.action_clients.get(name, ())),
+        )
+
+
+class GraphCache(WatcherBase):
+    """Shared view of the ROS graph, re-queried only where it changed.
+
+    rclpy does not expose the graph guard condition, so each cycle takes a
+    cheap fingerprint of the graph (the name lists plus per-topic endpoint
+    counts) and only asks for endpoint details of topics whose fingerprint
+    moved, or that had an endpoint on a node that joined or left.
+
+    Per-node service lists are fetched for nodes that appeared since the
+    last cycle, and for the nodes a change in the service list points at.
+    Some changes leave every fingerprint as it was: a node that starts
+    calling a service that already exists, or a node that stops publishing
+    a topic while another that was already up starts in the same cycle. So
+    every `full_refresh_interval` seconds the services of all nodes and the
+    endpoints of all topics are fetched again. Watchers in `listeners` are
+    woken whenever a new generation is published, so they can sit idle
+    while the graph is stable. The graph is only polled while one of them
+    is not paused, that is while a view of the graph is on screen.
+    """
+
+    interval: float = 0.5
+    max_interval: float = 2.0
+    # Seconds between refetching every node's services and topic's endpoints.
+    full_refresh_interval: float = 30.0
+
+    def __init__(self, node) -> None:
+        self.node = node
+        self.listeners: List[WatcherBase] = []
+        self._snapshot = GraphSnapshot()
+        self._counts: Dict[str, Tuple[int, int]] = {}
+        self._node_topics: Dict[str, Set[str]] = {}
+        self._refreshed_at = time.monotonic() + self.full_refresh_interval
+        self._index = GraphIndex(self._snapshot)
+        self._index_lock = Lock()
+        super().__init__()
+
+    @property
+    def paused(self) -> bool:
+        listeners = list(self.listeners)
+        return super().paused or all(listener.paused for listener in listeners)
+
+    def due(self, now: float) -> bool:
+        return not self.paused and super().due(now)
+
+    def next_poll(self) -> float | None:
+        return None if self.paused else super().next_poll()
+
+    def snapshot(self) -> GraphSnapshot:
+        return self._snapshot
+
+    def index(self, snapshot: GraphSnapshot | None = None) -> GraphIndex:
+        """The GraphIndex of a snapshot, built once and shared by readers."""
+        snapshot = snapshot or self._snapshot
+        with self._index_lock:
+            if self._index.generation != snapshot.generation:
+                self._index = GraphIndex(snapshot)
+            return self._index
+
+    def _link_topic(self, old: TopicInfo | None, new: TopicInfo | None) -> None:
+        """Move a topic's entries in the node to topics map from old to new."""
+        if old is not None:
+            for full_name in old.publishers | old.subscribers:
+                names = self._node_topics.get(full_name)
+                if names is not None:
+                    names.discard(old.name)
+                    if not names:
+                        del self._node_topics[full_name]
+        if new is not None:
+            for full_name in new.publishers | new.subscribers:
+                self._node_topics.setdefault(full_name, set()).add(new.name)
+
+    def _node_info(self, name: str, namespace: str, full_name: str) -> NodeInfo:
+        node = self.node.node
+        return NodeInfo(
+            name=name,
+            namespace=namespace,
+            full_name=full_name,
+            servers={
+                n: tuple(t)
+                for n, t in node.get_service_names_and_types_by_node(name, namespace)
+            },
+            clients={
+                n: tuple(t)
+                for n, t in node.get_client_names_and_types_by_node(name, namespace)
+            },
+        )
+
+    def _service_owners(
+        self,
+        services: Dict[str, Tuple[str, ...]],
+        nodes: Dict[str, NodeInfo],
+        joined: List[NodeInfo],
+    ) -> Set[str]:
+        """Nodes whose cached services may be stale after the service list moved.
+
+        Services that went away or changed type point at the nodes that had
+        them. A new service that none of the joined nodes offer or call is
+        put on the nodes named by its prefixes, and if there are none, on
+        every node.
+        """
+        previous = self._snapshot.services
+        gone = {name for name, types in previous.items() if services.get(name) != types}
+        added = services.keys() - previous.keys()
+        for info in joined:
+            added -= info.servers.keys() | info.clients.keys()
+        fetched = {info.full_name for info in joined}
+
+        owners: Set[str] = set()
+        for info in nodes.values():
+            if info.full_name in fetched:
+                continue
+            if not gone.isdisjoint(info.servers) or not gone.isdisjoint(info.clients):
+                owners.add(info.full_name)
+        for name in added:
+            prefixes = {name[:i] for i, c in enumerate(name) if c == "/" and i > 0}
+            named = (prefixes & nodes.keys()) - fetched
+            if not named:
+                return nodes.keys() - fetched
+            owners.update(named)
+        return owners
+
+    def poll(self) -> bool:
+        node = self.node.node
+        previous = self._snapshot
+
+        services = {n: tuple(t) for n, t in node.get_service_names_and_types()}
+        actions = {n: tuple(t) for n, t in node.handle.get_action_names_and_types()}
+        services_changed = services != previous.services
+
+        full_refresh = time.monotonic() >= self._refreshed_at
+        if full_refresh:
+            self._refreshed_at = time.monotonic() + self.full_refresh_interval
+        nodes: Dict[str, NodeInfo] = {}
+        joined: List[NodeInfo] = []
+        for name, namespace in node.get_node_names_and_namespaces():
+            full_name = fully_qualified_name(namespace, name)
+            cached = previous.nodes.get(full_name)
+            if cached is not None and not full_refresh:
+                nodes[full_name] = cached
+                continue
+            nodes[full_name] = self._node_info(name, namespace, full_name)
+            joined.append(nodes[full_name])
+        if services_changed and not full_refresh:
+            for full_name in self._service_owners(services, nodes, joined):
+                cached = nodes[full_name]
+                nodes[full_name] = self._node_info(
+                    cached.name, cached.namespace, full_name
+                )
+
+        # Topics a node that came or went had endpoints on, since a node can
+        # leave and another take its place without the counts moving.
+        moved: Set[str] = set()
+        for full_name in nodes.keys() ^ previous.nodes.keys():
+            moved.update(self._node_topics.get(full_name, ()))
+
+        topics: Dict[str, TopicInfo] = {}
+        counts: Dict[str, Tuple[int, int]] = {}
+        topics_changed = False
+        for name, types in node.get_topic_names_and_types():
+            counts[name] = (node.count_publishers(name), node.count_subscribers(name))
+            cached = previous.topics.get(name)
+            if (
+                cached is not None
+                and not full_refresh
+                and name not in moved
+                and cached.types == tuple(types)
+                and self._counts.get(name) == counts[name]
+            ):
+                topics[name] = cached
+                continue
+            topics[name] = TopicInfo(
+                name=name,
+                types=tuple(types),
+                publishers=endpoint_nodes(node.get_publishers_info_by_topic(name)),
+                subscribers=endpoint_nodes(node.get_subscriptions_info_by_topic(name)),
+            )
+            if topics[name] != cached:
+                topics_changed = True
+                self._link_topic(cached, topics[name])
+        for name in previous.topics.keys() - topics.keys():
+            topics_changed = True
+            self._link_topic(previous.topics[name], None)
+        self._counts = counts
+
+        if not (
+            nodes != previous.nodes
+            or topics_changed
+            or services_changed
+            or actions != previous.actions
+        ):
+            return False
+
+        log("Graph changed")
+        self._snapshot = GraphSnapshot(
+            generation=previous.generation + 1,
+            nodes=nodes,
+            topics=topics,
+            services=services,
+            actions=actions,
+        )
+        for listener in list(self.listeners):
+            listener.refresh()
+        return True
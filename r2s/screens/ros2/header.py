@@ -1,11 +1,12 @@
 from r2s.widgets.header import Header
 
+from textual import work
+from textual.message import Message
 from textual.widgets import Static
 
-from ros2doctor.api import platform
-
 import os
 import socket
+from threading import Lock
 
 TITLES = """r2s Version:
 ROS Version:
@@ -18,21 +19,62 @@ INFO = """0.0.1
 {hostname}
 {workspace}"""
 
+_distribution_lock = Lock()
+_distribution: str | None = None
+
+
+def ros_distribution() -> str:
+    """The name of the ROS distribution, or "" if it cannot be found.
+
+    ros2doctor takes seconds to import and report, so it is asked once per
+    process and the answer is shared by every header.
+    """
+    global _distribution
+    with _distribution_lock:
+        if _distribution is None:
+            _distribution = _probe_distribution()
+        return _distribution
+
+
+def _probe_distribution() -> str:
+    try:
+        from ros2doctor.api import platform
+    except ImportError:
+        return ""
+    report = platform.RosdistroReport().report()
+    for k, v in report.items:
+        if k == "distribution name":
+            return v
+    return ""
+
+
 class RosHeader(Header):
+    class Probed(Message):
+        """Posted when the ROS distribution is known."""
+
     def left(self):
         return Static(TITLES, classes="header-box")
 
     def center(self):
-        ros_version = ""
-        distro_report = platform.RosdistroReport()
-        report = distro_report.report()
-        for k, v in report.items:
-            if k == "distribution name":
-                ros_version = v
-                break
-        workspace = os.getcwd()
-        hostname = socket.gethostname()
-
-        return Static(INFO.format(
-            ros_version=ros_version, hostname=hostname, workspace=workspace
-        ), classes="header-box")
\ No newline at end of file
+        ros_version = _distribution if _distribution is not None else "…"
+        self.info = Static(self.format(ros_version), classes="header-box")
+        return self.info
+
+    def format(self, ros_version: str) -> str:
+        # The app's workspace is the one --workspace or $R2S_WORKSPACE chose.
+        workspace = getattr(self.app, "workspace", None) or os.getcwd()
+        return INFO.format(
+            ros_version=ros_version,
+            hostname=socket.gethostname(),
+            workspace=workspace,
+        )
+
+    def on_mount(self) -> None:
+        if _distribution is None:
+            self.probe()
+
+    @work(thread=True, exclusive=True, group="ros-header")
+    def probe(self) -> None:
+        ros_version = ros_distribution()
+        self.app.call_from_thread(self.info.update, self.format(ros_version))
+        self.post_message(RosHeader.Probed())
@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Tuple
+
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.message import Message
+from textual.reactive import reactive
+from textual.widget import Widget
+from textual.widgets import Footer
+
+from r2s.diff import Changes, SnapshotDiff
+from r2s.screens.ros2.graph import GraphCache
+from r2s.screens.ros2.header import RosHeader
+from r2s.screens.watcher_screen import WatcherScreen
+from r2s.watcher import WatcherBase
+from r2s.widgets import DataGrid
+
+# What the providing and consuming nodes of each kind of interface are called.
+ROLES = {
+    "topic": ("publisher", "subscriber"),
+    "service": ("server", "client"),
+    "action": ("server", "client"),
+}
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    role: str
+    node: str
+
+
+class EndpointsChanged(Message):
+    def __init__(self, changes: Changes[Endpoint], title: str) -> None:
+        self.changes = changes
+        self.title = title
+        super().__init__()
+
+
+class InterfaceDetailWatcher(WatcherBase):
+    """Lists the nodes providing and consuming one topic, service or action."""
+
+    target: Widget
+
+    interval: float = 0.5
+    max_interval: float = 5.0
+
+    def __init__(self, graph: GraphCache, name: str, type: str):
+        self.graph = graph
+        self.name = name
+        self.type = type
+        self.generation = -1
+        self.diff: SnapshotDiff[Endpoint] = SnapshotDiff()
+        super().__init__()
+
+    def start(self) -> None:
+        self.graph.listeners.append(self)
+        super().start()
+
+    def close(self) -> None:
+        if self in self.graph.listeners:
+            self.graph.listeners.remove(self)
+        super().close()
+
+    def endpoints(self) -> Tuple[Tuple[str, ...], FrozenSet[str], FrozenSet[str]]:
+        """The interface types, providers and consumers in the graph now."""
+        snapshot = self.graph.snapshot()
+        if self.type == "topic":
+            topic = snapshot.topics.get(self.name)
+            if topic is None:
+                return (), frozenset(), frozenset()
+            return topic.types, topic.publishers, topic.subscribers
+        index = self.graph.index(snapshot)
+        if self.type == "service":
+            types = snapshot.services.get(self.name, ())
+            return (types, *index.service_endpoints(self.name))
+        types = snapshot.actions.get(self.name, ())
+        return (types, *index.action_endpoints(self.name))
+
+    def poll(self) -> bool:
+        snapshot = self.graph.snapshot()
+        if snapshot.generation == self.generation:
+            return False
+        self.generation = snapshot.generation
+
+        types, providers, consumers = self.endpoints()
+        provider, consumer = ROLES[self.type]
+        endpoints: Dict[str, Endpoint] = {}
+        for role, nodes in ((provider, providers), (consumer, consumers)):
+            for node in nodes:
+                endpoints[f"{role} {node}"] = Endpoint(role=role, node=node)
+
+        title = f"{self.name} [{', '.join(types) or 'gone'}]"
+        changes = self.diff.update(endpoints)
+        self.target.post_message(EndpointsChanged(changes, title))
+        return bool(changes)
+
+
+class EndpointGrid(DataGrid):
+    title: reactive[str] = reactive("Endpoints")
+
+    search_columns = (1,)
+
+    def columns(self):
+        return ["Role", "Node"]
+
+    def row_values(self, endpoint: Endpoint) -> Tuple:
+        return (endpoint.role, endpoint.node)
+
+    def on_endpoints_changed(self, message: EndpointsChanged) -> None:
+        message.stop()
+        self.filter = message.title
+        if message.changes:
+            self.apply_changes(message.changes)
+
+
+class InterfaceDetailScreen(WatcherScreen):
+    BINDINGS = [
+        Binding("escape", "app.pop_screen", "Back", key_display="esc"),
+    ]
+
+    def __init__(self, graph: GraphCache, name: str, type: str) -> None:
+        self.watcher = InterfaceDetailWatcher(graph, name, type)
+        super().__init__()
+
+    async def on_mount(self) -> None:
+        grid = self.query_one(EndpointGrid)
+        grid.title = self.watcher.type.capitalize()
+        self.watcher.target = grid
+        self.watcher.start()
+
+    def compose(self) -> ComposeResult:
+        yield RosHeader()
+        yield EndpointGrid()
+        yield Footer()
@@ -1,115 +1,222 @@
-import time
 from dataclasses import dataclass
-from typing import List, Set
-
-from rich.text import Text
+from itertools import chain
+from typing import Dict, FrozenSet, List, Set, Tuple
 
 from textual import log
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.message import Message
 from textual.reactive import reactive
-from textual.screen import Screen
 from textual.widget import Widget
-from textual.widgets import DataTable, Footer
+from textual.widgets import Footer
 
+from r2s.diff import Changes, SnapshotDiff
+from r2s.screens.watcher_screen import WatcherScreen
 from r2s.watcher import WatcherBase
 from r2s.widgets import DataGrid, Header
+from r2s.widgets.data_grid.virtual_table import VirtualTable
+from r2s.screens.ros2.graph import (
+    GraphCache,
+    GraphIndex,
+    GraphSnapshot,
+    fully_qualified_name,
+    is_hidden_name,
+)
 from r2s.screens.ros2.header import RosHeader
+from r2s.screens.ros2.topic_stats import (
+    TopicStats,
+    TopicStatsChanged,
+    TopicStatsMonitor,
+)
+
+
+class TopicSelected(Message):
+    def __init__(self, topic: str, type: str) -> None:
+        self.topic = topic
+        self.type = type
+        super().__init__()
+
 
-@dataclass(frozen=True, eq=False)
+class InterfaceSelected(Message):
+    def __init__(self, name: str, type: str) -> None:
+        self.name = name
+        self.type = type
+        super().__init__()
+
+
+@dataclass(frozen=True)
 class Interface:
     name: str
     type: str
     interface: str
-    nodes: Set
+    nodes: FrozenSet[str]
     hidden: bool = False
+    # Publishers, servers or action servers, and their counterparts.
+    providers: FrozenSet[str] = frozenset()
+    consumers: FrozenSet[str] = frozenset()
+
 
-class InterfacesFetched(Message):
-    def __init__(self, interface_list: List[Interface]) -> None:
-        self.interface_list = interface_list 
+class InterfaceIndex:
+    """Which interfaces each node has, and the reverse, kept up to date.
+
+    Updated from the same changes as the grid's rows, so that filtering by
+    node is a lookup rather than a scan of every interface. Node names are
+    fully qualified, and are looked up as such even without a leading slash.
+    """
+
+    def __init__(self) -> None:
+        self.by_node: Dict[str, Set[str]] = {}
+        self.by_interface: Dict[str, FrozenSet[str]] = {}
+
+    def apply(self, changes: Changes[Interface]) -> None:
+        for key in changes.removed:
+            self._unlink(key)
+        for key, interface in chain(changes.added.items(), changes.changed.items()):
+            if self.by_interface.get(key) == interface.nodes:
+                continue
+            self._unlink(key)
+            self.by_interface[key] = interface.nodes
+            for node in interface.nodes:
+                self.by_node.setdefault(node, set()).add(key)
+
+    def _unlink(self, key: str) -> None:
+        for node in self.by_interface.pop(key, ()):
+            keys = self.by_node[node]
+            keys.discard(key)
+            if not keys:
+                del self.by_node[node]
+
+    def interfaces_of(self, node: str) -> FrozenSet[str]:
+        return frozenset(self.by_node.get(fully_qualified_name("/", node), ()))
+
+    def has(self, node: str, key: str) -> bool:
+        return key in self.by_node.get(fully_qualified_name("/", node), ())
+
+
+def snapshot_interfaces(
+    snapshot: GraphSnapshot, index: GraphIndex
+) -> Dict[str, Interface]:
+    """The topics, services and actions of a graph snapshot, by name."""
+    interfaces: Dict[str, Interface] = {}
+
+    for topic in snapshot.topics.values():
+        interfaces[topic.name] = Interface(
+            name=topic.name,
+            type="topic",
+            interface=topic.types[0],
+            nodes=topic.publishers | topic.subscribers,
+            hidden=is_hidden_name(topic.name),
+            providers=topic.publishers,
+            consumers=topic.subscribers,
+        )
+
+    for name, types in snapshot.services.items():
+        servers, clients = index.service_endpoints(name)
+        interfaces[name] = Interface(
+            name=name,
+            type="service",
+            interface=types[0],
+            nodes=servers | clients,
+            hidden=is_hidden_name(name),
+            providers=servers,
+            consumers=clients,
+        )
+
+    for name, types in snapshot.actions.items():
+        servers, clients = index.action_endpoints(name)
+        interfaces[name] = Interface(
+            name=name,
+            type="action",
+            interface=types[0],
+            nodes=servers | clients,
+            hidden=is_hidden_name(name),
+            providers=servers,
+            consumers=clients,
+        )
+
+    return interfaces
+
+
+class InterfacesChanged(Message):
+    def __init__(self, changes: Changes[Interface]) -> None:
+        self.changes = changes
         super().__init__()
 
 
 class InterfaceListWatcher(WatcherBase):
     target: Widget
 
-    def __init__(self, node):
-        self.node = node
+    interval: float = 0.5
+    max_interval: float = 5.0
+
+    def __init__(self, graph: GraphCache):
+        self.graph = graph
+        self.generation = 0
+        self.diff: SnapshotDiff[Interface] = SnapshotDiff()
+        self.stats = TopicStatsMonitor(graph.node)
         super().__init__()
 
-    def run(self) -> None:
-        while not self._exit_event.is_set():
-            interfaces: List[Interface] = []
-
-            topic_names_and_types = self.node.node.get_topic_names_and_types()
-
-            for t in topic_names_and_types:
-                topicPubs = self.node.node.get_publishers_info_by_topic(t[0])
-                topicSubs = self.node.node.get_subscriptions_info_by_topic(t[0])
-
-                nodes = set()
-                for p in topicPubs:
-                    if p.node_name[0] == "/":
-                        nodes.add(p)
-                    elif p.node_namespace == "/":
-                        nodes.add(p.node_namespace + p.node_name)
-                    else:
-                        nodes.add(p.node_namespace + "/" + p.node_name)
-                for p in topicSubs:
-                    if p.node_name[0] == "/":
-                        nodes.add(p)
-                    elif p.node_namespace == "/":
-                        nodes.add(p.node_namespace + p.node_name)
-                    else:
-                        nodes.add(p.node_namespace + "/" + p.node_name)
-                interfaces.append(Interface(
-                    name = t[0],
-                    type = "topic",
-                    interface = t[1][0],
-                    nodes = nodes
-                ))
-
-            service_names_and_types = self.node.node.get_service_names_and_types()
-
-            for s in service_names_and_types:
-                interfaces.append(Interface(
-                    name = s[0],
-                    type = "service",
-                    interface = s[1][0],
-                    nodes = {} 
-                ))
-
-            action_names_and_types = self.node.node.handle.get_action_names_and_types()
-            for a in action_names_and_types:
-                interfaces.append(Interface(
-                    name = a[0],
-                    type = "action",
-                    interface = a[1][0],
-                    nodes = {} 
-                ))
-
-            self.target.post_message(InterfacesFetched(interfaces))
-            time.sleep(0.5)
+    def start(self) -> None:
+        self.graph.listeners.append(self)
+        self.stats.start()
+        super().start()
+
+    def close(self) -> None:
+        if self in self.graph.listeners:
+            self.graph.listeners.remove(self)
+        self.stats.close()
+        super().close()
+
+    def pause(self) -> None:
+        self.stats.pause()
+        super().pause()
+
+    def resume(self) -> None:
+        self.stats.resume()
+        super().resume()
+
+    def poll(self) -> bool:
+        snapshot = self.graph.snapshot()
+        if snapshot.generation == self.generation:
+            return False
+        self.generation = snapshot.generation
+
+        interfaces = snapshot_interfaces(snapshot, self.graph.index(snapshot))
+        changes = self.diff.update(interfaces)
+        if changes:
+            self.target.post_message(InterfacesChanged(changes))
+        return bool(changes)
 
 
 class InterfaceListGrid(DataGrid):
     BINDINGS = [
         Binding("h", "toggle_hidden", "Toggle Hidden"),
-        Binding("t", "toggle_type", "Toggle Type")
+        Binding("t", "toggle_type", "Toggle Type"),
+        Binding("m", "toggle_stats", "Toggle Stats"),
+        Binding("d", "show_details", "Details"),
     ]
 
-    interfaces: List[Interface] = []
     title: reactive[str] = reactive("Interfaces")
     hidden: reactive[str] = reactive("visible")
     type: reactive[str] = reactive("all")
     filter_node: reactive[str] = reactive("")
+    stats: reactive[str] = reactive("off")
+
+    search_columns = (0, 2)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.stats_monitor: TopicStatsMonitor | None = None
+        self.topic_stats: Dict[str, TopicStats] = {}
+        self.index = InterfaceIndex()
 
     def set_filter(self) -> None:
         if self.filter_node:
             self.filter = self.filter_node + "," + self.hidden + "," + self.type
         else:
             self.filter = self.hidden + "," + self.type
+        if self.stats != "off":
+            self.filter += ",stats:" + self.stats
 
     def on_mount(self):
         self.title = "Interfaces"
@@ -135,88 +242,138 @@ class InterfaceListGrid(DataGrid):
         self.set_filter()
         self.populate_rows()
 
-    def watch_filter_node(self) -> None:
+    def action_toggle_stats(self) -> None:
+        if self.stats == "off":
+            self.stats = "visible"
+        elif self.stats == "visible":
+            self.stats = "all"
+        elif self.stats == "all":
+            self.stats = "off"
+            self.topic_stats = {}
         self.set_filter()
-        self.populate_rows()
-
-    def columns(self):
-        return ["Name", "Type", "Interface"]
-
-    def populate_rows(self):
-        table = self.query_one("#data_table", DataTable)
-        count = 0
-
-        nodes = set([n.name for n in self.interfaces])
-        to_remove = set()
-        for row in table.rows:
-            if row.value not in nodes:
-                to_remove.add(row)
-        for row in to_remove:
-            table.remove_row(row)
-
-        filter_style = self.get_component_rich_style("datagrid--filter-highlight")
-
-        for interface in self.interfaces:
-            prune = False
-
-            if len(self.filter_node) and self.filter_node not in interface.nodes:
-                prune = True
-
-            if not self.hidden == "all" and interface.hidden:
-                prune = True
+        if self.stats in ("visible", "off"):
+            self.reset_columns()
+        self.track_stats()
+
+    def track_stats(self) -> None:
+        """Measure the topics selected by the stats mode"""
+        if self.stats_monitor is None:
+            return
+        if self.stats == "all":
+            keys = self.records.keys()
+        elif self.stats == "visible":
+            keys = self.view
+        else:
+            keys = ()
+        self.stats_monitor.track(
+            {
+                key: self.records[key].interface
+                for key in keys
+                if self.records[key].type == "topic"
+            }
+        )
+
+    def show_view(self) -> None:
+        super().show_view()
+        self.track_stats()
+
+    def on_virtual_table_row_selected(self, message: VirtualTable.RowSelected) -> None:
+        message.stop()
+        interface = self.records.get(message.row_key)
+        if interface is None:
+            return
+        if interface.type == "topic":
+            self.post_message(TopicSelected(interface.name, interface.interface))
+        else:
+            self.post_message(InterfaceSelected(interface.name, interface.type))
 
-            if not self.type == "all" and self.type != interface.type:
-                prune = True
+    def action_show_details(self) -> None:
+        interface = self.records.get(self.query_one(VirtualTable).cursor_key)
+        if interface is not None:
+            self.post_message(InterfaceSelected(interface.name, interface.type))
 
-            name = Text(interface.name)
-            iface = Text(interface.interface)
+    def on_topic_stats_changed(self, message: TopicStatsChanged) -> None:
+        message.stop()
+        if self.stats == "off":
+            return
+        changes = message.changes
+        self.topic_stats.update(changes.added)
+        self.topic_stats.update(changes.changed)
+        for key in changes.removed:
+            self.topic_stats.pop(key, None)
+        keys = chain(changes.added, changes.changed, changes.removed)
+        self.apply_changes(
+            Changes(changed={k: self.records[k] for k in keys if k in self.records})
+        )
 
-            if self.search:
-                if (not name.highlight_words([self.search], filter_style) and
-                    not iface.highlight_words([self.search], filter_style)):
-                    prune = True
+    def watch_filter_node(self) -> None:
+        self.set_filter()
+        self.populate_rows()
 
-            if prune:
-                if interface.name in table.rows:
-                    table.remove_row(interface.name)
+    def columns(self):
+        columns = ["Name", "Type", "Interface"]
+        if self.stats != "off":
+            columns += ["Rate", "Jitter", "Bandwidth", "Size"]
+        return columns
+
+    def filter_view(self, search: str, mode: str) -> List[str]:
+        if not self.filter_node:
+            return super().filter_view(search, mode)
+        # Only the interfaces of the node need the other filters.
+        candidates = self.index.interfaces_of(self.filter_node)
+        if search:
+            candidates &= self.search_index.search(search, mode)
+        records = self.records.copy()
+        return [
+            key
+            for key in candidates
+            if key in records and self.filter_row(records[key])
+        ]
+
+    def filter_row(self, interface: Interface) -> bool:
+        if self.filter_node and not self.index.has(self.filter_node, interface.name):
+            return False
+        if not self.hidden == "all" and interface.hidden:
+            return False
+        if not self.type == "all" and self.type != interface.type:
+            return False
+        return True
+
+    def row_values(self, interface: Interface) -> Tuple:
+        values: Tuple = (interface.name, interface.type, interface.interface)
+        if self.stats != "off":
+            stats = self.topic_stats.get(interface.name)
+            if stats is None:
+                values += ("", "", "", "")
             else:
-                count = count + 1
-
-                if interface.name not in table.rows:
-                    table.add_row(
-                        name, interface.type, iface,
-                        key=interface.name
-                    )
-                else:
-                    table.update_cell(row_key=interface.name, column_key="name", value=name)
-                    table.update_cell(row_key=interface.name, column_key="interface", value=iface)
-        self.count = count
-
-    def on_interfaces_fetched(self, message: InterfacesFetched) -> None:
-        self.interfaces = message.interface_list
+                values += (stats.rate, stats.jitter, stats.bandwidth, stats.size)
+        return values
+
+    def on_interfaces_changed(self, message: InterfacesChanged) -> None:
         message.stop()
-        self.populate_rows()
+        self.index.apply(message.changes)
+        self.apply_changes(message.changes)
 
 
-class InterfaceListScreen(Screen):
+class InterfaceListScreen(WatcherScreen):
     CSS = """
     InterfaceListScreen {}
     """
 
     filter_node: reactive[str] = reactive("")
 
-    def __init__(self, node):
-        self.watcher = InterfaceListWatcher(node)
+    def __init__(self, graph: GraphCache):
+        self.watcher = InterfaceListWatcher(graph)
         super().__init__()
 
     async def on_mount(self) -> None:
-        self.watcher.target = self.query_one(InterfaceListGrid)
+        grid = self.query_one(InterfaceListGrid)
+        self.watcher.target = grid
+        self.watcher.stats.target = grid
+        grid.stats_monitor = self.watcher.stats
         self.watcher.start()
 
-    def on_unmount(self) -> None:
-        self.watcher.close()
-
     def compose(self) -> ComposeResult:
         yield RosHeader()
         yield InterfaceListGrid().data_bind(InterfaceListScreen.filter_node)
-        yield Footer()
\ No newline at end of file
+        yield Footer()
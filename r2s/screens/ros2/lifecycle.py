@@ -0,0 +1,169 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Event, RLock
+from typing import Dict, Iterable, List, Tuple
+
+from textual import log
+
+from r2s.watcher import WatcherBase
+
+
+@dataclass(frozen=True)
+class LifecycleStatus:
+    state: str | None = None
+    transitions: Tuple[str, ...] = ()
+    responding: bool = True
+
+
+class LifecycleMonitor(WatcherBase):
+    """Polls lifecycle node states concurrently, off the watcher threads.
+
+    Each node is queried on a bounded thread pool with a per-request timeout,
+    so a slow or dead node only delays its own row. Nodes that fail to answer
+    are retried with exponential backoff, and answers are cached until the
+    next refresh of that node.
+    """
+
+    interval: float = 0.25
+    max_interval: float = 1.0
+    refresh_interval: float = 2.0
+    timeout: float = 1.0
+    max_backoff: float = 30.0
+    max_workers: int = 8
+
+    def __init__(self, node) -> None:
+        self.node = node
+        self.generation = 0
+        self.listeners: List[WatcherBase] = []
+        self._lock = RLock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="lifecycle"
+        )
+        self._status: Dict[str, LifecycleStatus] = {}
+        self._due: Dict[str, float] = {}
+        self._backoff: Dict[str, float] = {}
+        self._pending: Dict[str, Future] = {}
+        self._clients: Dict[str, Tuple] = {}
+        self._closed = False
+        super().__init__()
+
+    def track(self, node_names: Iterable[str]) -> None:
+        """Set the lifecycle nodes to poll, forgetting any that went away."""
+        node_names = set(node_names)
+        now = time.monotonic()
+        with self._lock:
+            added = node_names - self._due.keys()
+            for name in added:
+                self._due[name] = now
+            for name in self._due.keys() - node_names:
+                del self._due[name]
+                self._backoff.pop(name, None)
+                if self._status.pop(name, None) is not None:
+                    self.generation += 1
+        if added:
+            self.refresh()
+
+    def status(self, full_name: str) -> LifecycleStatus | None:
+        return self._status.get(full_name)
+
+    def close(self) -> None:
+        super().close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._closed = True
+            clients, self._clients = self._clients, {}
+        for pair in clients.values():
+            for client in pair:
+                self.node.destroy_client(client)
+
+    def poll(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                name
+                for name, when in self._due.items()
+                if when <= now and name not in self._pending
+            ]
+            for name in due:
+                future = self._pool.submit(self._query, name)
+                self._pending[name] = future
+                future.add_done_callback(
+                    lambda future, name=name: self._done(name, future)
+                )
+            stale = [
+                self._clients.pop(name)
+                for name in list(self._clients)
+                if name not in self._due and name not in self._pending
+            ]
+        for clients in stale:
+            for client in clients:
+                self.node.destroy_client(client)
+        return bool(due)
+
+    def _done(self, name: str, future: Future) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._pending.pop(name, None)
+            if name not in self._due or future.cancelled():
+                return
+            error = future.exception()
+            if error is None:
+                status = future.result()
+                self._backoff.pop(name, None)
+                self._due[name] = now + self.refresh_interval
+            else:
+                log(f"Lifecycle query for {name} failed: {error!r}")
+                backoff = min(
+                    self.max_backoff,
+                    2 * self._backoff.get(name, self.refresh_interval / 2),
+                )
+                self._backoff[name] = backoff
+                self._due[name] = now + backoff
+                previous = self._status.get(name, LifecycleStatus())
+                status = LifecycleStatus(
+                    state=previous.state,
+                    transitions=previous.transitions,
+                    responding=False,
+                )
+            if self._status.get(name) == status:
+                return
+            self._status[name] = status
+            self.generation += 1
+        for listener in list(self.listeners):
+            listener.refresh()
+
+    def _query(self, name: str) -> LifecycleStatus:
+        from lifecycle_msgs.srv import GetAvailableTransitions, GetState
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The lifecycle monitor is closed")
+            if name not in self._clients:
+                self._clients[name] = (
+                    self.node.create_client(GetState, f"{name}/get_state"),
+                    self.node.create_client(
+                        GetAvailableTransitions, f"{name}/get_available_transitions"
+                    ),
+                )
+            get_state, get_transitions = self._clients[name]
+        state = self._call(get_state, GetState.Request())
+        transitions = self._call(get_transitions, GetAvailableTransitions.Request())
+        return LifecycleStatus(
+            state=state.current_state.label,
+            transitions=tuple(
+                t.transition.label.upper() for t in transitions.available_transitions
+            ),
+        )
+
+    def _call(self, client, request):
+        """Call a service, giving up after `timeout` seconds."""
+        if not client.service_is_ready():
+            raise TimeoutError(f"{client.srv_name} is not available")
+        done = Event()
+        future = client.call_async(request)
+        future.add_done_callback(lambda _: done.set())
+        if not done.wait(self.timeout):
+            client.remove_pending_request(future)
+            raise TimeoutError(f"{client.srv_name} timed out")
+        return future.result()
@@ -0,0 +1,48 @@
+import os
+from pathlib import Path
+from typing import List
+
+from textual.app import ComposeResult
+from textual.screen import Screen
+from textual.widgets import Footer
+
+from r2s.screens.ros2.header import RosHeader
+from r2s.widgets.log_view import LogView
+from r2s.widgets.log_view.log_lines import LogLines
+
+
+def ros_log_dir() -> Path:
+    """The directory ROS 2 writes log files to."""
+    if "ROS_LOG_DIR" in os.environ:
+        return Path(os.environ["ROS_LOG_DIR"]).expanduser()
+    if "ROS_HOME" in os.environ:
+        return Path(os.environ["ROS_HOME"]).expanduser() / "log"
+    return Path.home() / ".ros" / "log"
+
+
+def recent_log_files(directory: Path, limit: int = 20) -> List[Path]:
+    """The most recent node logs and latest launch logs, oldest first."""
+    paths = [*directory.glob("*.log"), *directory.glob("latest/*.log")]
+    files = []
+    for path in paths:
+        try:
+            files.append((path.stat().st_mtime, path))
+        except OSError:
+            continue
+    files.sort()
+    return [path for _, path in files[-limit:]]
+
+
+class LogScreen(Screen):
+    def __init__(self, memory_limit: int = 32 * 1024 * 1024) -> None:
+        self.memory_limit = memory_limit
+        super().__init__()
+
+    async def on_mount(self) -> None:
+        lines = self.query_one(LogLines)
+        lines.load_files(recent_log_files(ros_log_dir()))
+
+    def compose(self) -> ComposeResult:
+        yield RosHeader()
+        yield LogView(memory_limit=self.memory_limit)
+        yield Footer()
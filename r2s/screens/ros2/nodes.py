@@ -1,31 +1,37 @@
-import time
 from dataclasses import dataclass
-from typing import List
-
-from rich.text import Text
+from typing import Dict, Tuple
 
 from textual import log
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.message import Message
 from textual.reactive import reactive
-from textual.screen import Screen
 from textual.widget import Widget
-from textual.widgets import DataTable, Footer
+from textual.widgets import Footer
 
+from r2s.diff import Changes, SnapshotDiff
+from r2s.screens.watcher_screen import WatcherScreen
 from r2s.watcher import WatcherBase
 from r2s.widgets import DataGrid, Header
+from r2s.widgets.data_grid.virtual_table import VirtualTable
+from r2s.screens.ros2.graph import GraphCache
 from r2s.screens.ros2.header import RosHeader
+from r2s.screens.ros2.lifecycle import LifecycleMonitor
 
-import ros2node.api
-import ros2lifecycle.api
 
 class NodeSelected(Message):
     def __init__(self, node_name: str) -> None:
         self.node_name = node_name
         super().__init__()
 
-@dataclass(frozen=True, eq=False)
+
+class ParametersRequested(Message):
+    def __init__(self, node_name: str) -> None:
+        self.node_name = node_name
+        super().__init__()
+
+
+@dataclass(frozen=True)
 class Node:
     namespace: str
     name: str
@@ -36,88 +42,98 @@ class Node:
     service_servers: int
     service_clients: int
     state: str | None = None
-    transitions: List[str] = None
+    transitions: Tuple[str, ...] = ()
 
 
-class NodesFetched(Message):
-    def __init__(self, node_list: List[Node]) -> None:
-        self.node_list = node_list
+class NodesChanged(Message):
+    def __init__(self, changes: Changes[Node]) -> None:
+        self.changes = changes
         super().__init__()
 
 
 class NodeListWatcher(WatcherBase):
     target: Widget
 
-    def __init__(self, node):
-        self.node = node
-        super().__init__()
-
-    def run(self) -> None:
-        while not self._exit_event.is_set():
-            nodes: List[Node] = []
+    interval: float = 0.5
+    max_interval: float = 5.0
 
-            node_names_and_namespaces = self.node.node.get_node_names_and_namespaces()
-
-            lifecycle_node_names = ros2lifecycle.api.get_node_names(
-                node=self.node.node, include_hidden_nodes=True
-            )
-            lc_nodes = [n.full_name for n in lifecycle_node_names]
-
-            lifecycle_node_states = ros2lifecycle.api.call_get_states(
-                node=self.node.node, node_names=lc_nodes
-            )
+    def __init__(self, graph: GraphCache):
+        self.graph = graph
+        self.lifecycle = LifecycleMonitor(graph.node)
+        self.generation = 0
+        self.lifecycle_generation = 0
+        self.diff: SnapshotDiff[Node] = SnapshotDiff()
+        super().__init__()
 
-            lifecycle_node_transitions = ros2lifecycle.api.call_get_available_transitions(
-                node=self.node.node, states=lifecycle_node_states
+    def start(self) -> None:
+        self.graph.listeners.append(self)
+        self.lifecycle.listeners.append(self)
+        self.lifecycle.start()
+        super().start()
+
+    def close(self) -> None:
+        if self in self.graph.listeners:
+            self.graph.listeners.remove(self)
+        self.lifecycle.close()
+        super().close()
+
+    def pause(self) -> None:
+        self.lifecycle.pause()
+        super().pause()
+
+    def resume(self) -> None:
+        self.lifecycle.resume()
+        super().resume()
+
+    def poll(self) -> bool:
+        snapshot = self.graph.snapshot()
+        if (
+            snapshot.generation == self.generation
+            and self.lifecycle.generation == self.lifecycle_generation
+        ):
+            return False
+        self.generation = snapshot.generation
+        self.lifecycle_generation = self.lifecycle.generation
+
+        nodes: Dict[str, Node] = {}
+
+        index = self.graph.index(snapshot)
+        self.lifecycle.track(index.lifecycle_nodes)
+
+        for full_name, info in snapshot.nodes.items():
+            counts = index.node_counts(full_name)
+            lifecycle = self.lifecycle.status(full_name)
+
+            nodes[full_name] = Node(
+                name=info.name,
+                namespace=info.namespace,
+                full_name=full_name,
+                hidden=info.hidden,
+                subscribers=counts.subscribers,
+                publishers=counts.publishers,
+                service_servers=counts.service_servers,
+                service_clients=counts.service_clients,
+                state=lifecycle.state if lifecycle else None,
+                transitions=lifecycle.transitions if lifecycle else (),
             )
 
-            for t in node_names_and_namespaces:
-                hidden = t[0].startswith(ros2node.api.HIDDEN_NODE_PREFIX)
-                full_name = t[1] + ("" if t[1].endswith("/") else "/") + t[0]
-                subscribers = ros2node.api.get_subscriber_info(node=self.node.node, remote_node_name=full_name)
-                publishers = ros2node.api.get_publisher_info(node=self.node.node, remote_node_name=full_name)
-
-                service_servers = ros2node.api.get_service_server_info(node=self.node.node, remote_node_name=full_name)
-                service_clients = ros2node.api.get_service_client_info(node=self.node.node, remote_node_name=full_name)
-
-                state = None
-                transitions = []
-
-                if full_name in lc_nodes:
-                    state = lifecycle_node_states[full_name]
-                    transitions = [
-                        t.transition.label.upper()
-                        for t in lifecycle_node_transitions[full_name]
-                    ]
-
-                nodes.append(
-                    Node(
-                        name=t[0],
-                        namespace=t[1],
-                        full_name=full_name,
-                        hidden=hidden,
-                        subscribers=len(subscribers),
-                        publishers=len(publishers),
-                        service_servers=len(service_servers),
-                        service_clients=len(service_clients),
-                        state = state,
-                        transitions = []
-                    )
-                )
-
-            self.target.post_message(NodesFetched(nodes))
-            time.sleep(0.5)
+        changes = self.diff.update(nodes)
+        if changes:
+            self.target.post_message(NodesChanged(changes))
+        return bool(changes)
 
 
 class NodeListGrid(DataGrid):
     BINDINGS = [
-        Binding("h", "toggle_hidden", "Toggle Hidden")
+        Binding("h", "toggle_hidden", "Toggle Hidden"),
+        Binding("a", "show_parameters", "Parameters"),
     ]
 
-    nodes: List[Node] = []
     title: reactive[str] = reactive("Nodes")
     hidden: reactive[str] = reactive("visible")
 
+    search_columns = (0, 1)
+
     def on_mount(self):
         self.title = "Nodes"
         self.filter = self.hidden
@@ -130,85 +146,58 @@ class NodeListGrid(DataGrid):
         self.filter = self.hidden
         self.populate_rows()
 
+    def action_show_parameters(self) -> None:
+        node_name = self.query_one(VirtualTable).cursor_key
+        if node_name is not None:
+            self.post_message(ParametersRequested(node_name))
+
     def columns(self):
-        return ["Namespace", "Name", #"Full Name", 
-                "Subscribers", "Publishers", 
-                "Service Servers", "Service Clients",
-                "Lifecycle"]
-
-    def populate_rows(self):
-        table = self.query_one("#data_table", DataTable)
-        count = 0
-
-        nodes = set([n.full_name for n in self.nodes])
-        to_remove = set()
-        for row in table.rows:
-            if row.value not in nodes:
-                to_remove.add(row)
-        for row in to_remove:
-            table.remove_row(row)
-
-        filter_style = self.get_component_rich_style("datagrid--filter-highlight")
-
-        for node in self.nodes:
-            prune = False
-
-            if not self.hidden == "all" and node.hidden:
-                prune = True
-
-            ns = Text(node.namespace)
-            name = Text(node.name)
-
-            if self.search:
-                if (not ns.highlight_words([self.search], filter_style) and
-                    not name.highlight_words([self.search], filter_style)):
-                    prune = True
-
-            if prune:
-                if node.full_name in table.rows:
-                    table.remove_row(node.full_name)
-            else:
-                count = count + 1
-
-                if node.full_name not in table.rows:
-                    table.add_row(
-                        ns, name, #node.full_name, 
-                        node.subscribers, node.publishers, 
-                        node.service_servers, node.service_clients, 
-                        node.state.label if node.state else "",
-                        key=node.full_name
-                    )
-                else:
-                    table.update_cell(row_key=node.full_name, column_key="namespace", value=ns)
-                    table.update_cell(row_key=node.full_name, column_key="name", value=name)
-        self.count = count
-
-    def on_data_table_row_selected(self, message: DataTable.RowSelected) -> None:
+        return [
+            "Namespace",
+            "Name",  # "Full Name",
+            "Subscribers",
+            "Publishers",
+            "Service Servers",
+            "Service Clients",
+            "Lifecycle",
+        ]
+
+    def filter_row(self, node: Node) -> bool:
+        return self.hidden == "all" or not node.hidden
+
+    def row_values(self, node: Node) -> Tuple:
+        return (
+            node.namespace,
+            node.name,  # node.full_name,
+            node.subscribers,
+            node.publishers,
+            node.service_servers,
+            node.service_clients,
+            node.state or "",
+        )
+
+    def on_virtual_table_row_selected(self, message: VirtualTable.RowSelected) -> None:
         message.stop()
-        self.post_message(NodeSelected(node_name=message.row_key.value))
+        self.post_message(NodeSelected(node_name=message.row_key))
 
-    def on_nodes_fetched(self, message: NodesFetched) -> None:
-        self.nodes = message.node_list
+    def on_nodes_changed(self, message: NodesChanged) -> None:
         message.stop()
-        self.populate_rows()
+        self.apply_changes(message.changes)
 
 
-class NodeListScreen(Screen):
+class NodeListScreen(WatcherScreen):
     CSS = """
     PackageListScreen {}
     """
 
-    def __init__(self, node):
-        self.watcher = NodeListWatcher(node)
+    def __init__(self, graph: GraphCache):
+        self.watcher = NodeListWatcher(graph)
         super().__init__()
 
     async def on_mount(self) -> None:
         self.watcher.target = self.query_one(NodeListGrid)
         self.watcher.start()
 
-    def on_unmount(self) -> None:
-        self.watcher.close()
-
     def compose(self) -> ComposeResult:
         yield RosHeader()
         yield NodeListGrid()
@@ -0,0 +1,485 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Event, Lock, RLock
+from typing import Dict, Iterable, List, Set, Tuple
+
+from textual import log
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.message import Message
+from textual.reactive import reactive
+from textual.widget import Widget
+from textual.widgets import Footer
+
+from r2s.diff import Changes, SnapshotDiff
+from r2s.screens.ros2.graph import GraphCache
+from r2s.screens.ros2.header import RosHeader
+from r2s.screens.watcher_screen import WatcherScreen
+from r2s.watcher import WatcherBase
+from r2s.widgets import DataGrid
+
+# rcl_interfaces/msg/ParameterType, and the ParameterValue field of each.
+PARAMETER_TYPES = {
+    1: ("bool", "bool_value"),
+    2: ("integer", "integer_value"),
+    3: ("double", "double_value"),
+    4: ("string", "string_value"),
+    5: ("byte[]", "byte_array_value"),
+    6: ("bool[]", "bool_array_value"),
+    7: ("integer[]", "integer_array_value"),
+    8: ("double[]", "double_array_value"),
+    9: ("string[]", "string_array_value"),
+}
+
+
+def parameter_type(value) -> str:
+    return PARAMETER_TYPES.get(value.type, ("not set", None))[0]
+
+
+def format_value(value) -> str:
+    """Show an rcl_interfaces/msg/ParameterValue like `ros2 param get`."""
+    kind, field = PARAMETER_TYPES.get(value.type, ("not set", None))
+    if field is None:
+        return ""
+    data = getattr(value, field)
+    if kind.endswith("[]"):
+        return "[" + ", ".join(str(item) for item in data) + "]"
+    return str(data)
+
+
+@dataclass(frozen=True)
+class Parameter:
+    node: str
+    name: str
+    type: str
+    value: str
+    description: str = ""
+    read_only: bool = False
+
+
+class ParameterCache:
+    """Parameters of nodes, fetched in bulk and kept fresh by events.
+
+    A fetch fans out to every requested node at once: the service clients
+    are created together, then all list_parameters requests are sent, then
+    all get_parameters and describe_parameters requests, each round bounded
+    by `timeout`. Fetches run on a thread of their own so that waiting on
+    unresponsive nodes never ties up a watcher thread. Fetched nodes are
+    then updated from /parameter_events rather than polled, and only
+    fetched again when invalidated. Events for a node that is being fetched
+    are held back and applied on top of the fetched values, which may be
+    older than they are.
+    """
+
+    timeout: float = 2.0
+
+    def __init__(self, node) -> None:
+        self.node = node
+        self.generation = 0
+        self.listeners: List[WatcherBase] = []
+        self.subscription = None
+        self._lock = RLock()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="parameters")
+        self._parameters: Dict[str, Dict[str, Parameter]] = {}
+        self._errors: Dict[str, str] = {}
+        self._pending: Set[str] = set()
+        self._held: Dict[str, List] = {}
+
+    def start(self) -> None:
+        """Subscribe to parameter events, if not subscribed yet."""
+        with self._lock:
+            if self.subscription is not None:
+                return
+            try:
+                from rcl_interfaces.msg import ParameterEvent
+                from rclpy.qos import qos_profile_parameter_events
+
+                self.subscription = self.node.create_subscription(
+                    ParameterEvent,
+                    "/parameter_events",
+                    self.receive,
+                    qos_profile_parameter_events,
+                )
+            except Exception as ex:
+                log(f"Cannot subscribe to /parameter_events: {ex!r}")
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            if self.subscription is not None:
+                self.node.destroy_subscription(self.subscription)
+                self.subscription = None
+
+    def parameters(self, node_name: str) -> Dict[str, Parameter] | None:
+        return self._parameters.get(node_name)
+
+    def status(self, node_name: str) -> str | None:
+        """Why a node has no parameters to show, if it has none."""
+        if node_name in self._pending:
+            return "fetching"
+        return self._errors.get(node_name)
+
+    def request(self, node_names: Iterable[str]) -> None:
+        """Fetch the parameters of the nodes that are not cached yet."""
+        with self._lock:
+            missing = [
+                name
+                for name in node_names
+                if name not in self._parameters
+                and name not in self._errors
+                and name not in self._pending
+            ]
+            if not missing:
+                return
+            self._pending.update(missing)
+            self._pool.submit(self._fetch, missing)
+        self._notify()
+
+    def invalidate(self, node_names: Iterable[str]) -> None:
+        """Forget cached parameters and errors, so they are fetched again."""
+        with self._lock:
+            for name in node_names:
+                self._parameters.pop(name, None)
+                self._errors.pop(name, None)
+            self.generation += 1
+
+    def retain(self, node_names: Iterable[str]) -> None:
+        """Forget the nodes that left the graph."""
+        node_names = set(node_names)
+        with self._lock:
+            gone = (self._parameters.keys() | self._errors.keys()) - node_names
+            for name in gone:
+                self._parameters.pop(name, None)
+                self._errors.pop(name, None)
+            for name in self._held.keys() - node_names:
+                del self._held[name]
+            if gone:
+                self.generation += 1
+
+    def receive(self, event) -> None:
+        with self._lock:
+            if event.node in self._pending:
+                self._held.setdefault(event.node, []).append(event)
+                return
+            if not self._apply(event):
+                return
+        self._notify()
+
+    def _apply(self, event) -> bool:
+        """Update cached parameters from an event, if the node is cached."""
+        cached = self._parameters.get(event.node)
+        if cached is None:
+            return False
+        parameters = dict(cached)
+        for parameter in (*event.new_parameters, *event.changed_parameters):
+            previous = parameters.get(parameter.name)
+            parameters[parameter.name] = Parameter(
+                node=event.node,
+                name=parameter.name,
+                type=parameter_type(parameter.value),
+                value=format_value(parameter.value),
+                description=previous.description if previous else "",
+                read_only=previous.read_only if previous else False,
+            )
+        for parameter in event.deleted_parameters:
+            parameters.pop(parameter.name, None)
+        self._parameters[event.node] = parameters
+        self.generation += 1
+        return True
+
+    def _notify(self) -> None:
+        for listener in list(self.listeners):
+            listener.refresh()
+
+    def _fetch(self, node_names: List[str]) -> None:
+        clients: Dict[str, Tuple] = {}
+        results: Dict[str, Dict[str, Parameter]] = {}
+        errors: Dict[str, str] = {}
+        try:
+            from rcl_interfaces.srv import (
+                DescribeParameters,
+                GetParameters,
+                ListParameters,
+            )
+
+            for name in node_names:
+                try:
+                    clients[name] = (
+                        self.node.create_client(
+                            ListParameters, f"{name}/list_parameters"
+                        ),
+                        self.node.create_client(
+                            GetParameters, f"{name}/get_parameters"
+                        ),
+                        self.node.create_client(
+                            DescribeParameters, f"{name}/describe_parameters"
+                        ),
+                    )
+                except Exception as ex:
+                    errors[name] = f"error: {ex}"
+
+            # New clients need discovery to match their servers first.
+            ready = self._wait_ready(clients)
+            for name in clients.keys() - ready:
+                errors[name] = "no parameter services"
+
+            listed = self._call_all(
+                {name: (clients[name][0], ListParameters.Request()) for name in ready}
+            )
+            names: Dict[str, List[str]] = {}
+            for name, response in listed.items():
+                if isinstance(response, Exception):
+                    errors[name] = str(response)
+                else:
+                    names[name] = list(response.result.names)
+
+            calls = {}
+            for name, parameter_names in names.items():
+                _, get, describe = clients[name]
+                calls[name, "get"] = (get, GetParameters.Request(names=parameter_names))
+                calls[name, "describe"] = (
+                    describe,
+                    DescribeParameters.Request(names=parameter_names),
+                )
+            answers = self._call_all(calls)
+
+            for name, parameter_names in names.items():
+                values = answers[name, "get"]
+                descriptors = answers[name, "describe"]
+                if isinstance(values, Exception):
+                    errors[name] = str(values)
+                    continue
+                if isinstance(descriptors, Exception):
+                    # Values are still worth showing without descriptions.
+                    descriptors = None
+                parameters = {}
+                for i, (parameter, value) in enumerate(
+                    zip(parameter_names, values.values)
+                ):
+                    descriptor = descriptors.descriptors[i] if descriptors else None
+                    parameters[parameter] = Parameter(
+                        node=name,
+                        name=parameter,
+                        type=parameter_type(value),
+                        value=format_value(value),
+                        description=descriptor.description if descriptor else "",
+                        read_only=descriptor.read_only if descriptor else False,
+                    )
+                results[name] = parameters
+        except Exception as ex:
+            log(f"Parameter fetch failed: {ex!r}")
+            for name in node_names:
+                if name not in results:
+                    errors.setdefault(name, f"error: {ex}")
+        finally:
+            for client in (client for group in clients.values() for client in group):
+                self.node.destroy_client(client)
+
+        self._store(node_names, results, errors)
+
+    def _store(
+        self,
+        node_names: List[str],
+        results: Dict[str, Dict[str, Parameter]],
+        errors: Dict[str, str],
+    ) -> None:
+        """Record the outcome of a fetch, then the events held back during it."""
+        with self._lock:
+            self._pending.difference_update(node_names)
+            self._parameters.update(results)
+            self._errors.update(errors)
+            for name in node_names:
+                for event in self._held.pop(name, ()):
+                    self._apply(event)
+            self.generation += 1
+        self._notify()
+
+    def _wait_ready(self, clients: Dict[str, Tuple]) -> Set[str]:
+        """The nodes whose parameter services all matched within `timeout`."""
+        deadline = time.monotonic() + self.timeout
+        waiting = dict(clients)
+        ready: Set[str] = set()
+        while waiting:
+            for name, group in list(waiting.items()):
+                if all(client.service_is_ready() for client in group):
+                    ready.add(name)
+                    del waiting[name]
+            if not waiting or time.monotonic() >= deadline:
+                break
+            time.sleep(0.05)
+        return ready
+
+    def _call_all(self, calls: Dict) -> Dict:
+        """Send every request at once and wait for all answers together.
+
+        Answers that do not arrive within `timeout` are TimeoutErrors.
+        """
+        if not calls:
+            return {}
+        remaining = [len(calls)]
+        counter = Lock()
+        done = Event()
+
+        def answered(_) -> None:
+            with counter:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    done.set()
+
+        futures = {}
+        for key, (client, request) in calls.items():
+            futures[key] = client.call_async(request)
+            futures[key].add_done_callback(answered)
+        done.wait(self.timeout)
+
+        answers = {}
+        for key, future in futures.items():
+            client = calls[key][0]
+            if future.done() and future.exception() is None:
+                answers[key] = future.result()
+            elif future.done():
+                answers[key] = future.exception()
+            else:
+                client.remove_pending_request(future)
+                answers[key] = TimeoutError("timed out")
+        return answers
+
+
+class ParametersChanged(Message):
+    def __init__(self, changes: Changes[Parameter], status: str) -> None:
+        self.changes = changes
+        self.status = status
+        super().__init__()
+
+
+class ParameterWatcher(WatcherBase):
+    """Shows the cached parameters of one node, or of every visible node."""
+
+    target: Widget
+
+    interval: float = 0.25
+    max_interval: float = 2.0
+
+    def __init__(self, graph: GraphCache, cache: ParameterCache, node_name: str):
+        self.graph = graph
+        self.cache = cache
+        self.node_name = node_name
+        self.all_nodes = False
+        self.generations = (-1, -1)
+        self.diff: SnapshotDiff[Parameter] = SnapshotDiff()
+        super().__init__()
+
+    def start(self) -> None:
+        self.cache.start()
+        self.graph.listeners.append(self)
+        self.cache.listeners.append(self)
+        super().start()
+
+    def close(self) -> None:
+        for listeners in (self.graph.listeners, self.cache.listeners):
+            if self in listeners:
+                listeners.remove(self)
+        super().close()
+
+    def set_scope(self, all_nodes: bool) -> None:
+        self.all_nodes = all_nodes
+        self.generations = (-1, -1)
+        self.refresh()
+
+    def node_names(self) -> List[str]:
+        nodes = self.graph.snapshot().nodes
+        if self.all_nodes:
+            return [name for name, info in nodes.items() if not info.hidden]
+        return [self.node_name]
+
+    def invalidate(self) -> None:
+        self.cache.invalidate(self.node_names())
+        self.refresh()
+
+    def poll(self) -> bool:
+        snapshot = self.graph.snapshot()
+        generations = (snapshot.generation, self.cache.generation)
+        if generations == self.generations:
+            return False
+        self.generations = generations
+
+        if snapshot.nodes:
+            self.cache.retain(snapshot.nodes)
+        node_names = self.node_names()
+        self.cache.request(node_names)
+
+        parameters: Dict[str, Parameter] = {}
+        statuses: Dict[str, int] = {}
+        for name in node_names:
+            for parameter in (self.cache.parameters(name) or {}).values():
+                parameters[f"{name} {parameter.name}"] = parameter
+            status = self.cache.status(name)
+            if status is not None:
+                statuses[status] = statuses.get(status, 0) + 1
+
+        status = "all nodes" if self.all_nodes else self.node_name
+        if statuses:
+            status += ": " + ", ".join(f"{n} {s}" for s, n in statuses.items())
+        changes = self.diff.update(parameters)
+        self.target.post_message(ParametersChanged(changes, status))
+        return bool(changes)
+
+
+class ParameterListGrid(DataGrid):
+    BINDINGS = [Binding("g", "toggle_scope", "All Nodes")]
+
+    title: reactive[str] = reactive("Parameters")
+
+    search_columns = (0, 1, 3)
+
+    def __init__(self, watcher: ParameterWatcher) -> None:
+        self.watcher = watcher
+        super().__init__()
+
+    def on_mount(self):
+        self.title = "Parameters"
+
+    def action_toggle_scope(self) -> None:
+        self.watcher.set_scope(not self.watcher.all_nodes)
+
+    def columns(self):
+        return ["Node", "Name", "Type", "Value", "Read Only", "Description"]
+
+    def row_values(self, parameter: Parameter) -> Tuple:
+        return (
+            parameter.node,
+            parameter.name,
+            parameter.type,
+            parameter.value,
+            "yes" if parameter.read_only else "",
+            parameter.description,
+        )
+
+    def on_parameters_changed(self, message: ParametersChanged) -> None:
+        message.stop()
+        self.filter = message.status
+        if message.changes:
+            self.apply_changes(message.changes)
+
+
+class ParameterScreen(WatcherScreen):
+    BINDINGS = [
+        Binding("escape", "app.pop_screen", "Back", key_display="esc"),
+    ]
+
+    def __init__(self, graph: GraphCache, cache: ParameterCache, node_name: str):
+        self.watcher = ParameterWatcher(graph, cache, node_name)
+        super().__init__()
+
+    async def on_mount(self) -> None:
+        self.watcher.target = self.query_one(ParameterListGrid)
+        self.watcher.start()
+
+    def action_refresh_watcher(self) -> None:
+        self.watcher.invalidate()
+
+    def compose(self) -> ComposeResult:
+        yield RosHeader()
+        yield ParameterListGrid(self.watcher)
+        yield Footer()
@@ -0,0 +1,228 @@
+from array import array
+from threading import Lock
+from typing import Dict, List
+
+import numpy as np
+from textual import log
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.message import Message
+from textual.reactive import reactive
+from textual.widget import Widget
+from textual.widgets import Footer
+
+from r2s.screens.ros2.header import RosHeader
+from r2s.screens.watcher_screen import WatcherScreen
+from r2s.watcher import WatcherBase
+from r2s.widgets.log_view import LogView
+from r2s.widgets.log_view.log_lines import LogLines
+
+SEVERITIES = {10: "DEBUG", 20: "INFO", 30: "WARN", 40: "ERROR", 50: "FATAL"}
+
+
+class RosoutBatch(Message):
+    def __init__(
+        self, lines: List[str], levels: List[int], loggers: List[str], dropped: int
+    ) -> None:
+        self.lines = lines
+        self.levels = levels
+        self.loggers = loggers
+        self.dropped = dropped
+        super().__init__()
+
+
+class RosoutWatcher(WatcherBase):
+    """Collects /rosout messages and posts them to `target` in batches.
+
+    The subscription callback only queues each message. Polls run at most
+    `1 / interval` times a second, format the queued messages on a watcher
+    thread and post them as one batch, so a log storm costs the UI one
+    update per frame. Multi-line messages take one line per line of text,
+    each tagged with the message's severity and logger. At most
+    `max_pending` messages wait between polls; the rest are counted as
+    dropped.
+    """
+
+    target: Widget
+
+    interval: float = 0.1
+    max_interval: float = 0.25
+    max_pending: int = 100_000
+
+    def __init__(self, node) -> None:
+        self.node = node
+        self.subscription = None
+        self.failed = False
+        self._lock = Lock()
+        self._pending: list = []
+        self._dropped = 0
+        super().__init__()
+
+    def receive(self, message) -> None:
+        with self._lock:
+            if len(self._pending) < self.max_pending:
+                self._pending.append(message)
+            else:
+                self._dropped += 1
+
+    def close(self) -> None:
+        super().close()
+        if self.subscription is not None:
+            self.node.destroy_subscription(self.subscription)
+            self.subscription = None
+
+    def subscribe(self) -> None:
+        from rcl_interfaces.msg import Log
+        from rclpy.qos import DurabilityPolicy, QoSProfile, ReliabilityPolicy
+
+        # Matches the publishers' profile, so recent history is replayed.
+        qos = QoSProfile(
+            depth=1000,
+            reliability=ReliabilityPolicy.RELIABLE,
+            durability=DurabilityPolicy.TRANSIENT_LOCAL,
+        )
+        self.subscription = self.node.create_subscription(
+            Log, "/rosout", self.receive, qos
+        )
+
+    def poll(self) -> bool:
+        if self.failed:
+            return False
+        if self.subscription is None:
+            try:
+                self.subscribe()
+            except Exception as ex:
+                self.failed = True
+                log(f"Cannot subscribe to /rosout: {ex!r}")
+                self.target.post_message(
+                    RosoutBatch([f"Cannot subscribe to /rosout: {ex}"], [], [], 0)
+                )
+                return False
+        with self._lock:
+            pending, self._pending = self._pending, []
+            dropped, self._dropped = self._dropped, 0
+        if not pending and not dropped:
+            return False
+        lines, levels, loggers = [], [], []
+        for message in pending:
+            severity = SEVERITIES.get(message.level, str(message.level))
+            stamp = f"{message.stamp.sec}.{message.stamp.nanosec:09d}"
+            first, *rest = message.msg.splitlines() or [""]
+            lines.append(f"[{severity}] [{stamp}] [{message.name}]: {first}")
+            lines.extend(f"    {text}" for text in rest)
+            levels.extend([message.level] * (1 + len(rest)))
+            loggers.extend([message.name] * (1 + len(rest)))
+        self.target.post_message(RosoutBatch(lines, levels, loggers, dropped))
+        return True
+
+
+class RosoutIndex:
+    """Line numbers of a log store by severity and by logger name.
+
+    Line numbers are appended in increasing order, so each index is sorted
+    and combining a severity with a logger is a merge of sorted arrays
+    rather than a scan of the log.
+    """
+
+    def __init__(self) -> None:
+        self.levels: Dict[int, array] = {}
+        self.loggers: Dict[str, array] = {}
+
+    def add(self, first: int, levels: List[int], loggers: List[str]) -> None:
+        for line, (level, logger) in enumerate(zip(levels, loggers), first):
+            if level not in self.levels:
+                self.levels[level] = array("Q")
+            self.levels[level].append(line)
+            if logger not in self.loggers:
+                self.loggers[logger] = array("Q")
+            self.loggers[logger].append(line)
+
+    @staticmethod
+    def _since(lines: array, start: int) -> np.ndarray:
+        lines = np.frombuffer(lines, dtype=np.uint64)
+        return lines[np.searchsorted(lines, start) :]
+
+    def lines(self, level: int = 0, logger: str | None = None, start: int = 0):
+        """Lines from `start` at or above `level`, optionally from one logger."""
+        if logger is not None:
+            if logger not in self.loggers:
+                return np.zeros(0, dtype=np.uint64)
+            selected = self._since(self.loggers[logger], start)
+            if level == 0:
+                return selected
+        by_level = [
+            self._since(lines, start)
+            for severity, lines in self.levels.items()
+            if severity >= level
+        ]
+        if not by_level:
+            return np.zeros(0, dtype=np.uint64)
+        by_level = np.sort(np.concatenate(by_level))
+        if logger is None:
+            return by_level
+        return np.intersect1d(by_level, selected, assume_unique=True)
+
+
+class RosoutScreen(WatcherScreen):
+    BINDINGS = [
+        Binding("v", "cycle_level", "Severity"),
+        Binding("g", "cycle_logger", "Logger"),
+    ]
+
+    level: reactive[int] = reactive(0, init=False)
+    logger: reactive[str | None] = reactive(None, init=False)
+
+    def __init__(self, node, memory_limit: int = 32 * 1024 * 1024) -> None:
+        self.watcher = RosoutWatcher(node)
+        self.index = RosoutIndex()
+        self.memory_limit = memory_limit
+        super().__init__()
+
+    async def on_mount(self) -> None:
+        self.watcher.target = self
+        self.watcher.start()
+
+    def compose(self) -> ComposeResult:
+        yield RosHeader()
+        yield LogView(memory_limit=self.memory_limit)
+        yield Footer()
+
+    @property
+    def filtered(self) -> bool:
+        return self.level > 0 or self.logger is not None
+
+    def on_rosout_batch(self, batch: RosoutBatch) -> None:
+        batch.stop()
+        lines = self.query_one(LogLines)
+        first = len(lines.store)
+        lines.extend(batch.lines)
+        self.index.add(first, batch.levels, batch.loggers)
+        if batch.dropped:
+            lines.append(f"[r2s] {batch.dropped} /rosout messages dropped")
+        if self.filtered:
+            lines.extend_view(self.index.lines(self.level, self.logger, first))
+
+    def action_cycle_level(self) -> None:
+        levels = [0, *SEVERITIES]
+        self.level = levels[(levels.index(self.level) + 1) % len(levels)]
+
+    def action_cycle_logger(self) -> None:
+        loggers = [None, *sorted(self.index.loggers)]
+        index = loggers.index(self.logger) if self.logger in loggers else 0
+        self.logger = loggers[(index + 1) % len(loggers)]
+
+    def watch_level(self) -> None:
+        self.apply_filter()
+
+    def watch_logger(self) -> None:
+        self.apply_filter()
+
+    def apply_filter(self) -> None:
+        lines = self.query_one(LogLines)
+        if not self.filtered:
+            lines.set_view(None)
+            self.notify("Showing all messages")
+            return
+        lines.set_view(self.index.lines(self.level, self.logger))
+        severity = f"{SEVERITIES[self.level]} and above" if self.level else "all"
+        self.notify(f"Showing {severity} from {self.logger or 'all loggers'}")
@@ -0,0 +1,785 @@
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, List, Set, Tuple
+
+from rich.text import Text
+from textual import on
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.cache import LRUCache
+from textual.geometry import Size
+from textual.message import Message
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.widget import Widget
+from textual.widgets import Footer
+
+from r2s.screens.ros2.graph import GraphCache, GraphSnapshot, TopicInfo, is_hidden_name
+from r2s.screens.ros2.header import RosHeader
+from r2s.screens.watcher_screen import WatcherScreen
+from r2s.watcher import WatcherBase
+from r2s.widgets.find_dialog import FindDialog
+
+NODE = "node"
+TOPIC = "topic"
+
+# A vertex of the graph: its kind and its (possibly collapsed) name.
+Vertex = Tuple[str, str]
+Edge = Tuple[Vertex, Vertex]
+
+# Box drawing characters by the directions a cell connects to.
+UP, DOWN, LEFT, RIGHT = 1, 2, 4, 8
+BOX = {
+    UP: "│",
+    DOWN: "│",
+    UP | DOWN: "│",
+    LEFT: "─",
+    RIGHT: "─",
+    LEFT | RIGHT: "─",
+    DOWN | RIGHT: "┌",
+    DOWN | LEFT: "┐",
+    UP | RIGHT: "└",
+    UP | LEFT: "┘",
+    UP | DOWN | RIGHT: "├",
+    UP | DOWN | LEFT: "┤",
+    LEFT | RIGHT | DOWN: "┬",
+    LEFT | RIGHT | UP: "┴",
+    UP | DOWN | LEFT | RIGHT: "┼",
+}
+
+
+def collapse(name: str, depth: int) -> str:
+    """The namespace `depth` levels deep that `name` is drawn as, if deeper."""
+    tokens = name.strip("/").split("/")
+    if depth <= 0 or len(tokens) <= depth:
+        return name
+    return "/" + "/".join(tokens[:depth]) + "/*"
+
+
+def label(vertex: Vertex, width: int) -> str:
+    """Nodes are drawn as (name) and topics as [name], like rqt_graph."""
+    kind, name = vertex
+    if len(name) > width - 2:
+        name = "…" + name[-(width - 3) :]
+    return f"({name})" if kind == NODE else f"[{name}]"
+
+
+class TopicGraph:
+    """The directed graph of nodes and the topics they use, as adjacency sets.
+
+    A node has an edge to each topic it publishes, and each topic has an
+    edge to the nodes subscribing to it. `update` only relinks the topics
+    whose endpoints changed since the last snapshot.
+    """
+
+    def __init__(self) -> None:
+        self.generation = -1
+        self.topics: Dict[str, TopicInfo] = {}
+        self.nodes: Set[str] = set()
+        self.out: Dict[Vertex, Set[Vertex]] = {}
+        self.into: Dict[Vertex, Set[Vertex]] = {}
+
+    def update(self, snapshot: GraphSnapshot) -> Set[Vertex]:
+        """Catch up with a snapshot, returning the vertices whose edges or
+        existence changed."""
+        if snapshot.generation == self.generation:
+            return set()
+        self.generation = snapshot.generation
+        touched: Set[Vertex] = set()
+        for name in self.topics.keys() | snapshot.topics.keys():
+            old = self.topics.get(name)
+            new = snapshot.topics.get(name)
+            if old is new or old == new:
+                continue
+            touched.add((TOPIC, name))
+            if old is not None:
+                self._link(old, self._unlink_edge)
+                del self.topics[name]
+            if new is not None:
+                self._link(new, self._link_edge)
+                self.topics[name] = new
+            empty = frozenset()
+            for nodes in (
+                (old.publishers if old else empty) ^ (new.publishers if new else empty),
+                (old.subscribers if old else empty)
+                ^ (new.subscribers if new else empty),
+            ):
+                touched.update((NODE, node) for node in nodes)
+        nodes = set(snapshot.nodes)
+        touched.update((NODE, node) for node in nodes ^ self.nodes)
+        self.nodes = nodes
+        return touched
+
+    def _link(self, topic: TopicInfo, link) -> None:
+        vertex = (TOPIC, topic.name)
+        for node in topic.publishers:
+            link((NODE, node), vertex)
+        for node in topic.subscribers:
+            link(vertex, (NODE, node))
+
+    def _link_edge(self, source: Vertex, target: Vertex) -> None:
+        self.out.setdefault(source, set()).add(target)
+        self.into.setdefault(target, set()).add(source)
+
+    def _unlink_edge(self, source: Vertex, target: Vertex) -> None:
+        for table, key, value in (
+            (self.out, source, target),
+            (self.into, target, source),
+        ):
+            values = table.get(key)
+            if values is not None:
+                values.discard(value)
+                if not values:
+                    del table[key]
+
+    def has(self, vertex: Vertex) -> bool:
+        kind, name = vertex
+        if vertex in self.out or vertex in self.into:
+            return True
+        return name in (self.nodes if kind == NODE else self.topics)
+
+    def vertices(self) -> Set[Vertex]:
+        vertices = {(NODE, node) for node in self.nodes}
+        vertices.update((TOPIC, topic) for topic in self.topics)
+        vertices.update(self.out)
+        vertices.update(self.into)
+        return vertices
+
+    def neighbours(self, vertex: Vertex) -> Set[Vertex]:
+        return self.out.get(vertex, set()) | self.into.get(vertex, set())
+
+    def edges(self, vertex: Vertex) -> Set[Edge]:
+        """The edges into and out of a vertex."""
+        edges = {(vertex, target) for target in self.out.get(vertex, ())}
+        edges.update((source, vertex) for source in self.into.get(vertex, ()))
+        return edges
+
+    def within(
+        self,
+        center: Vertex,
+        hops: int,
+        skip: Callable[[Vertex], bool] = lambda vertex: False,
+    ) -> Set[Vertex]:
+        """Every vertex at most `hops` edges away from `center`, either way,
+        not counting paths through the vertices `skip` leaves out."""
+        seen = {center}
+        frontier = [center]
+        for _ in range(hops):
+            frontier = [
+                neighbour
+                for vertex in frontier
+                for neighbour in self.neighbours(vertex)
+                if neighbour not in seen
+                and not skip(neighbour)
+                and not seen.add(neighbour)
+            ]
+            if not frontier:
+                break
+        return seen
+
+    def find(self, text: str) -> Vertex | None:
+        """The vertex named `text`, else the shortest name ending or containing it."""
+        vertices = self.vertices()
+        for kind in (NODE, TOPIC):
+            if (kind, text) in vertices:
+                return (kind, text)
+        suffix = "/" + text.lstrip("/")
+        for matches in (
+            [v for v in vertices if v[1].endswith(suffix)],
+            [v for v in vertices if text in v[1]],
+        ):
+            if matches:
+                return min(matches, key=lambda v: (len(v[1]), v))
+        return None
+
+
+@dataclass(frozen=True)
+class Block:
+    """A connected component, laid out and drawn."""
+
+    lines: Tuple[str, ...]
+    # (line, start, end, kind) of every label.
+    labels: Tuple[Tuple[int, int, int, str], ...]
+    width: int
+    overflow: bool = False
+
+
+def layout(
+    vertices: FrozenSet[Vertex],
+    edges: FrozenSet[Edge],
+    label_width: int = 40,
+    max_lanes: int = 48,
+) -> Block:
+    """Draw a component left to right in layers, rqt_graph style.
+
+    Layers are breadth-first distances from a root. Nodes only connect to
+    topics, so every edge joins neighbouring layers. Each layer is ordered
+    by the rows of its neighbours in the layer before, and the edges
+    between two layers run along one vertical lane per vertex on the left.
+    Where there are more than `max_lanes` lanes the edges are left out.
+    """
+    adjacent: Dict[Vertex, Set[Vertex]] = {vertex: set() for vertex in vertices}
+    has_input: Set[Vertex] = set()
+    for source, target in edges:
+        adjacent[source].add(target)
+        adjacent[target].add(source)
+        has_input.add(target)
+
+    # Start from the busiest source, so data flows left to right.
+    root = min(
+        vertices,
+        key=lambda v: (v in has_input, v[0] != NODE, -len(adjacent[v]), v[1]),
+    )
+    depth = {root: 0}
+    layers: List[List[Vertex]] = [[root]]
+    queue = deque([root])
+    while queue:
+        vertex = queue.popleft()
+        for neighbour in adjacent[vertex]:
+            if neighbour not in depth:
+                depth[neighbour] = depth[vertex] + 1
+                if depth[neighbour] == len(layers):
+                    layers.append([])
+                layers[depth[neighbour]].append(neighbour)
+                queue.append(neighbour)
+
+    row: Dict[Vertex, int] = {}
+    for i, layer in enumerate(layers):
+        if i == 0:
+            ordered = [(0.0, vertex) for vertex in layer]
+        else:
+            ordered = sorted(
+                (
+                    sum(row[n] for n in adjacent[v] if n in row) / len(adjacent[v]),
+                    v,
+                )
+                for v in layer
+            )
+        last = -1
+        for barycenter, vertex in ordered:
+            last = row[vertex] = max(last + 1, round(barycenter))
+    height = max(row.values()) + 1
+
+    labels = {v: label(v, label_width) for v in vertices}
+    cells: List[Dict[int, int]] = [{} for _ in range(height)]
+    text: List[Dict[int, str]] = [{} for _ in range(height)]
+    spans: List[Tuple[int, int, int, str]] = []
+    overflow = False
+
+    def horizontal(y: int, start: int, end: int) -> None:
+        for x in range(start, end + 1):
+            mask = (LEFT if x > start else 0) | (RIGHT if x < end else 0)
+            cells[y][x] = cells[y].get(x, 0) | mask
+
+    def vertical(x: int, top: int, bottom: int) -> None:
+        for y in range(top, bottom + 1):
+            mask = (UP if y > top else 0) | (DOWN if y < bottom else 0)
+            cells[y][x] = cells[y].get(x, 0) | mask
+
+    x = 0
+    for i, layer in enumerate(layers):
+        width = max(len(labels[v]) for v in layer)
+        for vertex in layer:
+            y, name = row[vertex], labels[vertex]
+            for offset, char in enumerate(name):
+                text[y][x + offset] = char
+            spans.append((y, x, x + len(name), vertex[0]))
+        if i + 1 == len(layers):
+            x += width
+            break
+        gutter = x + width + 1
+        lanes = [v for v in layer if any(depth[n] == i + 1 for n in adjacent[v])]
+        lanes.sort(key=lambda v: row[v])
+        if len(lanes) > max_lanes:
+            overflow = True
+            for y in range(height):
+                text[y][gutter + 1] = "┊"
+            x = gutter + 4
+            continue
+        following = gutter + len(lanes) + 4
+        for lane, source in enumerate(lanes):
+            column = gutter + 1 + lane
+            start = x + len(labels[source])
+            targets = [t for t in adjacent[source] if depth[t] == i + 1]
+            rows = [row[source], *(row[t] for t in targets)]
+            horizontal(row[source], start, column)
+            vertical(column, min(rows), max(rows))
+            for target in targets:
+                horizontal(row[target], column, following - 1)
+                if (source, target) in edges:
+                    text[row[target]][following - 1] = "▶"
+                if (target, source) in edges:
+                    # Left of the target's ▶, clear of the lanes.
+                    text[row[target]][following - 2] = "◀"
+        x = following
+
+    lines = []
+    for y in range(height):
+        line = [" "] * (x + 1)
+        for column, mask in cells[y].items():
+            line[column] = BOX.get(mask, "┼")
+        for column, char in text[y].items():
+            line[column] = char
+        lines.append("".join(line).rstrip())
+    return Block(
+        lines=tuple(lines),
+        labels=tuple(spans),
+        width=max(len(line) for line in lines),
+        overflow=overflow,
+    )
+
+
+@dataclass(frozen=True)
+class GraphDrawing:
+    lines: Tuple[str, ...] = ()
+    # (start, end, kind) of the labels on each line.
+    labels: Dict[int, Tuple[Tuple[int, int, str], ...]] = field(default_factory=dict)
+    width: int = 0
+
+
+class TopicGraphChanged(Message):
+    def __init__(self, drawing: GraphDrawing, title: str) -> None:
+        self.drawing = drawing
+        self.title = title
+        super().__init__()
+
+
+class TopicGraphWatcher(WatcherBase):
+    """Keeps the topic graph of a GraphCache drawn, re-laying out only the
+    connected components that changed.
+
+    The drawn graph is kept up to date from the vertices each snapshot
+    touched: their edges are recounted, and connected components are only
+    recomputed around them, so the rest of the graph is left as it is and
+    its layouts are reused. Topics with more than `hub_degree` nodes, like
+    /tf or /clock, would join almost every node into one component, so they
+    are listed on their own unless hubs are shown. Focusing on a vertex
+    redraws its neighbourhood from scratch, which is small.
+    """
+
+    target: Widget
+
+    interval: float = 0.5
+    max_interval: float = 5.0
+    hub_degree: int = 16
+
+    def __init__(self, graph: GraphCache) -> None:
+        self.graph = graph
+        self.topic_graph = TopicGraph()
+        self.settings: Tuple = ()
+        self.show_hidden = False
+        self.show_hubs = False
+        self.collapse_depth = 0
+        self.center: str | None = None
+        self.hops = 2
+        # The layouts of the last few settings drawn, for when one is put back.
+        self.drawings: LRUCache[Tuple, Dict[Tuple, Block]] = LRUCache(4)
+        self.drawn: Tuple = ()
+        self.blocks: Dict[int, Tuple[Tuple, Block]] = {}
+        self.reset()
+        super().__init__()
+
+    def reset(self) -> None:
+        """Forget the drawn graph, keeping its layouts for its settings."""
+        if self.blocks:
+            self.drawings[self.drawn] = dict(self.blocks.values())
+        self.drawn = self.settings
+        # Vertices of the topic graph that are drawn, and the drawn edges
+        # between them by vertex.
+        self.shown: Set[Vertex] = set()
+        self.counted: Dict[Vertex, Set[Edge]] = {}
+        self.hubs: Set[Vertex] = set()
+        # The drawn graph, where collapsed vertices are grouped together.
+        self.group_sizes: Dict[Vertex, int] = {}
+        self.edge_counts: Dict[Edge, int] = {}
+        self.adjacent: Dict[Vertex, Set[Vertex]] = {}
+        # Its connected components, by a serial number.
+        self.component_of: Dict[Vertex, int] = {}
+        self.members: Dict[int, Set[Vertex]] = {}
+        self.blocks: Dict[int, Tuple[Tuple, Block]] = {}
+        self.serial = 0
+
+    def start(self) -> None:
+        self.graph.listeners.append(self)
+        super().start()
+
+    def close(self) -> None:
+        if self in self.graph.listeners:
+            self.graph.listeners.remove(self)
+        super().close()
+
+    def configure(self, **settings) -> None:
+        for name, value in settings.items():
+            setattr(self, name, value)
+        self.refresh()
+
+    def visible(self, vertex: Vertex) -> bool:
+        kind, name = vertex
+        if self.show_hidden:
+            return True
+        if kind == TOPIC:
+            return not is_hidden_name(name)
+        return not name.rsplit("/", 1)[-1].startswith("_")
+
+    def is_hub(self, vertex: Vertex) -> bool:
+        graph = self.topic_graph
+        return (
+            not self.show_hubs
+            and vertex[0] == TOPIC
+            and len(graph.neighbours(vertex)) > self.hub_degree
+        )
+
+    def group(self, vertex: Vertex) -> Vertex:
+        return (vertex[0], collapse(vertex[1], self.collapse_depth))
+
+    def poll(self) -> bool:
+        touched = self.topic_graph.update(self.graph.snapshot())
+        settings = (
+            self.show_hidden,
+            self.show_hubs,
+            self.collapse_depth,
+            self.center,
+            self.hops,
+        )
+        if not touched and settings == self.settings:
+            return False
+        graph = self.topic_graph
+
+        center = None
+        scope = None
+        if self.center:
+            center = graph.find(self.center)
+            scope = (
+                set()
+                if center is None
+                else graph.within(center, self.hops, skip=self.is_hub)
+            )
+        if settings != self.settings or scope is not None:
+            self.settings = settings
+            self.reset()
+            touched = graph.vertices()
+
+        dirty = self.apply(touched, scope)
+        laid_out = self.update_components(dirty)
+        self.post(center, laid_out)
+        return True
+
+    def apply(self, touched: Set[Vertex], scope: Set[Vertex] | None) -> Set[Vertex]:
+        """Recount the drawn edges of the touched vertices.
+
+        Returns the drawn vertices that gained or lost an edge, or were
+        added or removed.
+        """
+        graph = self.topic_graph
+        dirty: Set[Vertex] = set()
+        for vertex in touched:
+            visible = graph.has(vertex) and self.visible(vertex)
+            if scope is not None:
+                # The scope already stops at hubs, except a focused one.
+                visible = visible and vertex in scope
+            hub = visible and scope is None and self.is_hub(vertex)
+            if hub:
+                self.hubs.add(vertex)
+            else:
+                self.hubs.discard(vertex)
+            shown = visible and not hub
+            if shown == (vertex in self.shown):
+                continue
+            group = self.group(vertex)
+            dirty.add(group)
+            if shown:
+                self.shown.add(vertex)
+                self.group_sizes[group] = self.group_sizes.get(group, 0) + 1
+                self.adjacent.setdefault(group, set())
+            else:
+                self.shown.discard(vertex)
+                self.group_sizes[group] -= 1
+
+        for vertex in touched:
+            for edge in self.counted.get(vertex, set()) | graph.edges(vertex):
+                source, target = edge
+                wanted = (
+                    source in self.shown
+                    and target in self.shown
+                    and target in graph.out.get(source, ())
+                )
+                if wanted != (edge in self.counted.get(source, ())):
+                    self.count(edge, 1 if wanted else -1, dirty)
+
+        for group in dirty:
+            if self.group_sizes.get(group) == 0:
+                del self.group_sizes[group]
+                del self.adjacent[group]
+        return dirty
+
+    def count(self, edge: Edge, delta: int, dirty: Set[Vertex]) -> None:
+        source, target = edge
+        for vertex in edge:
+            edges = self.counted.setdefault(vertex, set())
+            if delta > 0:
+                edges.add(edge)
+            else:
+                edges.discard(edge)
+                if not edges:
+                    del self.counted[vertex]
+        grouped = (self.group(source), self.group(target))
+        count = self.edge_counts.get(grouped, 0) + delta
+        if count:
+            self.edge_counts[grouped] = count
+        else:
+            del self.edge_counts[grouped]
+        if (delta > 0 and count == 1) or count == 0:
+            first, second = grouped
+            if count or (second, first) in self.edge_counts:
+                self.adjacent[first].add(second)
+                self.adjacent[second].add(first)
+            else:
+                self.adjacent[first].discard(second)
+                self.adjacent[second].discard(first)
+            dirty.update(grouped)
+
+    def update_components(self, dirty: Set[Vertex]) -> int:
+        """Recompute the components around the dirty vertices and lay out
+        the ones that changed. Returns how many were laid out."""
+        seeds = set(dirty)
+        stale: Dict[Tuple, Block] = {}
+        saved = self.drawings.get(self.settings) or {}
+
+        def forget(component: int) -> None:
+            for vertex in self.members.pop(component):
+                if self.component_of.get(vertex) == component:
+                    del self.component_of[vertex]
+            key, block = self.blocks.pop(component)
+            stale[key] = block
+
+        for vertex in dirty:
+            component = self.component_of.get(vertex)
+            if component is not None and component in self.members:
+                seeds.update(self.members[component])
+                forget(component)
+
+        laid_out = 0
+        for seed in seeds:
+            if seed not in self.adjacent or seed in self.component_of:
+                continue
+            self.serial += 1
+            component = self.serial
+            found = {seed}
+            self.component_of[seed] = component
+            queue = deque([seed])
+            while queue:
+                for neighbour in self.adjacent[queue.popleft()]:
+                    if self.component_of.get(neighbour) == component:
+                        continue
+                    merged = self.component_of.get(neighbour)
+                    if merged is not None and merged in self.members:
+                        forget(merged)
+                    self.component_of[neighbour] = component
+                    found.add(neighbour)
+                    queue.append(neighbour)
+            self.members[component] = found
+
+            edges = frozenset(
+                (source, target)
+                for source in found
+                for target in self.adjacent[source]
+                if (source, target) in self.edge_counts
+            )
+            key = (frozenset(found), edges)
+            block = stale.get(key) or saved.get(key)
+            if block is None:
+                block = layout(*key)
+                laid_out += 1
+            self.blocks[component] = (key, block)
+
+        return laid_out
+
+    def hub_block(self) -> Block:
+        """A line per hub topic, with how many nodes use it."""
+        graph = self.topic_graph
+        lines = []
+        labels = []
+        for y, hub in enumerate(sorted(self.hubs, key=lambda v: v[1])):
+            name = label(hub, 40)
+            publishers = len(graph.into.get(hub, ()))
+            subscribers = len(graph.out.get(hub, ()))
+            lines.append(f"{name} {publishers} publishers, {subscribers} subscribers")
+            labels.append((y, 0, len(name), TOPIC))
+        return Block(
+            lines=tuple(lines),
+            labels=tuple(labels),
+            width=max((len(line) for line in lines), default=0),
+        )
+
+    def post(self, center: Vertex | None, laid_out: int) -> None:
+        blocks = sorted(
+            (block for _, block in self.blocks.values()),
+            key=lambda block: (-len(block.labels), block.lines),
+        )
+        if self.hubs:
+            blocks.append(self.hub_block())
+
+        lines: List[str] = []
+        labels: Dict[int, Tuple[Tuple[int, int, str], ...]] = {}
+        for block in blocks:
+            offset = len(lines)
+            lines.extend(block.lines)
+            lines.append("")
+            for y, start, end, kind in block.labels:
+                labels[offset + y] = labels.get(offset + y, ()) + ((start, end, kind),)
+        drawing = GraphDrawing(
+            lines=tuple(lines),
+            labels=labels,
+            width=max((block.width for block in blocks), default=0),
+        )
+
+        if self.center and center is None:
+            scope = f"no match for {self.center}"
+        elif center is not None:
+            scope = f"{self.hops} hops of {center[1]}"
+        else:
+            scope = "all"
+        nodes = sum(vertex[0] == NODE for vertex in self.group_sizes)
+        title = (
+            f"{scope}: {nodes} nodes, {len(self.group_sizes) - nodes} topics, "
+            f"{len(self.members)} components ({laid_out} laid out)"
+        )
+        if self.hubs:
+            title += f", {len(self.hubs)} hubs listed apart"
+        if self.collapse_depth:
+            title += f", collapsed to depth {self.collapse_depth}"
+        if any(block.overflow for block in blocks):
+            title += ", collapse to see every edge"
+        self.target.post_message(TopicGraphChanged(drawing, title))
+
+
+class GraphLines(ScrollView):
+    """Shows a drawn topic graph, styling only the lines on screen."""
+
+    DEFAULT_CSS = """
+    GraphLines {
+        height: 1fr;
+        background: $surface;
+        color: $text-muted;
+        border: $success-lighten-1;
+        border-title-align: center;
+        border-title-color: $success-lighten-1;
+    }
+    GraphLines > .graph-lines--node {
+        color: $success-lighten-2;
+        text-style: bold;
+    }
+    GraphLines > .graph-lines--topic {
+        color: $text;
+    }
+    """
+
+    COMPONENT_CLASSES = {
+        "graph-lines--node",
+        "graph-lines--topic",
+    }
+
+    def __init__(self, id: str | None = None) -> None:
+        super().__init__(id=id)
+        self.drawing = GraphDrawing()
+        self._strips: LRUCache[int, Strip] = LRUCache(256)
+
+    def show(self, drawing: GraphDrawing) -> None:
+        self.drawing = drawing
+        self._strips.clear()
+        self.virtual_size = Size(drawing.width, len(drawing.lines))
+        self.refresh()
+
+    def notify_style_update(self) -> None:
+        self._strips.clear()
+
+    def _line(self, index: int) -> Text:
+        line = Text(self.drawing.lines[index])
+        for start, end, kind in self.drawing.labels.get(index, ()):
+            line.stylize(
+                self.get_component_rich_style(f"graph-lines--{kind}"), start, end
+            )
+        return line
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        width = self.size.width
+        index = scroll_y + y
+        if index >= len(self.drawing.lines):
+            return Strip.blank(width, self.rich_style)
+        strip = self._strips.get(index)
+        if strip is None:
+            line = self._line(index)
+            line.no_wrap = True
+            strip = Strip(line.render(self.app.console), line.cell_len)
+            self._strips[index] = strip
+        return strip.crop_extend(scroll_x, scroll_x + width, self.rich_style)
+
+
+class TopicGraphScreen(WatcherScreen):
+    """The nodes and topics of the graph, drawn as text."""
+
+    BINDINGS = [
+        Binding("ctrl+f", "show_find_dialog", "Focus On", key_display="^f"),
+        Binding("slash", "show_find_dialog", "Focus On", key_display="/", show=False),
+        Binding("k", "cycle_hops", "Hops"),
+        Binding("c", "cycle_collapse", "Collapse"),
+        Binding("h", "toggle_hidden", "Toggle Hidden"),
+        Binding("u", "toggle_hubs", "Toggle Hubs"),
+    ]
+
+    HOPS = (1, 2, 3, 4)
+    COLLAPSE_DEPTHS = (0, 1, 2, 3)
+
+    def __init__(self, graph: GraphCache) -> None:
+        self.watcher = TopicGraphWatcher(graph)
+        super().__init__()
+
+    async def on_mount(self) -> None:
+        self.watcher.target = self
+        self.watcher.start()
+
+    def compose(self) -> ComposeResult:
+        yield RosHeader()
+        yield GraphLines()
+        yield FindDialog(debounce=0.3)
+        yield Footer()
+
+    def on_topic_graph_changed(self, message: TopicGraphChanged) -> None:
+        message.stop()
+        lines = self.query_one(GraphLines)
+        lines.border_title = message.title
+        lines.show(message.drawing)
+
+    def action_show_find_dialog(self) -> None:
+        dialog = self.query_one(FindDialog)
+        dialog.set_class(True, "visible")
+        dialog.focus_input()
+
+    @on(FindDialog.Dismiss)
+    def dismiss_find_dialog(self, event: FindDialog.Dismiss) -> None:
+        event.stop()
+        self.query_one(FindDialog).set_class(False, "visible")
+        self.query_one(GraphLines).focus()
+
+    @on(FindDialog.Update)
+    def focus_on(self, event: FindDialog.Update) -> None:
+        event.stop()
+        self.watcher.configure(center=event.find.strip() or None)
+
+    def action_cycle_hops(self) -> None:
+        hops = self.HOPS[(self.HOPS.index(self.watcher.hops) + 1) % len(self.HOPS)]
+        self.watcher.configure(hops=hops)
+        if self.watcher.center is None:
+            self.notify(f"{hops} hops around the focused vertex; ^f to focus on one")
+
+    def action_cycle_collapse(self) -> None:
+        depths = self.COLLAPSE_DEPTHS
+        depth = depths[(depths.index(self.watcher.collapse_depth) + 1) % len(depths)]
+        self.watcher.configure(collapse_depth=depth)
+
+    def action_toggle_hidden(self) -> None:
+        self.watcher.configure(show_hidden=not self.watcher.show_hidden)
+
+    def action_toggle_hubs(self) -> None:
+        self.watcher.configure(show_hubs=not self.watcher.show_hubs)
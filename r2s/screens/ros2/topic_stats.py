@@ -0,0 +1,224 @@
+import time
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Dict, List, Tuple
+
+import numpy as np
+from textual import log
+from textual.message import Message
+from textual.widget import Widget
+
+from r2s.diff import Changes, SnapshotDiff
+from r2s.watcher import WatcherBase
+
+
+@dataclass(frozen=True, order=True)
+class Quantity:
+    """A measured value that sorts by value and prints with its unit."""
+
+    value: float
+    unit: str = field(default="", compare=False)
+
+    def __str__(self) -> str:
+        value = self.value
+        if self.unit in ("B", "B/s"):
+            for prefix in ("", "K", "M", "G"):
+                if abs(value) < 1000 or prefix == "G":
+                    break
+                value /= 1000
+            precision = 1 if prefix else 0
+            return f"{value:.{precision}f} {prefix}{self.unit}"
+        if self.unit == "s":
+            return f"{value * 1000:.2f} ms"
+        return f"{value:.1f} {self.unit}"
+
+
+@dataclass(frozen=True)
+class TopicStats:
+    rate: Quantity
+    jitter: Quantity
+    bandwidth: Quantity
+    size: Quantity
+
+
+class TopicStatsChanged(Message):
+    def __init__(self, changes: Changes[TopicStats]) -> None:
+        self.changes = changes
+        super().__init__()
+
+
+class RingBuffers:
+    """Arrival times and sizes of the last `capacity` messages per topic.
+
+    Every topic owns a row of two preallocated arrays, so recording a message
+    is a pair of scalar writes and statistics for all topics are computed in
+    one vectorized pass. Subscription callbacks record from several executor
+    threads, so every access takes the lock. A row is handed out with a
+    token, and writes with the token of an earlier owner of the row are
+    dropped, so a late callback cannot land in a released row.
+    """
+
+    def __init__(self, capacity: int = 256, rows: int = 64) -> None:
+        self.capacity = capacity
+        self.stamps = np.full((rows, capacity), np.nan)
+        self.sizes = np.zeros((rows, capacity))
+        self.heads: List[int] = [0] * rows
+        self.tokens: List[int] = [0] * rows
+        self._free = list(range(rows - 1, -1, -1))
+        self._lock = Lock()
+
+    def allocate(self) -> Tuple[int, int]:
+        """A free row and the token to record into it with."""
+        with self._lock:
+            if not self._free:
+                rows = len(self.heads)
+                self.stamps = np.vstack(
+                    [self.stamps, np.full_like(self.stamps, np.nan)]
+                )
+                self.sizes = np.vstack([self.sizes, np.zeros_like(self.sizes)])
+                self.heads.extend([0] * rows)
+                self.tokens.extend([0] * rows)
+                self._free = list(range(2 * rows - 1, rows - 1, -1))
+            row = self._free.pop()
+            return row, self.tokens[row]
+
+    def release(self, row: int) -> None:
+        with self._lock:
+            self.stamps[row] = np.nan
+            self.heads[row] = 0
+            self.tokens[row] += 1
+            self._free.append(row)
+
+    def record(self, row: int, token: int, size: int) -> None:
+        stamp = time.monotonic()
+        with self._lock:
+            if self.tokens[row] != token:
+                return
+            head = self.heads[row]
+            index = head % self.capacity
+            self.stamps[row, index] = stamp
+            self.sizes[row, index] = size
+            self.heads[row] = head + 1
+
+    def stats(self, rows: List[int], window: float) -> Tuple[np.ndarray, ...]:
+        """Rate, jitter, bandwidth and mean size of the given rows.
+
+        Only messages received in the last `window` seconds are counted.
+        Rows without at least two such messages get NaN.
+        """
+        with self._lock:
+            stamps = self.stamps[rows]
+            sizes = self.sizes[rows]
+        recent = stamps >= time.monotonic() - window
+        count = recent.sum(axis=1)
+        stamps = np.sort(np.where(recent, stamps, np.nan), axis=1)
+        intervals = np.diff(stamps, axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            span = np.nanmax(stamps, axis=1, initial=-np.inf) - np.nanmin(
+                stamps, axis=1, initial=np.inf
+            )
+            rate = np.where(count > 1, (count - 1) / span, np.nan)
+            valid = ~np.isnan(intervals)
+            mean_interval = np.where(valid, intervals, 0).sum(axis=1) / (count - 1)
+            deviation = np.where(valid, intervals - mean_interval[:, None], 0)
+            jitter = np.sqrt((deviation**2).sum(axis=1) / (count - 1))
+            size = np.where(recent, sizes, 0).sum(axis=1) / count
+        jitter = np.where(count > 1, jitter, np.nan)
+        size = np.where(count > 0, size, np.nan)
+        return rate, jitter, rate * size, size
+
+
+class TopicStatsMonitor(WatcherBase):
+    """Measures topics from raw subscriptions, without deserializing them.
+
+    Subscriptions hand over the serialized message, whose length and arrival
+    time go into a ring buffer. Statistics are computed once per poll for all
+    tracked topics and posted to `target` as changes.
+    """
+
+    target: Widget | None = None
+
+    interval: float = 1.0
+    max_interval: float = 1.0
+    window: float = 5.0
+
+    def __init__(self, node) -> None:
+        self.node = node
+        self.buffers = RingBuffers()
+        self.diff: SnapshotDiff[TopicStats] = SnapshotDiff()
+        self._lock = Lock()
+        self._wanted: Dict[str, str] = {}
+        self._subscriptions: Dict[str, Tuple[object, int]] = {}
+        self._failed: Dict[str, str] = {}
+        super().__init__()
+
+    def track(self, topics: Dict[str, str]) -> None:
+        """Set the topics to measure, as a map of topic name to type."""
+        with self._lock:
+            changed = topics != self._wanted
+            self._wanted = dict(topics)
+        if changed:
+            self.refresh()
+
+    def close(self) -> None:
+        super().close()
+        self.track({})
+        self._reconcile()
+
+    def poll(self) -> bool:
+        self._reconcile()
+        with self._lock:
+            names = list(self._subscriptions)
+            rows = [self._subscriptions[name][1] for name in names]
+        stats: Dict[str, TopicStats] = {}
+        if names:
+            columns = self.buffers.stats(rows, self.window)
+            for name, (rate, jitter, bandwidth, size) in zip(names, zip(*columns)):
+                if np.isnan(rate):
+                    continue
+                stats[name] = TopicStats(
+                    rate=Quantity(round(float(rate), 1), "Hz"),
+                    jitter=Quantity(round(float(jitter), 5), "s"),
+                    bandwidth=Quantity(round(float(bandwidth)), "B/s"),
+                    size=Quantity(round(float(size)), "B"),
+                )
+        changes = self.diff.update(stats)
+        if changes and self.target is not None:
+            self.target.post_message(TopicStatsChanged(changes))
+        return bool(changes)
+
+    def _reconcile(self) -> None:
+        """Create and destroy subscriptions to match the tracked topics."""
+        with self._lock:
+            for name in list(self._subscriptions):
+                if name not in self._wanted:
+                    subscription, row = self._subscriptions.pop(name)
+                    self.node.destroy_subscription(subscription)
+                    self.buffers.release(row)
+            for name, type in self._wanted.items():
+                if name in self._subscriptions or self._failed.get(name) == type:
+                    continue
+                try:
+                    self._subscriptions[name] = self._subscribe(name, type)
+                    self._failed.pop(name, None)
+                except Exception as ex:
+                    log(f"Cannot subscribe to {name} [{type}]: {ex!r}")
+                    self._failed[name] = type
+
+    def _subscribe(self, name: str, type: str) -> Tuple[object, int]:
+        from rclpy.qos import qos_profile_sensor_data
+        from rosidl_runtime_py.utilities import get_message
+
+        row, token = self.buffers.allocate()
+        try:
+            subscription = self.node.create_subscription(
+                get_message(type),
+                name,
+                lambda data: self.buffers.record(row, token, len(data)),
+                qos_profile_sensor_data,
+                raw=True,
+            )
+        except Exception:
+            self.buffers.release(row)
+            raise
+        return subscription, row
@@ -0,0 +1,26 @@
+from textual.binding import Binding
+from textual.screen import Screen
+
+from r2s.watcher import WatcherBase
+
+
+class WatcherScreen(Screen):
+    """A screen whose watcher only polls while the screen is visible."""
+
+    BINDINGS = [
+        Binding("r", "refresh_watcher", "Refresh"),
+    ]
+
+    watcher: WatcherBase
+
+    def on_screen_suspend(self) -> None:
+        self.watcher.pause()
+
+    def on_screen_resume(self) -> None:
+        self.watcher.resume()
+
+    def on_unmount(self) -> None:
+        self.watcher.close()
+
+    def action_refresh_watcher(self) -> None:
+        self.watcher.refresh()
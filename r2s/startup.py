@@ -0,0 +1,30 @@
+import sys
+import time
+from typing import Iterable, List, Set, Tuple
+
+
+class StartupProfile:
+    """Times the steps of starting r2s, for `r2s --profile-startup`.
+
+    Times are seconds since the profile was created, which `r2s.main` does
+    before importing the UI. `pending` holds the steps still expected; the
+    app exits once it is empty.
+    """
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+        self.pending: Set[str] = set()
+
+    def expect(self, steps: Iterable[str]) -> None:
+        self.pending.update(steps)
+
+    def mark(self, step: str) -> None:
+        self.marks.append((step, time.perf_counter() - self.start))
+        self.pending.discard(step)
+
+    def report(self, file=sys.stderr) -> None:
+        for step, elapsed in self.marks:
+            print(f"{elapsed * 1000:9.1f} ms  {step}", file=file)
+        for step in sorted(self.pending):
+            print(f"{'-':>9}     {step} (not reached)", file=file)
@@ -1,18 +1,50 @@
+from __future__ import annotations
+
+from importlib.util import find_spec
+
 from rich import terminal_theme
+from textual import work
 from textual.app import App
 from textual.binding import Binding
 from textual import log
 
+from r2s.screens.colcon.discovery import workspace_root
+from r2s.screens.colcon.package_list import PackageListScreen
+from r2s.startup import StartupProfile
+from r2s.watcher import close_scheduler
+
 try:
-    from r2s.screens.ros2.get_node import get_node
-    from r2s.screens.ros2.nodes import NodeListScreen, NodeSelected
-    from r2s.screens.ros2.interfaces import InterfaceListScreen 
+    from r2s.screens.ros2.connecting import ConnectingScreen
+    from r2s.screens.ros2.graph import GraphCache
+    from r2s.screens.ros2.header import RosHeader
+    from r2s.screens.ros2.nodes import (
+        NodeListScreen,
+        NodeSelected,
+        ParametersRequested,
+    )
+    from r2s.screens.ros2.parameters import ParameterCache, ParameterScreen
+    from r2s.screens.ros2.echo import TopicEchoScreen
+    from r2s.screens.ros2.interface_detail import InterfaceDetailScreen
+    from r2s.screens.ros2.interfaces import (
+        InterfaceListScreen,
+        InterfaceSelected,
+        TopicSelected,
+    )
+    from r2s.screens.ros2.logs import LogScreen
+    from r2s.screens.ros2.rosout import RosoutScreen
+    from r2s.screens.ros2.topic_graph import TopicGraphScreen
+
+    if find_spec("rclpy") is None:
+        raise ImportError("No module named 'rclpy'")
     ROS_AVAILABLE = True
 except ImportError as ex:
     ROS_AVAILABLE = False
     ROS_ERROR = ex
     print(ex)
 
+# Actions that need the ROS screens, which exist once the node is ready.
+ROS_ACTIONS = ("nodes", "interfaces", "graph", "logs", "rosout")
+
 
 class UI(App):
     BINDINGS = [
@@ -22,24 +54,119 @@ class UI(App):
     current_mode = ""
     mode_stack = []
     node = None
+    graph = None
+    parameters = None
+
+    def __init__(
+        self,
+        node=None,
+        workspace: str | None = None,
+        startup: StartupProfile | None = None,
+    ) -> None:
+        """Create the app, optionally around an existing NodeWrapper.
+
+        `workspace` is the colcon workspace to show, see `workspace_root`.
+        With a `startup` profile, the app records its first paint and how
+        long ROS takes to come up, then exits.
+        """
+        super().__init__()
+        self.MODES = {}
+        self.mode_stack = []
+        self.node = node
+        self.workspace = workspace_root(workspace)
+        self.ros_available = ROS_AVAILABLE or node is not None
+        self.startup = startup
 
     async def on_load(self) -> None:
-        if ROS_AVAILABLE:
+        if self.ros_available:
             self.bind("n", action="nodes", description="Nodes")
             self.bind("i", action="interfaces", description="Interfaces")
+            self.bind("G", action="graph", description="Graph")
+            self.bind("l", action="logs", description="Logs")
+            self.bind("o", action="rosout", description="Rosout")
+        self.bind("p", action="packages", description="Packages")
 
     async def on_mount(self) -> None:
-        if ROS_AVAILABLE:
-            self.node = get_node()
-            self.MODES["interfaces"] = InterfaceListScreen(self.node)
-            self.MODES["nodes"] = NodeListScreen(self.node)
-            self.action_interfaces()
-            self.current_mode = "interfaces"
-
+        if self.startup is not None:
+            self.startup.mark("app mounted")
+            self.startup.expect(["first paint"])
+            if self.ros_available:
+                self.startup.expect(["ros ready", "ros header"])
+            self.call_after_refresh(self.startup.mark, "first paint")
+            self.set_interval(0.05, self.check_startup)
+            self.set_timer(30, self.exit)
+        self.MODES["packages"] = PackageListScreen(self.workspace)
+        if self.ros_available:
+            if self.node is not None:
+                self.ros_ready()
+            else:
+                # Importing rclpy and joining the graph can take seconds, so
+                # paint a placeholder first and do that in the background.
+                self.MODES["connecting"] = ConnectingScreen()
+                self.switch_mode("connecting")
+                self.connect_ros()
         else:
             self.log.warning(ROS_ERROR)
+            self.action_packages()
         self.ansi_theme_dark = terminal_theme.DIMMED_MONOKAI
 
+    @work(thread=True, exclusive=True, group="connect-ros")
+    def connect_ros(self) -> None:
+        from r2s.screens.ros2.get_node import get_node
+
+        try:
+            node = get_node()
+        except Exception as ex:
+            log.error("Cannot connect to ROS:", ex)
+            self.call_from_thread(self.ros_failed, ex)
+            return
+        self.call_from_thread(self.ros_ready, node)
+
+    def ros_ready(self, node=None) -> None:
+        if node is not None:
+            self.node = node
+        self.graph = GraphCache(self.node)
+        self.graph.start()
+        self.parameters = ParameterCache(self.node)
+        self.MODES["interfaces"] = InterfaceListScreen(self.graph)
+        self.MODES["nodes"] = NodeListScreen(self.graph)
+        self.MODES["graph"] = TopicGraphScreen(self.graph)
+        self.MODES["logs"] = LogScreen()
+        self.MODES["rosout"] = RosoutScreen(self.node)
+        if self.startup is not None:
+            self.startup.mark("ros ready")
+        if self.node_connecting():
+            self.action_interfaces()
+            self.current_mode = "interfaces"
+        self.refresh_bindings()
+
+    def ros_failed(self, error: Exception) -> None:
+        self.ros_available = False
+        self.notify(f"Cannot connect to ROS: {error}", severity="error")
+        if self.startup is not None:
+            self.startup.pending.clear()
+        if self.node_connecting():
+            self.action_packages()
+        self.refresh_bindings()
+
+    def node_connecting(self) -> bool:
+        """Whether the placeholder is shown, rather than a screen the user chose."""
+        placeholder = self.MODES.get("connecting")
+        return placeholder is None or self.screen is placeholder
+
+    def check_action(self, action: str, parameters: tuple[object, ...]) -> bool | None:
+        if action in ROS_ACTIONS and action not in self.MODES:
+            # Shown, but disabled, until the node is ready.
+            return None if self.ros_available else False
+        return True
+
+    def check_startup(self) -> None:
+        if not self.startup.pending:
+            self.exit()
+
+    def on_ros_header_probed(self, message: RosHeader.Probed) -> None:
+        if self.startup is not None:
+            self.startup.mark("ros header")
 
     def on_node_selected(self, message: NodeSelected) -> None:
         self.mode_stack.append(self.current_mode)
@@ -47,11 +174,42 @@ class UI(App):
         self.switch_mode("interfaces")
         self.bind("escape", action="return", description="Return", show=True)
 
+    def on_topic_selected(self, message: TopicSelected) -> None:
+        self.push_screen(TopicEchoScreen(self.node, message.topic, message.type))
+
+    def on_interface_selected(self, message: InterfaceSelected) -> None:
+        self.push_screen(InterfaceDetailScreen(self.graph, message.name, message.type))
+
+    def on_parameters_requested(self, message: ParametersRequested) -> None:
+        self.push_screen(
+            ParameterScreen(self.graph, self.parameters, message.node_name)
+        )
+
     def action_nodes(self) -> None:
         if self.current_mode != "nodes":
             self.switch_mode("nodes")
             self.mode_stack.append("nodes")
 
+    def action_graph(self) -> None:
+        if self.current_mode != "graph":
+            self.switch_mode("graph")
+            self.mode_stack.append("graph")
+
+    def action_logs(self) -> None:
+        if self.current_mode != "logs":
+            self.switch_mode("logs")
+            self.mode_stack.append("logs")
+
+    def action_rosout(self) -> None:
+        if self.current_mode != "rosout":
+            self.switch_mode("rosout")
+            self.mode_stack.append("rosout")
+
+    def action_packages(self) -> None:
+        if self.current_mode != "packages":
+            self.switch_mode("packages")
+            self.mode_stack.append("packages")
+
     def action_interfaces(self) -> None:
         self.MODES["interfaces"].filter_node = ""
         self.switch_mode("interfaces")
@@ -68,5 +226,10 @@ class UI(App):
             self.bind("escape", action="return", description="Return", show=False)
 
     async def on_unmount(self) -> None:
-        if ROS_AVAILABLE and self.node:
+        if self.graph:
+            self.graph.close()
+        if self.parameters:
+            self.parameters.close()
+        close_scheduler()
+        if self.node:
             self.node.stop()
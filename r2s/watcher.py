@@ -1,23 +1,167 @@
+import time
 from abc import ABC, abstractmethod
-from threading import Event, Thread
+from concurrent.futures import ThreadPoolExecutor
+from threading import Condition, Event, Thread
+from typing import List, Set
+
+from textual import log
 
 
 class WatcherBase(ABC):
-    def __init__(self) -> None:
-        self._thread: Thread | None = None
+    """A periodic refresh task driven by a shared `Scheduler`.
+
+    A watcher is polled every `interval` seconds while its results keep
+    changing. Each poll that reports no change stretches the delay by
+    `backoff`, up to `max_interval`, and any change snaps it back.
+    """
+
+    interval: float = 1.0
+    max_interval: float = 1.0
+    backoff: float = 2.0
+
+    def __init__(self, scheduler: "Scheduler | None" = None) -> None:
+        self._scheduler = scheduler or get_scheduler()
         self._exit_event = Event()
+        self._paused = False
+        self._delay = self.interval
+        self._next_poll = 0.0
         super().__init__()
 
     def start(self) -> None:
-        assert self._thread is None
-        self._thread = Thread(target=self.run, name=repr(self))
-        self._thread.start()
+        self._scheduler.add(self)
 
     def close(self) -> None:
         if not self._exit_event.is_set():
             self._exit_event.set()
-            self._thread = None
+            self._scheduler.remove(self)
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    def pause(self) -> None:
+        """Stop polling until `resume` is called."""
+        self._paused = True
+
+    def resume(self) -> None:
+        """Start polling again, beginning with an immediate refresh."""
+        self._paused = False
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Poll as soon as possible and reset the backoff."""
+        self._delay = self.interval
+        self._next_poll = 0.0
+        self._scheduler.wake()
+
+    def due(self, now: float) -> bool:
+        return not self._paused and self._next_poll <= now
+
+    def next_poll(self) -> float | None:
+        return None if self._paused else self._next_poll
+
+    def run_once(self) -> None:
+        self._next_poll = time.monotonic() + self._delay
+        changed = self.poll()
+        if changed:
+            self._delay = self.interval
+        else:
+            self._delay = min(self.max_interval, self._delay * self.backoff)
+        self._next_poll = min(self._next_poll, time.monotonic() + self._delay)
 
     @abstractmethod
+    def poll(self) -> bool:
+        """Run one refresh cycle, returning True if anything changed."""
+
+
+class Scheduler:
+    """Decides when each registered watcher polls, from a single thread.
+
+    The polls themselves run on a small pool of `workers` threads, so that a
+    slow one, such as a workspace crawl, does not hold up the others. A
+    watcher is never polled again while its last poll is still running.
+    """
+
+    def __init__(self, workers: int = 4) -> None:
+        self._watchers: List[WatcherBase] = []
+        self._running: Set[WatcherBase] = set()
+        self._wake = Condition()
+        self._exit = False
+        self._thread: Thread | None = None
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="watcher")
+
+    def add(self, watcher: WatcherBase) -> None:
+        with self._wake:
+            if watcher not in self._watchers:
+                self._watchers.append(watcher)
+            if self._thread is None:
+                self._thread = Thread(target=self.run, name=repr(self))
+                self._thread.start()
+            self._wake.notify()
+
+    def remove(self, watcher: WatcherBase) -> None:
+        with self._wake:
+            if watcher in self._watchers:
+                self._watchers.remove(watcher)
+
+    def wake(self) -> None:
+        with self._wake:
+            self._wake.notify()
+
+    def close(self) -> None:
+        """Stop polling and wait for the polls under way to finish."""
+        with self._wake:
+            self._exit = True
+            self._wake.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
     def run(self) -> None:
-        """Thread runner."""
+        while True:
+            with self._wake:
+                if self._exit:
+                    return
+                now = time.monotonic()
+                idle = [w for w in self._watchers if w not in self._running]
+                due = [w for w in idle if w.due(now)]
+                if not due:
+                    upcoming = [t for w in idle if (t := w.next_poll()) is not None]
+                    timeout = min(upcoming) - now if upcoming else None
+                    self._wake.wait(timeout)
+                    continue
+                self._running.update(due)
+            for watcher in due:
+                self._pool.submit(self._poll, watcher)
+
+    def _poll(self, watcher: WatcherBase) -> None:
+        try:
+            watcher.run_once()
+        except Exception as ex:
+            log.error(f"{watcher!r} failed: {ex!r}")
+        finally:
+            with self._wake:
+                self._running.discard(watcher)
+                self._wake.notify()
+
+
+SCHEDULER: Scheduler | None = None
+
+
+def get_scheduler() -> Scheduler:
+    global SCHEDULER
+
+    if SCHEDULER is None:
+        SCHEDULER = Scheduler()
+
+    return SCHEDULER
+
+
+def close_scheduler() -> None:
+    """Stop the shared scheduler; the next `get_scheduler` starts a new one."""
+    global SCHEDULER
+
+    if SCHEDULER is not None:
+        SCHEDULER.close()
+        SCHEDULER = None
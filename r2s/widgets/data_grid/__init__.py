@@ -1,15 +1,23 @@
-from typing import List
+from bisect import insort
+from itertools import chain
+from typing import Any, Dict, List, Tuple
 
 from rich.text import Text
-from textual import on, log
+from textual import on, log, work
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.containers import Horizontal
 from textual.reactive import reactive
-from textual.widgets import DataTable
+from textual.worker import get_current_worker
 
+from r2s.diff import Changes
 from r2s.widgets.find_dialog import FindDialog
 
+from .search import SearchIndex, fuzzy_positions
+from .sort import Descending, SortedIndex, SortSpec, sort_value
+from .store import RowStore
+from .virtual_table import VirtualTable
+
 
 class DataGrid(Horizontal):
     DEFAULT_CSS = """
@@ -52,12 +60,12 @@ class DataGrid(Horizontal):
             color: auto;
         }
 
-        DataTable {
+        VirtualTable {
             height: 1fr;
             width: 1fr;
         }
 
-        DataTable > .datatable--header {
+        VirtualTable > .virtual-table--header {
             text-style: bold;
             background: $surface;
             color: white;
@@ -77,6 +85,7 @@ class DataGrid(Horizontal):
     BINDINGS = [
         Binding("<,left", "dec_sort_key", "Previous Sort"),
         Binding(">,right", "inc_sort_key", "Next Sort"),
+        Binding("s", "then_sort", "Then Sort"),
         Binding("ctrl+f", "show_find_dialog", "Find", key_display="^f"),
         Binding("slash", "show_find_dialog", "Find", key_display="^f", show=False),
     ]
@@ -87,23 +96,221 @@ class DataGrid(Horizontal):
     filter: reactive[str] = reactive("")
     count: reactive[int] = reactive(0)
     search: reactive[str] = reactive("")
+    search_mode: reactive[str] = reactive("literal")
     reverse: bool = False
 
     id: str = "data_table"
 
     default_sort_column_id = 0
-    sort_column_id = reactive(default_sort_column_id)
+    # Always update so that toggling the direction of a column re-sorts.
+    sort_column_id = reactive(default_sort_column_id, always_update=True)
 
     BORDER_TITLE: str = "DataGrid"
 
+    search_columns: Tuple[int, ...] = (0,)
+    search_debounce: float = 0.15
+    sort_index_limit: int = 4
+
     def __init__(self) -> None:
         super().__init__()
         self._composed = False
+        self.records: Dict[str, Any] = {}
+        self.store = RowStore(len(self.columns()))
+        self.search_index = SearchIndex()
+        self.view: List[str] = []
+        self._view_generation = 0
+        self.sort_keys: Dict[str, Tuple] = {}
+        self.then_by: List[Tuple[int, bool]] = []
+        self._sorted: Dict[SortSpec, SortedIndex] = {}
 
     def columns(self) -> List[str]:
         """Get the column labels"""
         return []
 
+    def filter_row(self, record: Any) -> bool:
+        """Whether a record passes the grid filters, not counting search"""
+        return True
+
+    def row_values(self, record: Any) -> Tuple[Any, ...]:
+        """Get the plain cell values for a record, one per column"""
+        return ()
+
+    def matches_search(self, key: str) -> bool:
+        """Whether any searched column of a stored row matches the search"""
+        if not self.search:
+            return True
+        return self.search_index.matches(key, self.search, self.search_mode)
+
+    def search_texts(self, values: Tuple[Any, ...]) -> Tuple[str, ...]:
+        return tuple(str(values[column]) for column in self.search_columns)
+
+    def highlight(self, cell: Text) -> None:
+        """Highlight the search matches in a cell"""
+        style = self.get_component_rich_style("datagrid--filter-highlight")
+        if self.search_mode == "regex":
+            if self.search_index.pattern(self.search) is not None:
+                cell.highlight_regex(self.search, style)
+        elif self.search_mode == "fuzzy":
+            for position in fuzzy_positions(self.search, cell.plain) or ():
+                cell.stylize(style, position, position + 1)
+        else:
+            cell.highlight_words([self.search], style)
+
+    def render_cells(self, key: str) -> List[Text]:
+        """Materialize the cells of a row that is about to be drawn"""
+        cells = [Text(str(value)) for value in self.store.row(key)]
+        if self.search:
+            for column in self.search_columns:
+                self.highlight(cells[column])
+        return cells
+
+    def is_visible(self, key: str) -> bool:
+        return self.filter_row(self.records[key]) and self.matches_search(key)
+
+    def filter_view(self, search: str, mode: str) -> List[str]:
+        """Get the keys of the records that pass the filters and search"""
+        records = self.records.copy()
+        candidates = records.keys()
+        if search:
+            candidates = self.search_index.search(search, mode)
+        return [
+            key
+            for key in candidates
+            if key in records and self.filter_row(records[key])
+        ]
+
+    def populate_rows(self) -> None:
+        """Re-apply filters and search to every record"""
+        self._view_generation += 1
+        self.view = self.filter_view(self.search, self.search_mode)
+        self.sort_view()
+        self.show_view()
+
+    @work(thread=True, exclusive=True, group="search")
+    def search_rows(self, search: str, mode: str, generation: int) -> None:
+        """Filter the records for a search off the UI thread"""
+        view = self.filter_view(search, mode)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self.show_search, search, mode, generation, view)
+
+    def show_search(
+        self, search: str, mode: str, generation: int, view: List[str]
+    ) -> None:
+        if (search, mode) != (self.search, self.search_mode):
+            # A newer search is already on its way.
+            return
+        if generation != self._view_generation:
+            # The rows changed while filtering, so the result may be stale.
+            self.search_rows(search, mode, self._view_generation)
+            return
+        self.view = view
+        self.sort_view()
+        self.show_view()
+
+    def apply_changes(self, changes: Changes) -> None:
+        """Update only the rows that were added, changed or removed"""
+        self._view_generation += 1
+        spec = self.sort_spec
+        index = self.sorted_index(spec)
+        shown = set(self.view)
+        stale = shown.intersection(changes.removed)
+        for key in changes.removed:
+            self.records.pop(key, None)
+            self.store.remove(key)
+            self.search_index.remove(key)
+            self.sort_keys.pop(key, None)
+            for sorted_index in self._sorted.values():
+                sorted_index.remove(key)
+
+        insert = []
+        for key, record in chain(changes.added.items(), changes.changed.items()):
+            self.records[key] = record
+            values = self.row_values(record)
+            self.store.set(key, values)
+            self.search_index.update(key, self.search_texts(values))
+            self.sort_keys[key] = tuple(sort_value(value) for value in values)
+            moved = False
+            for other, sorted_index in self._sorted.items():
+                if (
+                    sorted_index.insert(key, self.sort_key(key, other))
+                    and other == spec
+                ):
+                    moved = True
+            visible = self.is_visible(key)
+            if key in shown and (moved or not visible):
+                stale.add(key)
+            if visible and (moved or key not in shown):
+                insert.append(key)
+
+        if len(insert) > 64:
+            # Cheaper to walk the index once than to place many rows.
+            keep = (shown - stale).union(insert)
+            self.view = [key for key in index.keys() if key in keep]
+        else:
+            if stale:
+                self.view = [key for key in self.view if key not in stale]
+            for key in insert:
+                insort(self.view, key, key=index.entry)
+        self.show_view()
+
+    def reset_columns(self) -> None:
+        """Rebuild every row after the set of columns changed"""
+        count = len(self.columns())
+        self.store = RowStore(count)
+        self.sort_keys.clear()
+        self._sorted.clear()
+        self.then_by = [(c, reverse) for c, reverse in self.then_by if c < count]
+        records, self.records, self.view = self.records, {}, []
+        if self.is_mounted:
+            self.query_one(VirtualTable).store = self.store
+        if self.sort_column_id >= count:
+            self.reverse = False
+            self.sort_column_id = self.default_sort_column_id
+        else:
+            self.sort_column_id = self.sort_column_id
+        self.apply_changes(Changes(added=records))
+
+    @property
+    def sort_spec(self) -> SortSpec:
+        """The sort column and direction, followed by any tie-breakers"""
+        spec = [(self.sort_column_id, self.reverse)]
+        spec.extend(
+            (column, reverse)
+            for column, reverse in self.then_by
+            if column != self.sort_column_id
+        )
+        return tuple(spec)
+
+    def sort_key(self, key: str, spec: SortSpec) -> Tuple:
+        row = self.sort_keys[key]
+        return tuple(
+            Descending(row[column]) if reverse else row[column]
+            for column, reverse in spec
+        )
+
+    def sorted_index(self, spec: SortSpec | None = None) -> SortedIndex:
+        """Get the index for a sort order, building it on first use"""
+        spec = spec or self.sort_spec
+        index = self._sorted.pop(spec, None)
+        if index is None:
+            index = SortedIndex(
+                (self.sort_key(key, spec), key) for key in self.sort_keys
+            )
+            while len(self._sorted) >= self.sort_index_limit:
+                del self._sorted[next(iter(self._sorted))]
+        # Most recently used last.
+        self._sorted[spec] = index
+        return index
+
+    def sort_view(self) -> None:
+        visible = set(self.view)
+        self.view = [key for key in self.sorted_index().keys() if key in visible]
+
+    def show_view(self) -> None:
+        self.count = len(self.view)
+        if self.is_mounted:
+            self.query_one(VirtualTable).set_rows(self.view)
+
     def render(self) -> str:
         title_style = self.get_component_rich_style(
             "datagrid--title",
@@ -122,33 +329,36 @@ class DataGrid(Horizontal):
             partial=True,
         )
 
-        title = (Text(self.title, style=title_style) + 
-            Text(f" ({self.filter}) ", style=title_filter_style) +
-            Text(f"[{self.count}]", style=title_count_style))
+        title = (
+            Text(self.title, style=title_style)
+            + Text(f" ({self.filter}) ", style=title_filter_style)
+            + Text(f"[{self.count}]", style=title_count_style)
+        )
 
         if len(self.search):
-            title = title + Text(f" <{str(self.search)}>", style=title_search_style)
+            search = self.search
+            if self.search_mode != "literal":
+                search = f"{self.search_mode}:{search}"
+            title = title + Text(f" <{search}>", style=title_search_style)
         self.border_title = title
         return self.border_title
 
     def compose(self) -> ComposeResult:
-        table: DataTable[Text] = DataTable(
+        table = VirtualTable(
+            self.store,
+            self.render_cells,
+            cell_padding=5,
             id=self.id,
-            header_height=1,
-            show_cursor=True,
-            zebra_stripes=True,
-            cell_padding=5
         )
         table.focus()
 
-        for ii, col in enumerate(self.columns()):
-            table.add_column(self.get_heading(ii, col), key=col.lower())
+        table.set_columns(
+            [self.get_heading(ii, col) for ii, col in enumerate(self.columns())]
+        )
 
-        table.cursor_type = "row"
         self._composed = True
         yield table
-        yield FindDialog()
-
+        yield FindDialog(debounce=self.search_debounce)
 
     def get_heading(self, column_idx: int, label: str) -> Text:
         sort_column = (
@@ -159,10 +369,8 @@ class DataGrid(Horizontal):
             partial=True,
         )
         log(column_idx, sort_column)
-        if column_idx == sort_column:
-            return Text(
-                label, style=sort_column_style
-            )
+        if column_idx == sort_column or column_idx in dict(self.then_by):
+            return Text(label, style=sort_column_style)
         else:
             return Text(label)
 
@@ -174,7 +382,7 @@ class DataGrid(Horizontal):
         if show_find:
             filter_dialog.focus_input()
         else:
-            self.query_one(DataTable).focus()
+            self.query_one(VirtualTable).focus()
 
     def action_show_find_dialog(self) -> None:
         find_dialog = self.query_one(FindDialog)
@@ -192,10 +400,18 @@ class DataGrid(Horizontal):
     @on(FindDialog.Update)
     def update_find(self, event: FindDialog.Update) -> None:
         event.stop()
+        self.search_mode = event.mode
         self.search = event.find
 
+    def watch_search_mode(self) -> None:
+        self.watch_search()
+
+    def watch_search(self) -> None:
+        if self.is_mounted:
+            self.query_one(VirtualTable).refresh_rows()
+            self.search_rows(self.search, self.search_mode, self._view_generation)
+
     def action_inc_sort_key(self) -> None:
-        table = self.query_one(DataTable)
         new_idx = self.sort_column_id + 1
 
         cols = self.columns()
@@ -208,7 +424,6 @@ class DataGrid(Horizontal):
         self.sort_column_id = new_idx
 
     def action_dec_sort_key(self) -> None:
-        table = self.query_one(DataTable)
         new_idx = self.sort_column_id - 1
         cols = self.columns()
         if new_idx < 0:
@@ -219,17 +434,18 @@ class DataGrid(Horizontal):
             self.reverse = False
         self.sort_column_id = new_idx
 
+    def action_then_sort(self) -> None:
+        """Keep the current sort column as a tie-breaker, or stop doing so"""
+        then_by = dict(self.then_by)
+        if then_by.pop(self.sort_column_id, None) is None:
+            then_by[self.sort_column_id] = self.reverse
+        self.then_by = list(then_by.items())
+        self.sort_column_id = self.sort_column_id
+
     def watch_sort_column_id(self, sort_column_id: int) -> None:
-        table = self.query_one(DataTable)
-        for ii, col in enumerate(self.columns()):
-            heading = self.get_heading(ii, col)
-            log(ii, heading)
-            table.ordered_columns[ii].label = heading 
-
-        def sortable(v):
-            if isinstance(v, Text):
-                return v.plain
-            else:
-                return v
-
-        table.sort(table.ordered_columns[sort_column_id].key, key=sortable, reverse=self.reverse)
\ No newline at end of file
+        table = self.query_one(VirtualTable)
+        table.set_columns(
+            [self.get_heading(ii, col) for ii, col in enumerate(self.columns())]
+        )
+        self.sort_view()
+        self.show_view()
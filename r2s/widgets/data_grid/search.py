@@ -0,0 +1,136 @@
+import re
+from collections import OrderedDict
+from threading import RLock
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def fuzzy_positions(query: str, text: str) -> List[int] | None:
+    """Positions of the characters of `query` found in order in `text`.
+
+    Matching is case-insensitive. Returns None if `query` is not a
+    subsequence of `text`.
+    """
+    positions = []
+    start = 0
+    lowered = text.lower()
+    for char in query.lower():
+        start = lowered.find(char, start)
+        if start < 0:
+            return None
+        positions.append(start)
+        start += 1
+    return positions
+
+
+class SearchIndex:
+    """Incremental search over the searchable text of grid rows.
+
+    Literal queries of three or more characters only verify the rows that
+    contain every trigram of the query. Results are kept in a small LRU
+    keyed by mode and query: typing more characters narrows the result of
+    the query it extends, deleting characters finds the shorter query in
+    the cache, and row updates patch the cached results in place.
+
+    The index is locked so searches and matches can run on one thread while
+    rows are updated from another.
+    """
+
+    cache_size: int = 32
+
+    def __init__(self) -> None:
+        self.texts: Dict[str, Tuple[str, ...]] = {}
+        self.postings: Dict[str, Set[str]] = {}
+        self._cache: OrderedDict[Tuple[str, str], FrozenSet[str]] = OrderedDict()
+        self._patterns: Dict[str, re.Pattern | None] = {}
+        self._lock = RLock()
+
+    def update(self, key: str, texts: Iterable[str]) -> None:
+        texts = tuple(texts)
+        with self._lock:
+            if self.texts.get(key) == texts:
+                return
+            self.remove(key)
+            self.texts[key] = texts
+            for gram in set().union(*(trigrams(text) for text in texts)):
+                self.postings.setdefault(gram, set()).add(key)
+            for (mode, query), hits in self._cache.items():
+                if self.matches(key, query, mode):
+                    self._cache[mode, query] = hits | {key}
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            texts = self.texts.pop(key, None)
+            if texts is None:
+                return
+            for gram in set().union(*(trigrams(text) for text in texts)):
+                keys = self.postings.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self.postings[gram]
+            for cache_key, hits in self._cache.items():
+                if key in hits:
+                    self._cache[cache_key] = hits - {key}
+
+    def pattern(self, query: str) -> re.Pattern | None:
+        """The compiled regex for a query, or None if it is invalid."""
+        with self._lock:
+            if query not in self._patterns:
+                try:
+                    self._patterns[query] = re.compile(query)
+                except re.error:
+                    self._patterns[query] = None
+            return self._patterns[query]
+
+    def matches(self, key: str, query: str, mode: str = "literal") -> bool:
+        with self._lock:
+            texts = self.texts.get(key, ())
+        if mode == "regex":
+            pattern = self.pattern(query)
+            return pattern is not None and any(pattern.search(t) for t in texts)
+        if mode == "fuzzy":
+            return any(fuzzy_positions(query, t) is not None for t in texts)
+        return any(query in t for t in texts)
+
+    def search(self, query: str, mode: str = "literal") -> FrozenSet[str]:
+        """The keys of every row matching `query`."""
+        with self._lock:
+            hits = self._cache.get((mode, query))
+            if hits is not None:
+                self._cache.move_to_end((mode, query))
+                return hits
+
+            candidates = self._candidates(query, mode)
+            hits = frozenset(k for k in candidates if self.matches(k, query, mode))
+
+            self._cache[mode, query] = hits
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return hits
+
+    def _candidates(self, query: str, mode: str) -> Iterable[str]:
+        candidates: Iterable[str] = self.texts.keys()
+        if mode == "regex":
+            return candidates
+
+        # Any cached result for a query this one extends is a superset of
+        # the answer: substrings for literal search, prefixes for fuzzy.
+        for (cached_mode, cached_query), hits in self._cache.items():
+            if cached_mode != mode or len(hits) >= len(candidates):
+                continue
+            if (mode == "literal" and cached_query in query) or (
+                mode == "fuzzy" and query.startswith(cached_query)
+            ):
+                candidates = hits
+
+        if mode == "literal" and len(query) >= 3:
+            postings = sorted(
+                (self.postings.get(gram, set()) for gram in trigrams(query)), key=len
+            )
+            if len(postings[0]) < len(candidates):
+                candidates = set(postings[0]).intersection(*postings[1:])
+        return candidates
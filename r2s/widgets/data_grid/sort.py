@@ -0,0 +1,79 @@
+from bisect import bisect_left, insort
+from functools import total_ordering
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+# Columns to sort by, most significant first, with a reverse flag each.
+SortSpec = Tuple[Tuple[int, bool], ...]
+
+
+@total_ordering
+class Descending:
+    """Wraps a sort key so that it orders in reverse."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: Any) -> None:
+        self.key = key
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Descending) and self.key == other.key
+
+    def __lt__(self, other: "Descending") -> bool:
+        return other.key < self.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+
+def sort_value(value: Any) -> Tuple:
+    """Get a sort key for a plain cell value, ordering empty cells last."""
+    if value is None or value == "":
+        return (1,)
+    return (0, value)
+
+
+class SortedIndex:
+    """Row keys kept in order of their precomputed sort keys.
+
+    Entries are `(sort key, row key)` pairs in a sorted list, so placing or
+    moving a row is a binary search rather than a sort of every row. Ties
+    are broken by row key, which keeps the order stable across refreshes.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[Tuple, str]] = ()) -> None:
+        self._entries: List[Tuple[Tuple, str]] = sorted(entries)
+        self._keys: Dict[str, Tuple] = {key: sort_key for sort_key, key in self}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Tuple[Tuple, str]]:
+        return iter(self._entries)
+
+    def keys(self) -> Iterator[str]:
+        return (key for _, key in self._entries)
+
+    def entry(self, key: str) -> Tuple[Tuple, str]:
+        return (self._keys[key], key)
+
+    def insert(self, key: str, sort_key: Tuple) -> bool:
+        """Insert or move a row, returning True if its position may change."""
+        old = self._keys.get(key)
+        if old == sort_key:
+            return False
+        if old is not None:
+            self._discard(old, key)
+        insort(self._entries, (sort_key, key))
+        self._keys[key] = sort_key
+        return True
+
+    def remove(self, key: str) -> bool:
+        sort_key = self._keys.pop(key, None)
+        if sort_key is None:
+            return False
+        self._discard(sort_key, key)
+        return True
+
+    def _discard(self, sort_key: Tuple, key: str) -> None:
+        index = bisect_left(self._entries, (sort_key, key))
+        del self._entries[index]
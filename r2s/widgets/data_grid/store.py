@@ -0,0 +1,76 @@
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from rich.cells import cell_len
+
+
+class RowStore:
+    """Columnar storage for the plain cell values of a grid.
+
+    Rows live in numbered slots, with one list per column, so a row costs a
+    handful of references rather than a renderable per cell. Slots freed by
+    removed rows are reused by later inserts. Every write bumps the row's
+    version, which renderers use to invalidate cached lines.
+    """
+
+    def __init__(self, column_count: int) -> None:
+        self.columns: List[List[Any]] = [[] for _ in range(column_count)]
+        self.widths: List[int] = [0] * column_count
+        self._keys: List[str | None] = []
+        self._versions: List[int] = []
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._slots
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._slots)
+
+    def set(self, key: str, values: Sequence[Any]) -> bool:
+        """Insert or update a row, returning True if anything changed."""
+        slot = self._slots.get(key)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+                self._keys[slot] = key
+            else:
+                slot = len(self._keys)
+                self._keys.append(key)
+                self._versions.append(0)
+                for column in self.columns:
+                    column.append(None)
+            self._slots[key] = slot
+        elif all(c[slot] == v for c, v in zip(self.columns, values)):
+            return False
+
+        for index, (column, value) in enumerate(zip(self.columns, values)):
+            column[slot] = value
+            self.widths[index] = max(self.widths[index], cell_len(str(value)))
+        self._versions[slot] += 1
+        return True
+
+    def remove(self, key: str) -> bool:
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return False
+        self._keys[slot] = None
+        for column in self.columns:
+            column[slot] = None
+        self._free.append(slot)
+        return True
+
+    def slot(self, key: str) -> int:
+        return self._slots[key]
+
+    def row(self, key: str) -> Tuple[Any, ...]:
+        slot = self._slots[key]
+        return tuple(column[slot] for column in self.columns)
+
+    def value(self, key: str, column: int) -> Any:
+        return self.columns[column][self._slots[key]]
+
+    def version(self, key: str) -> int:
+        return self._versions[self._slots[key]]
@@ -0,0 +1,231 @@
+from typing import Callable, List
+
+from rich.text import Text
+from textual import events
+from textual.binding import Binding
+from textual.cache import LRUCache
+from textual.geometry import Size
+from textual.message import Message
+from textual.reactive import reactive
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+from r2s.widgets.data_grid.store import RowStore
+
+
+class VirtualTable(ScrollView, can_focus=True):
+    """A table that only materializes the rows it is drawing.
+
+    Rows are read from a `RowStore` in the order given by `rows`. Cells are
+    turned into renderables by `render_cells` when a line is drawn, and the
+    resulting strips are cached for the viewport plus `overscan` rows.
+    """
+
+    DEFAULT_CSS = """
+    VirtualTable:dark {
+        background: initial;
+    }
+    VirtualTable {
+        background: $surface;
+        color: $text;
+    }
+    VirtualTable > .virtual-table--header {
+        text-style: bold;
+        background: $primary;
+        color: $text;
+    }
+    VirtualTable > .virtual-table--even-row {
+        background: $primary 10%;
+    }
+    VirtualTable:dark > .virtual-table--even-row {
+        background: $primary 15%;
+    }
+    VirtualTable > .virtual-table--cursor {
+        background: $secondary;
+        color: $text;
+    }
+    """
+
+    COMPONENT_CLASSES = {
+        "virtual-table--header",
+        "virtual-table--even-row",
+        "virtual-table--odd-row",
+        "virtual-table--cursor",
+    }
+
+    BINDINGS = [
+        Binding("enter", "select_cursor", "Select", show=False),
+        Binding("up", "cursor_up", "Cursor Up", show=False),
+        Binding("down", "cursor_down", "Cursor Down", show=False),
+        Binding("pageup", "page_up", "Page Up", show=False),
+        Binding("pagedown", "page_down", "Page Down", show=False),
+        Binding("home", "cursor_home", "Home", show=False),
+        Binding("end", "cursor_end", "End", show=False),
+    ]
+
+    cursor_row: reactive[int] = reactive(0)
+
+    class RowSelected(Message):
+        def __init__(self, table: "VirtualTable", row_key: str) -> None:
+            self.table = table
+            self.row_key = row_key
+            super().__init__()
+
+    def __init__(
+        self,
+        store: RowStore,
+        render_cells: Callable[[str], List[Text]],
+        cell_padding: int = 5,
+        overscan: int = 10,
+        id: str | None = None,
+    ) -> None:
+        super().__init__(id=id)
+        self.store = store
+        self.render_cells = render_cells
+        self.cell_padding = cell_padding
+        self.overscan = overscan
+        self.labels: List[Text] = []
+        self.rows: List[str] = []
+        self._strips: LRUCache[tuple, Strip] = LRUCache(64)
+
+    @property
+    def cursor_key(self) -> str | None:
+        if 0 <= self.cursor_row < len(self.rows):
+            return self.rows[self.cursor_row]
+        return None
+
+    @property
+    def page_height(self) -> int:
+        return max(1, self.scrollable_content_region.height - 1)
+
+    def set_columns(self, labels: List[Text]) -> None:
+        self.labels = labels
+        self.refresh_rows()
+
+    def set_rows(self, rows: List[str]) -> None:
+        """Show the given row keys, in order."""
+        key = self.cursor_key
+        self.rows = rows
+        if key is not None and self.cursor_key != key and key in self.store:
+            # Keep the cursor on the same row when rows move around it.
+            try:
+                self.cursor_row = rows.index(key)
+            except ValueError:
+                pass
+        self.cursor_row = min(self.cursor_row, max(0, len(rows) - 1))
+        self._update_virtual_size()
+        self.refresh()
+
+    def refresh_rows(self) -> None:
+        """Drop cached lines, e.g. after the cell renderer changed."""
+        self._strips.clear()
+        self._update_virtual_size()
+        self.refresh()
+
+    def notify_style_update(self) -> None:
+        self._strips.clear()
+
+    def on_resize(self) -> None:
+        self._strips.maxsize = self.size.height + 2 * self.overscan
+
+    def _column_widths(self) -> List[int]:
+        return [
+            max(label.cell_len, width)
+            for label, width in zip(self.labels, self.store.widths)
+        ]
+
+    def _update_virtual_size(self) -> None:
+        widths = self._column_widths()
+        width = sum(widths) + self.cell_padding * len(widths)
+        self.virtual_size = Size(width, len(self.rows) + 1)
+
+    def _line(self, cells: List[Text], widths: List[int], style) -> Strip:
+        line = Text(no_wrap=True, end="")
+        for cell, width in zip(cells, widths):
+            cell.truncate(width, overflow="ellipsis", pad=True)
+            line.append_text(cell)
+            line.append(" " * self.cell_padding)
+        line.stylize_before(style)
+        return Strip(line.render(self.app.console), line.cell_len)
+
+    def _row_strip(self, index: int) -> Strip:
+        key = self.rows[index]
+        cursor = index == self.cursor_row and self.has_focus
+        widths = self._column_widths()
+        cache_key = (key, self.store.version(key), cursor, index % 2, tuple(widths))
+        strip = self._strips.get(cache_key)
+        if strip is None:
+            if cursor:
+                component = "virtual-table--cursor"
+            elif index % 2:
+                component = "virtual-table--odd-row"
+            else:
+                component = "virtual-table--even-row"
+            style = self.get_component_rich_style(component)
+            strip = self._line(self.render_cells(key), widths, style)
+            self._strips[cache_key] = strip
+        return strip
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        width = self.size.width
+        base_style = self.rich_style
+        if y == 0:
+            style = self.get_component_rich_style("virtual-table--header")
+            labels = [label.copy() for label in self.labels]
+            strip = self._line(labels, self._column_widths(), style)
+            return strip.crop_extend(scroll_x, scroll_x + width, style)
+        index = scroll_y + y - 1
+        if index >= len(self.rows):
+            return Strip.blank(width, base_style)
+        return self._row_strip(index).crop_extend(
+            scroll_x, scroll_x + width, base_style
+        )
+
+    def watch_cursor_row(self, old: int, new: int) -> None:
+        scroll_y = int(self.scroll_y)
+        if new < scroll_y:
+            self.scroll_to(y=new, animate=False)
+        elif new >= scroll_y + self.page_height:
+            self.scroll_to(y=new - self.page_height + 1, animate=False)
+        self.refresh()
+
+    def on_focus(self) -> None:
+        self.refresh()
+
+    def on_blur(self) -> None:
+        self.refresh()
+
+    def _move_cursor(self, row: int) -> None:
+        self.cursor_row = max(0, min(row, len(self.rows) - 1))
+
+    def action_cursor_up(self) -> None:
+        self._move_cursor(self.cursor_row - 1)
+
+    def action_cursor_down(self) -> None:
+        self._move_cursor(self.cursor_row + 1)
+
+    def action_page_up(self) -> None:
+        self._move_cursor(self.cursor_row - self.page_height)
+
+    def action_page_down(self) -> None:
+        self._move_cursor(self.cursor_row + self.page_height)
+
+    def action_cursor_home(self) -> None:
+        self._move_cursor(0)
+
+    def action_cursor_end(self) -> None:
+        self._move_cursor(len(self.rows) - 1)
+
+    def action_select_cursor(self) -> None:
+        key = self.cursor_key
+        if key is not None:
+            self.post_message(VirtualTable.RowSelected(self, key))
+
+    def on_click(self, event: events.Click) -> None:
+        if event.y < 1:
+            return
+        index = int(self.scroll_y) + event.y - 1
+        if index < len(self.rows):
+            self.cursor_row = index
+            self.action_select_cursor()
@@ -4,8 +4,9 @@ from textual import on
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.message import Message
+from textual.timer import Timer
 from textual.widget import Widget
-from textual.widgets import Input
+from textual.widgets import Input, Static
 
 
 class FindDialog(Widget):
@@ -31,46 +32,86 @@ class FindDialog(Widget):
         Input#find-text {
             display: block;
         }
+        #find-status {
+            display: none;
+            width: auto;
+            padding: 1 1 0 1;
+            color: $text-muted;
+        }
     }
     """
 
     BINDINGS = [
         Binding("escape", "dismiss_find", "Dismiss", key_display="esc", show=False),
+        Binding("ctrl+r", "cycle_mode", "Search Mode", key_display="^r"),
     ]
 
+    MODES = ("literal", "regex", "fuzzy")
+
     DEFAULT_CLASSES = "float"
     BORDER_TITLE = "Find"
 
     @dataclass
     class Update(Message):
         find: str
+        mode: str = "literal"
 
     class Dismiss(Message):
         pass
 
+    def __init__(self, debounce: float = 0.15) -> None:
+        super().__init__()
+        self.mode = self.MODES[0]
+        self.debounce = debounce
+        self._pending: Timer | None = None
+
     def compose(self) -> ComposeResult:
         yield Input(placeholder="find", id="find-text")
+        yield Static(id="find-status")
 
     def focus_input(self) -> None:
         self.query_one("#find-text").focus()
 
+    def set_status(self, status: str) -> None:
+        """Show a short note, such as a match count, beside the input."""
+        label = self.query_one("#find-status", Static)
+        label.update(status)
+        label.display = bool(status)
+
     def get_value(self) -> str:
         return self.query_one("#find-text", Input).value
 
     @on(Input.Changed)
     def input_change(self, event: Input.Changed) -> None:
         event.stop()
-        self.post_update()
+        # Coalesce keystrokes: only post once typing pauses for `debounce`.
+        if self._pending is not None:
+            self._pending.stop()
+        if self.debounce > 0:
+            self._pending = self.set_timer(self.debounce, self.post_update)
+        else:
+            self.post_update()
 
     @on(Input.Submitted)
     def input_submitted(self, event: Input.Changed) -> None:
         event.stop()
+        self.post_update()
 
     def post_update(self) -> None:
+        if self._pending is not None:
+            self._pending.stop()
+            self._pending = None
         update = FindDialog.Update(
             find=self.get_value(),
+            mode=self.mode,
         )
         self.post_message(update)
 
+    def action_cycle_mode(self) -> None:
+        self.mode = self.MODES[(self.MODES.index(self.mode) + 1) % len(self.MODES)]
+        placeholder = "find" if self.mode == "literal" else f"find ({self.mode})"
+        self.query_one("#find-text", Input).placeholder = placeholder
+        self.post_update()
+
     def action_dismiss_find(self) -> None:
         self.post_message(FindDialog.Dismiss())
@@ -1,3 +1,4 @@
+from textual import on
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.containers import Horizontal
@@ -6,6 +7,7 @@ from textual.reactive import reactive
 from r2s.widgets.find_dialog import FindDialog
 
 from .log_lines import LogLines
+from .store import LineStore
 
 
 class LogView(Horizontal):
@@ -19,16 +21,31 @@ class LogView(Horizontal):
         Binding("ctrl+l", "toggle('show_line_numbers')", "Line nos.", key_display="^l"),
         Binding("ctrl+f", "show_find_dialog", "Find", key_display="^f"),
         Binding("slash", "show_find_dialog", "Find", key_display="^f", show=False),
+        Binding("f3", "next_match", "Next", key_display="F3"),
+        Binding("shift+f3", "previous_match", "Previous", show=False),
     ]
 
     show_find: reactive[bool] = reactive(False)
     show_line_numbers: reactive[bool] = reactive(False)
 
+    def __init__(
+        self,
+        memory_limit: int = 32 * 1024 * 1024,
+        spill_dir: str | None = None,
+        id: str | None = None,
+        store: LineStore | None = None,
+    ) -> None:
+        """Show a new store of lines, or `store` if one is given."""
+        super().__init__(id=id)
+        self.memory_limit = memory_limit
+        self.spill_dir = spill_dir
+        self.store = store
+
     def compose(self) -> ComposeResult:
         yield (
-            log_lines := LogLines().data_bind(
-                LogView.show_line_numbers, LogView.show_find
-            )
+            log_lines := LogLines(
+                self.memory_limit, self.spill_dir, store=self.store
+            ).data_bind(LogView.show_line_numbers, LogView.show_find)
         )
         yield FindDialog()
 
@@ -49,3 +66,38 @@ class LogView(Horizontal):
         ):
             self.show_find = True
             find_dialog.focus_input()
+
+    @on(FindDialog.Dismiss)
+    def dismiss_find_dialog(self, event: FindDialog.Dismiss) -> None:
+        event.stop()
+        self.show_find = False
+
+    @on(FindDialog.Update)
+    def update_find(self, event: FindDialog.Update) -> None:
+        event.stop()
+        log_lines = self.query_one(LogLines)
+        if (event.find, event.mode) == (log_lines.find, log_lines.find_mode):
+            # Submitting the same search again moves to the next match.
+            log_lines.next_match()
+        else:
+            log_lines.search(event.find, event.mode)
+
+    def on_log_lines_matches_changed(self, event: LogLines.MatchesChanged) -> None:
+        event.stop()
+        if not self.query_one(LogLines).find:
+            status = ""
+        elif not event.valid:
+            status = "invalid pattern"
+        elif event.current is not None:
+            status = f"{event.current + 1} of {event.matches}"
+        else:
+            status = f"{event.matches} matches"
+        if status and not event.complete:
+            status += "…"
+        self.query_one(FindDialog).set_status(status)
+
+    def action_next_match(self) -> None:
+        self.query_one(LogLines).next_match()
+
+    def action_previous_match(self) -> None:
+        self.query_one(LogLines).next_match(-1)
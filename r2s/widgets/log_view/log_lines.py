@@ -1,7 +1,319 @@
+import re
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+from rich.text import Text
+from textual import log, work
+from textual.cache import LRUCache
+from textual.geometry import Size
+from textual.message import Message
 from textual.reactive import reactive
 from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.timer import Timer
+from textual.worker import get_current_worker
+
+from r2s.widgets.data_grid.search import fuzzy_positions
+
+from .search import NO_LINES, LogSearch, compile_search
+from .store import LineStore, line_array
+
+
+class LogLines(ScrollView, can_focus=True):
+    """A scrolling view of a `LineStore`, rendering only the lines on screen.
+
+    Appending keeps the view pinned to the end if it was already there. When
+    `view` is set, only the store lines it lists are shown; they must be in
+    ascending order.
+
+    Searches run on a worker, chunk by chunk, and matches stream in as they
+    are found. Appended lines are searched after `search_delay`.
+    """
+
+    DEFAULT_CSS = """
+    LogLines {
+        background: $surface;
+        color: $text;
+    }
+    LogLines > .log-lines--line-number {
+        color: $text-muted;
+    }
+    LogLines > .log-lines--highlight {
+        background: $warning-darken-2;
+    }
+    LogLines > .log-lines--current-match {
+        background: $accent-darken-2;
+    }
+    """
+
+    COMPONENT_CLASSES = {
+        "log-lines--line-number",
+        "log-lines--highlight",
+        "log-lines--current-match",
+    }
 
+    @dataclass
+    class MatchesChanged(Message):
+        matches: int
+        current: int | None
+        complete: bool
+        valid: bool = True
+
+    search_delay: float = 0.25
 
-class LogLines(ScrollView):
     show_find: reactive[bool] = reactive(False)
     show_line_numbers: reactive[bool] = reactive(False)
+
+    def __init__(
+        self,
+        memory_limit: int = 32 * 1024 * 1024,
+        spill_dir: str | None = None,
+        id: str | None = None,
+        store: LineStore | None = None,
+    ) -> None:
+        super().__init__(id=id)
+        if store is None:
+            store = LineStore(memory_limit=memory_limit, spill_dir=spill_dir)
+        self.store = store
+        self.view: array | None = None
+        self._strips: LRUCache[Tuple[int, int], Strip] = LRUCache(1024)
+        self.searcher = LogSearch(self.store)
+        self.find = ""
+        self.find_mode = "literal"
+        self.current_match: int | None = None
+        self._matches: Dict[int, np.ndarray] = {}
+        self._visible_matches: np.ndarray | None = None
+        self._searched = 0
+        self._pending_search: Timer | None = None
+
+    @property
+    def following(self) -> bool:
+        return self.scroll_y >= self.max_scroll_y
+
+    @property
+    def row_count(self) -> int:
+        return len(self.store) if self.view is None else len(self.view)
+
+    def set_view(self, lines: Iterable[int] | None) -> None:
+        """Show only the given store lines, or every line for None."""
+        self.view = None if lines is None else line_array(lines)
+        self.current_match = None
+        self._visible_matches = None
+        self._update_size(True)
+        self._post_matches()
+
+    def extend_view(self, lines: Iterable[int]) -> None:
+        following = self.following
+        self.view.extend(line_array(lines))
+        self._visible_matches = None
+        self._update_size(following)
+
+    def append(self, line: str) -> None:
+        self.extend((line,))
+
+    def extend(self, lines: Iterable[str]) -> None:
+        following = self.following
+        self.store.extend(lines)
+        self._update_size(following)
+
+    def load_files(self, paths: List[Path]) -> None:
+        """Append the contents of log files, each after a header line."""
+        self._load_files(paths)
+
+    @work(thread=True, group="log-lines")
+    def _load_files(self, paths: List[Path]) -> None:
+        for path in paths:
+            try:
+                mapped = self.store.map_file(str(path))
+            except OSError as ex:
+                log(f"Cannot read {path}: {ex!r}")
+                continue
+            self.app.call_from_thread(self._add_mapped, path, mapped)
+
+    def _add_mapped(self, path: Path, mapped) -> None:
+        following = self.following
+        self.store.append(f"==> {path} <==")
+        self.store.add_mapped(*mapped)
+        self._update_size(following)
+
+    def _update_size(self, follow: bool = False) -> None:
+        width = self.store.longest + self._gutter_width()
+        self.virtual_size = Size(max(width, self.size.width), self.row_count)
+        if follow:
+            self.scroll_end(animate=False)
+        self.refresh()
+        if self.find and self._searched < len(self.store):
+            if self._pending_search is None:
+                self._pending_search = self.set_timer(
+                    self.search_delay, self._search_appended
+                )
+
+    def search(self, find: str, mode: str = "literal") -> None:
+        """Find the lines matching `find`, replacing the previous search."""
+        if (find, mode) == (self.find, self.find_mode):
+            return
+        self.find = find
+        self.find_mode = mode
+        self.current_match = None
+        self._matches = {}
+        self._visible_matches = None
+        self._searched = 0
+        self._strips.clear()
+        self.refresh()
+        if not find:
+            self.workers.cancel_group(self, "log-search")
+            self._post_matches()
+            return
+        self._search(find, mode, len(self.store))
+
+    def _search_appended(self) -> None:
+        self._pending_search = None
+        if self.find:
+            self._search(self.find, self.find_mode, len(self.store))
+
+    @work(thread=True, exclusive=True, group="log-search")
+    def _search(self, find: str, mode: str, lines: int) -> None:
+        worker = get_current_worker()
+        if compile_search(find, mode) is None:
+            self.app.call_from_thread(self._add_matches, find, mode, {}, lines, False)
+            return
+        found: Dict[int, np.ndarray] = {}
+        posted = time.monotonic()
+        for chunk in self.searcher.chunks(lines):
+            if worker.is_cancelled:
+                return
+            end = min(lines, (chunk + 1) * self.searcher.chunk_lines)
+            found[chunk] = self.searcher.scan(find, mode, chunk, end)
+            # Stream matches in, but not faster than the screen refreshes.
+            if time.monotonic() - posted > 0.05:
+                posted = time.monotonic()
+                self.app.call_from_thread(
+                    self._add_matches, find, mode, found, end, True
+                )
+                found = {}
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self._add_matches, find, mode, found, lines, True)
+
+    def _add_matches(
+        self,
+        find: str,
+        mode: str,
+        found: Dict[int, np.ndarray],
+        searched: int,
+        valid: bool,
+    ) -> None:
+        if (find, mode) != (self.find, self.find_mode):
+            return
+        self._matches.update(found)
+        self._visible_matches = None
+        self._searched = searched
+        self._post_matches(valid)
+
+    @property
+    def matches(self) -> np.ndarray:
+        """The sorted rows of the matching lines that are shown."""
+        if self._visible_matches is None:
+            chunks = [self._matches[chunk] for chunk in sorted(self._matches)]
+            lines = np.concatenate(chunks) if chunks else NO_LINES
+            if self.view is not None:
+                view = np.frombuffer(self.view, dtype=np.uint64)
+                rows = np.searchsorted(view, lines)
+                shown = rows < len(view)
+                shown[shown] = view[rows[shown]] == lines[shown]
+                lines = rows[shown]
+            self._visible_matches = lines.astype(np.int64)
+        return self._visible_matches
+
+    def _post_matches(self, valid: bool = True) -> None:
+        matches = self.matches
+        current = None
+        if self.current_match is not None:
+            index = np.searchsorted(matches, self.current_match)
+            if index < len(matches) and matches[index] == self.current_match:
+                current = int(index)
+        complete = self._searched >= len(self.store)
+        self.post_message(
+            LogLines.MatchesChanged(len(matches), current, complete, valid)
+        )
+
+    def next_match(self, step: int = 1) -> None:
+        """Move to the next matching row, or the previous one for -1."""
+        matches = self.matches
+        if not len(matches):
+            return
+        if self.current_match is not None:
+            anchor = self.current_match
+        else:
+            anchor = self.scroll_y - 1 if step > 0 else self.scroll_y + 1
+        if step > 0:
+            index = np.searchsorted(matches, anchor, side="right")
+        else:
+            index = np.searchsorted(matches, anchor, side="left") - 1
+        self.current_match = int(matches[index % len(matches)])
+        self._strips.clear()
+        height = self.scrollable_content_region.height
+        self.scroll_to(y=max(0, self.current_match - height // 2), animate=False)
+        self.refresh()
+        self._post_matches()
+
+    def highlight(self, line: Text) -> None:
+        """Highlight the search matches in a line"""
+        style = self.get_component_rich_style("log-lines--highlight")
+        if self.find_mode == "regex":
+            try:
+                line.highlight_regex(re.compile(self.find), style)
+            except re.error:
+                pass
+        elif self.find_mode == "fuzzy":
+            for position in fuzzy_positions(self.find, line.plain) or ():
+                line.stylize(style, position, position + 1)
+        else:
+            line.highlight_words([self.find], style)
+
+    def _gutter_width(self) -> int:
+        if not self.show_line_numbers:
+            return 0
+        return len(str(len(self.store))) + 1
+
+    def watch_show_line_numbers(self) -> None:
+        self._strips.clear()
+        self._update_size()
+
+    def notify_style_update(self) -> None:
+        self._strips.clear()
+
+    def on_resize(self) -> None:
+        self._update_size()
+
+    def on_unmount(self) -> None:
+        self.store.close()
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        width = self.size.width
+        row = scroll_y + y
+        if row >= self.row_count:
+            return Strip.blank(width, self.rich_style)
+        index = row if self.view is None else self.view[row]
+        gutter = self._gutter_width()
+        # Keyed by gutter width too, since it grows with the line count.
+        key = (index, gutter)
+        strip = self._strips.get(key)
+        if strip is None:
+            text = self.store.line(index).expandtabs()
+            line = Text.from_ansi(text) if "\x1b" in text else Text(text)
+            line.no_wrap = True
+            if self.find:
+                self.highlight(line)
+            if row == self.current_match:
+                line.stylize(self.get_component_rich_style("log-lines--current-match"))
+            if gutter:
+                style = self.get_component_rich_style("log-lines--line-number")
+                line = Text.assemble((f"{index + 1:>{gutter - 1}} ", style), line)
+            strip = Strip(line.render(self.app.console), line.cell_len)
+            self._strips[key] = strip
+        return strip.crop_extend(scroll_x, scroll_x + width, self.rich_style)
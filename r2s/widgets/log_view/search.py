@@ -0,0 +1,138 @@
+import re
+from itertools import chain
+from threading import Lock
+from typing import Dict, Tuple
+
+import numpy as np
+from textual.cache import LRUCache
+
+from .store import LineStore
+
+# Lines per chunk. Chunks are the unit of scanning, caching and reporting.
+CHUNK_LINES = 64 * 1024
+
+NO_LINES = np.zeros(0, dtype=np.uint64)
+
+
+def compile_search(find: str, mode: str) -> re.Pattern | None:
+    """The bytes pattern for a query in a find mode, or None if invalid."""
+    try:
+        if mode == "regex":
+            return re.compile(find.encode(), re.MULTILINE)
+        if mode == "fuzzy":
+            chars = (re.escape(char.encode()) for char in find)
+            return re.compile(b"[^\n]*?".join(chars), re.IGNORECASE)
+        return re.compile(re.escape(find.encode()))
+    except re.error:
+        return None
+
+
+class LogSearch:
+    """Finds the lines of a `LineStore` matching a query, one chunk at a time.
+
+    The matching lines of each chunk are cached per query. A full chunk never
+    changes, and a partial last chunk is only scanned past the lines already
+    seen, so new lines cost a scan of themselves. For a literal query, a
+    chunk already scanned for a shorter query it contains is narrowed by
+    rescanning only the lines that matched.
+
+    Literal and fuzzy queries cannot span lines, so they run once over a
+    chunk's bytes. A regex could match across a line break, or hide matches
+    on the lines after a long match, so it is searched for line by line.
+    """
+
+    def __init__(self, store: LineStore, chunk_lines: int = CHUNK_LINES) -> None:
+        self.store = store
+        self.chunk_lines = chunk_lines
+        self._lock = Lock()
+        self._cache: LRUCache[Tuple[str, str], Dict[int, Tuple[int, np.ndarray]]]
+        self._cache = LRUCache(16)
+
+    def chunks(self, lines: int) -> range:
+        return range((lines + self.chunk_lines - 1) // self.chunk_lines)
+
+    def scan(self, find: str, mode: str, chunk: int, end: int) -> np.ndarray:
+        """The sorted lines of `chunk` before line `end` that match."""
+        pattern = compile_search(find, mode)
+        if pattern is None:
+            return NO_LINES
+        start = chunk * self.chunk_lines
+        with self._lock:
+            results = self._cache.get((find, mode))
+            if results is None:
+                results = self._cache[(find, mode)] = {}
+            narrower = None
+            if chunk not in results:
+                narrower = self._narrower(find, mode, chunk)
+            scanned, lines = results.get(chunk, (start, NO_LINES))
+        if scanned >= end:
+            return lines[: np.searchsorted(lines, end)]
+        if narrower is not None:
+            candidates = narrower[1]
+            lines = self._scan_lines(pattern, candidates[candidates < end])
+            scanned = min(narrower[0], end)
+        if scanned < end:
+            scan = self._search_range if mode == "regex" else self._scan_range
+            lines = np.concatenate([lines, scan(pattern, scanned, end)])
+        with self._lock:
+            results[chunk] = (end, lines)
+        return lines
+
+    def _narrower(self, find: str, mode: str, chunk: int):
+        if mode != "literal":
+            return None
+        for query, query_mode in list(self._cache.keys()):
+            if query_mode == mode and query and query != find and query in find:
+                results = self._cache.get((query, query_mode))
+                if results is not None and chunk in results:
+                    return results[chunk]
+        return None
+
+    @staticmethod
+    def _positions(pattern: re.Pattern, data: bytes) -> list:
+        # Empty matches, such as of `x*`, would match every line.
+        return [m.start() for m in pattern.finditer(data) if m.end() > m.start()]
+
+    def _scan_lines(self, pattern: re.Pattern, lines: np.ndarray) -> np.ndarray:
+        matched = [
+            line
+            for line in lines
+            if self._positions(pattern, self.store.line_bytes(int(line)))
+        ]
+        return np.array(matched, dtype=np.uint64)
+
+    def _scan_range(self, pattern: re.Pattern, start: int, end: int) -> np.ndarray:
+        offsets = np.array(self.store.offsets[start:end], dtype=np.uint64)
+        if not len(offsets):
+            return NO_LINES
+        first = int(offsets[0])
+        positions = self._positions(
+            pattern, self.store.read(first, self.store.end(end - 1))
+        )
+        if not positions:
+            return NO_LINES
+        lines = np.searchsorted(
+            offsets - np.uint64(first), np.array(positions, dtype=np.uint64), "right"
+        )
+        return np.unique(lines - 1 + start).astype(np.uint64)
+
+    def _search_range(self, pattern: re.Pattern, start: int, end: int) -> np.ndarray:
+        """The lines from `start` to `end` in which `pattern` matches alone."""
+        offsets = self.store.offsets[start:end]
+        if not len(offsets):
+            return NO_LINES
+        first = offsets[0]
+        data = self.store.read(first, self.store.end(end - 1))
+        matched = []
+        begin = 0
+        for line, stop in enumerate(
+            chain((offset - first for offset in offsets[1:]), (len(data),)), start
+        ):
+            # Search up to the line ending, as if the line were the whole text.
+            cut = stop
+            while cut > begin and data[cut - 1] in b"\r\n":
+                cut -= 1
+            if pattern.search(data, begin, cut) is not None:
+                matched.append(line)
+            begin = stop
+        return np.array(matched, dtype=np.uint64)
@@ -0,0 +1,170 @@
+import mmap
+import os
+import tempfile
+from array import array
+from bisect import bisect_right
+from threading import RLock
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+# Bytes scanned at a time when indexing the lines of a file.
+INDEX_CHUNK = 16 * 1024 * 1024
+
+
+def index_lines(data) -> np.ndarray:
+    """Offsets at which the lines of `data` start."""
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    starts = [np.zeros(1, dtype=np.uint64)] if len(buffer) else []
+    for start in range(0, len(buffer), INDEX_CHUNK):
+        chunk = buffer[start : start + INDEX_CHUNK]
+        starts.append(np.flatnonzero(chunk == ord("\n")).astype(np.uint64) + start + 1)
+    if not starts:
+        return np.zeros(0, dtype=np.uint64)
+    offsets = np.concatenate(starts)
+    if offsets[-1] == len(buffer):
+        # A trailing newline ends the last line rather than starting one.
+        offsets = offsets[:-1]
+    return offsets
+
+
+def line_array(lines: Iterable[int]) -> array:
+    """Line numbers as an `array`, copying numpy arrays without iterating."""
+    if isinstance(lines, np.ndarray):
+        result = array("Q")
+        result.frombytes(lines.astype(np.uint64).tobytes())
+        return result
+    return array("Q", lines)
+
+
+class LineStore:
+    """An append-only store of text lines with a bounded memory footprint.
+
+    Lines are kept as UTF-8 in one logical byte stream, and an `array` of
+    start offsets indexes them, at 8 bytes per line. New lines go to an
+    in-memory tail; when the tail outgrows `memory_limit` it is written to a
+    spill file in `spill_dir` and memory-mapped. Log files are mapped
+    directly instead of being copied. Reading a line only touches its bytes.
+
+    Lines are added on one thread, but may be read from any.
+    """
+
+    def __init__(self, memory_limit: int = 32 * 1024 * 1024, spill_dir=None):
+        self.memory_limit = memory_limit
+        self.spill_dir = spill_dir
+        self.offsets = array("Q")
+        self._segments: List[Tuple[int, mmap.mmap]] = []
+        self._bases: List[int] = []
+        self._tail = bytearray()
+        self._tail_base = 0
+        self.longest = 0
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @property
+    def size(self) -> int:
+        """The total number of bytes stored."""
+        return self._tail_base + len(self._tail)
+
+    def append(self, line: str) -> None:
+        self.extend((line,))
+
+    def extend(self, lines: Iterable[str]) -> None:
+        with self._lock:
+            for line in lines:
+                self.offsets.append(self.size)
+                self._tail += line.encode("utf-8", "replace")
+                self._tail += b"\n"
+                self.longest = max(self.longest, len(line))
+                if len(self._tail) > self.memory_limit:
+                    self.spill()
+
+    def spill(self) -> None:
+        """Move the in-memory tail to a memory-mapped spill file."""
+        with self._lock:
+            if not self._tail:
+                return
+            fd, path = tempfile.mkstemp(prefix="r2s-log-", dir=self.spill_dir)
+            with os.fdopen(fd, "wb") as spill:
+                spill.write(self._tail)
+            with open(path, "rb") as spill:
+                data = mmap.mmap(spill.fileno(), 0, access=mmap.ACCESS_READ)
+            # The mapping keeps the data alive, and nothing is left behind.
+            os.unlink(path)
+            self._add_segment(data)
+            self._tail = bytearray()
+
+    def add_file(self, path: str) -> None:
+        """Append the lines of a file, mapping rather than copying it."""
+        self.add_mapped(*self.map_file(path))
+
+    def map_file(self, path: str) -> Tuple[mmap.mmap | None, np.ndarray]:
+        """Map and index a file; safe to call off the thread using the store."""
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return None, np.zeros(0, dtype=np.uint64)
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return data, index_lines(data)
+
+    def add_mapped(self, data: mmap.mmap | None, offsets: np.ndarray) -> None:
+        """Append a file mapped and indexed by `map_file`."""
+        if data is None:
+            return
+        if len(offsets):
+            lengths = np.diff(offsets, append=np.uint64(len(data)))
+            self.longest = max(self.longest, int(lengths.max()))
+        with self._lock:
+            self.spill()
+            base = self.size
+            self.offsets.frombytes((offsets + np.uint64(base)).tobytes())
+            self._add_segment(data)
+
+    def _add_segment(self, data: mmap.mmap) -> None:
+        self._bases.append(self._tail_base)
+        self._segments.append((self._tail_base, data))
+        self._tail_base += len(data)
+
+    def read(self, start: int, end: int) -> bytes:
+        """The bytes of the stream between two offsets."""
+        with self._lock:
+            return self._read(start, end)
+
+    def _read(self, start: int, end: int) -> bytes:
+        if start >= self._tail_base:
+            return bytes(self._tail[start - self._tail_base : end - self._tail_base])
+        parts = []
+        index = bisect_right(self._bases, start) - 1
+        while start < end:
+            if index >= len(self._segments):
+                parts.append(self._tail[: end - self._tail_base])
+                break
+            base, data = self._segments[index]
+            stop = min(end, base + len(data))
+            parts.append(data[start - base : stop - base])
+            start = stop
+            index += 1
+        return b"".join(parts)
+
+    def end(self, index: int) -> int:
+        """The offset just past line `index`, including its newline."""
+        with self._lock:
+            if index + 1 < len(self.offsets):
+                return self.offsets[index + 1]
+            return self.size
+
+    def line_bytes(self, index: int) -> bytes:
+        with self._lock:
+            data = self._read(self.offsets[index], self.end(index))
+        return data.rstrip(b"\r\n")
+
+    def line(self, index: int) -> str:
+        return self.line_bytes(index).decode("utf-8", "replace")
+
+    def close(self) -> None:
+        with self._lock:
+            for _, data in self._segments:
+                data.close()
+            self._segments.clear()
+            self._bases.clear()
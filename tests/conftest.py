@@ -0,0 +1,58 @@
+from typing import Callable, List, Tuple
+
+import pytest
+
+Metric = Tuple[str, str, float, str]
+
+RESULTS: List[Metric] = []
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--bench-scale",
+        type=float,
+        default=1.0,
+        help="Multiply the size of the simulated graphs used by benchmarks.",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers", "benchmark: measures r2s against a simulated ROS graph"
+    )
+
+
+@pytest.fixture
+def scale(request: pytest.FixtureRequest) -> Callable[[int], int]:
+    """Scale a graph size by --bench-scale."""
+    factor = request.config.getoption("--bench-scale")
+    return lambda size: max(1, int(size * factor))
+
+
+@pytest.fixture
+def bench(request: pytest.FixtureRequest) -> Callable[[str, float, str], None]:
+    """Record a metric, to be reported at the end of the session."""
+
+    def record(name: str, value: float, unit: str) -> None:
+        # User properties travel with the test report, also from xdist workers.
+        request.node.user_properties.append(("benchmark", (name, value, unit)))
+
+    return record
+
+
+def pytest_runtest_logreport(report: pytest.TestReport) -> None:
+    if report.when != "call":
+        return
+    for key, value in report.user_properties:
+        if key == "benchmark":
+            name, measured, unit = value
+            RESULTS.append((report.nodeid, name, measured, unit))
+
+
+def pytest_terminal_summary(terminalreporter) -> None:
+    if not RESULTS:
+        return
+    terminalreporter.section("benchmarks")
+    for nodeid, name, value, unit in sorted(RESULTS):
+        test = nodeid.split("::")[-1]
+        terminalreporter.write_line(f"{test:<45} {name:<28} {value:>12.3f} {unit}")
@@ -0,0 +1,228 @@
+"""A synthetic ROS graph that stands in for rclpy in benchmarks.
+
+`SimulatedGraph` answers the graph queries r2s makes of an `rclpy.Node`
+from in-memory tables, and `FakeNodeWrapper` wraps it the way
+`r2s.screens.ros2.get_node.NodeWrapper` wraps a real node.
+"""
+
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+TOPIC_TYPES = [
+    "std_msgs/msg/String",
+    "sensor_msgs/msg/Image",
+    "sensor_msgs/msg/PointCloud2",
+    "geometry_msgs/msg/Twist",
+    "nav_msgs/msg/Odometry",
+    "tf2_msgs/msg/TFMessage",
+]
+
+SERVICE_TYPES = [
+    "std_srvs/srv/Trigger",
+    "std_srvs/srv/SetBool",
+    "rcl_interfaces/srv/GetParameters",
+]
+
+ACTION_TYPES = [
+    "nav2_msgs/action/NavigateToPose",
+    "control_msgs/action/FollowJointTrajectory",
+]
+
+# The services rclpy creates for every action server.
+ACTION_SERVICES = {
+    "_action/send_goal": "_SendGoal",
+    "_action/cancel_goal": "action_msgs/srv/CancelGoal",
+    "_action/get_result": "_GetResult",
+}
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """The parts of rclpy's TopicEndpointInfo that r2s reads."""
+
+    node_name: str
+    node_namespace: str
+
+
+@dataclass
+class SimulatedNode:
+    name: str
+    namespace: str
+    publishes: Set[str] = field(default_factory=set)
+    subscribes: Set[str] = field(default_factory=set)
+    servers: Dict[str, str] = field(default_factory=dict)
+    clients: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.namespace.rstrip('/')}/{self.name}"
+
+
+class SimulatedHandle:
+    def __init__(self, graph: "SimulatedGraph") -> None:
+        self.graph = graph
+
+    def get_action_names_and_types(self) -> List[Tuple[str, List[str]]]:
+        return [(name, [type]) for name, type in self.graph.actions.items()]
+
+
+class SimulatedGraph:
+    """A random graph of nodes, topics, services and actions.
+
+    Every node publishes and subscribes to `endpoints` random topics, serves
+    `services` services of its own and calls one service of another node.
+    `churn` replaces a fraction of the nodes with new ones, the way nodes
+    come and go on a live system.
+    """
+
+    def __init__(
+        self,
+        nodes: int = 100,
+        topics: int = 200,
+        services: int = 5,
+        actions: int = 10,
+        endpoints: int = 4,
+        namespaces: int = 10,
+        seed: int = 0,
+    ) -> None:
+        self.random = random.Random(seed)
+        self.topic_count = topics
+        self.services_per_node = services
+        self.endpoints = endpoints
+        self.namespaces = namespaces
+        self.handle = SimulatedHandle(self)
+
+        self.nodes: Dict[str, SimulatedNode] = {}
+        self.topics: Dict[str, str] = {
+            f"/sim/topic_{i}": self.random.choice(TOPIC_TYPES) for i in range(topics)
+        }
+        self.publishers: Dict[str, Set[str]] = {t: set() for t in self.topics}
+        self.subscribers: Dict[str, Set[str]] = {t: set() for t in self.topics}
+        self.services: Dict[str, str] = {}
+        self.actions: Dict[str, str] = {}
+        self._serial = 0
+
+        for _ in range(nodes):
+            self.add_node()
+        for i in range(actions):
+            self.add_action(f"/sim/action_{i}")
+
+    def add_node(self, name: str = "node") -> SimulatedNode:
+        serial = self._serial
+        self._serial += 1
+        node = SimulatedNode(
+            name=f"{name}_{serial}",
+            namespace=f"/sim/ns_{serial % self.namespaces}",
+        )
+        topics = list(self.topics)
+        node.publishes = set(self.random.sample(topics, self.endpoints))
+        node.subscribes = set(self.random.sample(topics, self.endpoints))
+        for i in range(self.services_per_node):
+            node.servers[f"{node.full_name}/service_{i}"] = self.random.choice(
+                SERVICE_TYPES
+            )
+        if self.services:
+            name = self.random.choice(list(self.services))
+            node.clients[name] = self.services[name]
+
+        self.nodes[node.full_name] = node
+        for topic in node.publishes:
+            self.publishers[topic].add(node.full_name)
+        for topic in node.subscribes:
+            self.subscribers[topic].add(node.full_name)
+        self.services.update(node.servers)
+        return node
+
+    def remove_node(self, full_name: str) -> None:
+        node = self.nodes.pop(full_name)
+        for topic in node.publishes:
+            self.publishers[topic].discard(full_name)
+        for topic in node.subscribes:
+            self.subscribers[topic].discard(full_name)
+        for name in node.servers:
+            self.services.pop(name, None)
+        for name in list(self.actions):
+            if f"{name}/_action/send_goal" in node.servers:
+                del self.actions[name]
+
+    def add_action(self, name: str) -> None:
+        node = self.random.choice(list(self.nodes.values()))
+        type = self.random.choice(ACTION_TYPES)
+        self.actions[name] = type
+        for suffix, service_type in ACTION_SERVICES.items():
+            if service_type.startswith("_"):
+                service_type = type + service_type
+            node.servers[f"{name}/{suffix}"] = service_type
+        self.services.update(node.servers)
+
+    def swap_publisher(self, topic: str) -> Tuple[str, str]:
+        """Move one publisher of a topic to another node, keeping the count."""
+        old = self.random.choice(sorted(self.publishers[topic]))
+        new = self.random.choice(sorted(self.nodes.keys() - self.publishers[topic]))
+        self.nodes[old].publishes.discard(topic)
+        self.nodes[new].publishes.add(topic)
+        self.publishers[topic] ^= {old, new}
+        return old, new
+
+    def churn(self, fraction: float) -> None:
+        """Replace a fraction of the nodes with freshly wired ones."""
+        count = max(1, int(len(self.nodes) * fraction))
+        for full_name in self.random.sample(list(self.nodes), count):
+            self.remove_node(full_name)
+        for _ in range(count):
+            self.add_node()
+
+    def _endpoints(self, full_names: Set[str]) -> List[Endpoint]:
+        return [
+            Endpoint(node_name=node.name, node_namespace=node.namespace)
+            for node in (self.nodes[name] for name in full_names)
+        ]
+
+    # The rclpy.Node graph API used by r2s.
+
+    def get_node_names_and_namespaces(self) -> List[Tuple[str, str]]:
+        return [(node.name, node.namespace) for node in self.nodes.values()]
+
+    def get_topic_names_and_types(self) -> List[Tuple[str, List[str]]]:
+        return [(name, [type]) for name, type in self.topics.items()]
+
+    def count_publishers(self, topic: str) -> int:
+        return len(self.publishers.get(topic, ()))
+
+    def count_subscribers(self, topic: str) -> int:
+        return len(self.subscribers.get(topic, ()))
+
+    def get_publishers_info_by_topic(self, topic: str) -> List[Endpoint]:
+        return self._endpoints(self.publishers.get(topic, set()))
+
+    def get_subscriptions_info_by_topic(self, topic: str) -> List[Endpoint]:
+        return self._endpoints(self.subscribers.get(topic, set()))
+
+    def get_service_names_and_types(self) -> List[Tuple[str, List[str]]]:
+        return [(name, [type]) for name, type in self.services.items()]
+
+    def _node(self, name: str, namespace: str) -> SimulatedNode:
+        return self.nodes[f"{namespace.rstrip('/')}/{name}"]
+
+    def get_service_names_and_types_by_node(
+        self, name: str, namespace: str
+    ) -> List[Tuple[str, List[str]]]:
+        node = self._node(name, namespace)
+        return [(n, [t]) for n, t in node.servers.items()]
+
+    def get_client_names_and_types_by_node(
+        self, name: str, namespace: str
+    ) -> List[Tuple[str, List[str]]]:
+        node = self._node(name, namespace)
+        return [(n, [t]) for n, t in node.clients.items()]
+
+
+class FakeNodeWrapper:
+    """Stands in for NodeWrapper, without rclpy or a spinning thread."""
+
+    def __init__(self, graph: SimulatedGraph) -> None:
+        self.node = graph
+
+    def stop(self) -> None:
+        pass
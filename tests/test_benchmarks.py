@@ -0,0 +1,204 @@
+"""Benchmarks of r2s against a simulated ROS graph.
+
+Run them with `make bench`, and scale the graphs with --bench-scale.
+"""
+
+import tracemalloc
+from statistics import mean, quantiles
+from time import perf_counter
+from typing import Callable, List
+
+import pytest
+from textual.app import App, ComposeResult
+
+from r2s.screens.ros2.graph import GraphCache
+from r2s.screens.ros2.interfaces import InterfaceListGrid, InterfaceListWatcher
+from r2s.screens.ros2.nodes import NodeListWatcher
+from r2s.ui import UI
+from r2s.widgets.data_grid.virtual_table import VirtualTable
+from r2s.widgets.find_dialog import FindDialog
+from tests.simulated_graph import FakeNodeWrapper, SimulatedGraph
+
+pytestmark = pytest.mark.benchmark
+
+GRAPH_SIZES = [pytest.param(100, id="100-nodes"), pytest.param(1000, id="1000-nodes")]
+
+CYCLES = 20
+REPEATS = 10
+TIMEOUT = 60.0
+
+
+def make_graph(scale: Callable[[int], int], nodes: int) -> SimulatedGraph:
+    return SimulatedGraph(
+        nodes=scale(nodes),
+        topics=scale(2 * nodes),
+        services=5,
+        actions=scale(nodes // 10),
+    )
+
+
+def record_timings(bench, name: str, samples: List[float]) -> None:
+    bench(f"{name} mean", 1000 * mean(samples), "ms")
+    if len(samples) > 1:
+        bench(f"{name} p95", 1000 * quantiles(samples, n=20)[-1], "ms")
+
+
+class Sink:
+    """Collects the messages a watcher posts to its target."""
+
+    def __init__(self) -> None:
+        self.messages: list = []
+
+    def post_message(self, message) -> bool:
+        self.messages.append(message)
+        return True
+
+
+async def wait_for(pilot, condition: Callable[[], bool]) -> None:
+    deadline = perf_counter() + TIMEOUT
+    while not condition():
+        assert perf_counter() < deadline, "timed out waiting for the UI"
+        await pilot.pause(0.001)
+
+
+async def wait_for_interfaces(app: UI, pilot, graph: SimulatedGraph):
+    expected = len(graph.topics) + len(graph.services) + len(graph.actions)
+    await wait_for(pilot, lambda: bool(app.screen.query(InterfaceListGrid)))
+    grid = app.screen.query_one(InterfaceListGrid)
+    await wait_for(pilot, lambda: len(grid.records) == expected)
+    await pilot.pause()
+    return grid
+
+
+@pytest.mark.parametrize("nodes", GRAPH_SIZES)
+def test_watcher_cycle(bench, scale, nodes: int) -> None:
+    graph = make_graph(scale, nodes)
+    cache = GraphCache(FakeNodeWrapper(graph))
+    watchers = [NodeListWatcher(cache), InterfaceListWatcher(cache)]
+    sink = Sink()
+    for watcher in watchers:
+        watcher.target = sink
+
+    def cycle() -> float:
+        start = perf_counter()
+        cache.poll()
+        for watcher in watchers:
+            watcher.poll()
+        return perf_counter() - start
+
+    try:
+        bench("initial cycle", 1000 * cycle(), "ms")
+        steady = [cycle() for _ in range(CYCLES)]
+        churned = []
+        for _ in range(CYCLES):
+            graph.churn(0.01)
+            churned.append(cycle())
+    finally:
+        for watcher in watchers:
+            watcher.close()
+
+    record_timings(bench, "steady cycle", steady)
+    record_timings(bench, "1% churn cycle", churned)
+    assert len(sink.messages) == 2 * (CYCLES + 1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("nodes", GRAPH_SIZES)
+async def test_populate_rows(bench, scale, nodes: int) -> None:
+    graph = make_graph(scale, nodes)
+    app = UI(node=FakeNodeWrapper(graph))
+    async with app.run_test(size=(160, 50)) as pilot:
+        grid = await wait_for_interfaces(app, pilot, graph)
+        samples = []
+        for _ in range(REPEATS):
+            start = perf_counter()
+            grid.populate_rows()
+            samples.append(perf_counter() - start)
+            await pilot.pause()
+        bench("rows", len(grid.view), "rows")
+    record_timings(bench, "populate_rows", samples)
+
+
+class GridApp(App):
+    def compose(self) -> ComposeResult:
+        yield InterfaceListGrid()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("nodes", GRAPH_SIZES)
+async def test_memory_per_row(bench, scale, nodes: int) -> None:
+    graph = make_graph(scale, nodes)
+    cache = GraphCache(FakeNodeWrapper(graph))
+    watcher = InterfaceListWatcher(cache)
+    watcher.target = sink = Sink()
+    cache.poll()
+    watcher.poll()
+    watcher.close()
+    (message,) = sink.messages
+
+    app = GridApp()
+    async with app.run_test(size=(160, 50)) as pilot:
+        grid = app.query_one(InterfaceListGrid)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            grid.apply_changes(message.changes)
+            await pilot.pause()
+            used = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        rows = len(grid.records)
+    bench("memory per row", used / rows, "bytes")
+    assert rows == len(message.changes.added)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("nodes", GRAPH_SIZES)
+async def test_search_keystroke_latency(bench, scale, nodes: int) -> None:
+    graph = make_graph(scale, nodes)
+    app = UI(node=FakeNodeWrapper(graph))
+    async with app.run_test(size=(160, 50)) as pilot:
+        grid = await wait_for_interfaces(app, pilot, graph)
+        table = grid.query_one(VirtualTable)
+        dialog = grid.query_one(FindDialog)
+        # Measure filtering and rendering, not the typing pause.
+        dialog.debounce = 0
+        grid.action_show_find_dialog()
+        await pilot.pause()
+
+        def expected(query: str) -> set:
+            return {
+                key
+                for key, record in grid.records.items()
+                if grid.filter_row(record)
+                and any(
+                    query in str(grid.row_values(record)[column])
+                    for column in grid.search_columns
+                )
+            }
+
+        typed, erased = [], []
+        query = ""
+        keys = list("topic") + ["underscore", "1", "2"]
+        for key, char in zip(keys, "topic_12"):
+            query += char
+            rows = expected(query)
+            start = perf_counter()
+            await pilot.press(key)
+            await wait_for(
+                pilot, lambda: grid.search == query and set(table.rows) == rows
+            )
+            await pilot.pause()
+            typed.append(perf_counter() - start)
+        while len(query) > 1:
+            query = query[:-1]
+            rows = expected(query)
+            start = perf_counter()
+            await pilot.press("backspace")
+            await wait_for(
+                pilot, lambda: grid.search == query and set(table.rows) == rows
+            )
+            await pilot.pause()
+            erased.append(perf_counter() - start)
+    record_timings(bench, "keystroke to render", typed)
+    record_timings(bench, "backspace to render", erased)
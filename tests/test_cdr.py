@@ -0,0 +1,124 @@
+"""Tests of reading CDR buffers without deserializing them."""
+
+import struct
+
+import numpy as np
+import pytest
+
+from r2s.screens.ros2.cdr import CdrReader, parse_type
+
+FIELDS = {
+    "test_msgs/msg/Empty": {},
+    "test_msgs/msg/Point": {"x": "double", "y": "double"},
+    "test_msgs/msg/Mixed": {
+        "flag": "uint8",
+        "value": "double",
+        "label": "string",
+        "count": "int16",
+        "samples": "sequence<int32>",
+        "points": "sequence<test_msgs/Point>",
+        "empty": "test_msgs/Empty",
+        "last": "uint8",
+    },
+    "test_msgs/msg/Wide": {"text": "wstring", "after": "uint8"},
+}
+
+
+def layout(type_name: str):
+    return tuple((name, parse_type(type)) for name, type in FIELDS[type_name].items())
+
+
+class Writer:
+    """Serializes little-endian CDR, aligning each value to its size."""
+
+    def __init__(self) -> None:
+        self.payload = bytearray()
+
+    def pack(self, code: str, value) -> "Writer":
+        size = struct.calcsize(code)
+        self.payload += b"\0" * (-len(self.payload) % min(size, 8))
+        self.payload += struct.pack("<" + code, value)
+        return self
+
+    def string(self, text: str) -> "Writer":
+        encoded = text.encode() + b"\0"
+        self.pack("I", len(encoded))
+        self.payload += encoded
+        return self
+
+    def bytes(self) -> bytes:
+        return b"\0\1\0\0" + bytes(self.payload)
+
+
+def mixed(samples, points) -> bytes:
+    writer = Writer().pack("B", 7).pack("d", 2.5).string("hello").pack("h", -3)
+    writer.pack("I", len(samples))
+    for sample in samples:
+        writer.pack("i", sample)
+    writer.pack("I", len(points))
+    for x, y in points:
+        writer.pack("d", x).pack("d", y)
+    # An empty message takes one placeholder byte.
+    writer.payload += b"\0"
+    return writer.pack("B", 9).bytes()
+
+
+def values(data: bytes, type_name: str = "test_msgs/msg/Mixed", **kwargs):
+    reader = CdrReader(data, layout)
+    rows = reader.rows(type_name, **kwargs)
+    return reader, {row.path: row for row in rows}
+
+
+def test_parse_type() -> None:
+    assert parse_type("sequence<int32, 5>").kind == "sequence"
+    assert parse_type("double[3]").length == 3
+    assert parse_type("uint8[<=4]").kind == "sequence"
+    assert parse_type("string<=10").name == "string"
+    assert parse_type("geometry_msgs/Point").name == "geometry_msgs/msg/Point"
+
+
+def test_values_are_aligned() -> None:
+    reader, rows = values(mixed([1, 2, 3], [(1.0, 2.0)]))
+    assert reader.value(rows["flag"]) == 7
+    # The double after a single byte is padded out to offset 8.
+    assert reader.skip(rows["value"].type, rows["value"].offset) == 16
+    assert reader.value(rows["value"]) == 2.5
+    assert reader.value(rows["label"]) == "hello"
+    assert reader.value(rows["count"]) == -3
+    np.testing.assert_array_equal(reader.value(rows["samples"]), [1, 2, 3])
+    assert reader.value(rows["points[0].y"]) == 2.0
+    assert reader.value(rows["last"]) == 9
+
+
+def test_empty_sequences() -> None:
+    reader, rows = values(mixed([], []))
+    assert reader.value(rows["samples"]).size == 0
+    assert reader.value(rows["points"]) == 0
+    assert reader.describe(rows["samples"]) == "[]"
+    assert reader.value(rows["last"]) == 9
+
+
+def test_sequence_rows_are_limited() -> None:
+    points = [(float(i), 0.0) for i in range(5)]
+    reader, rows = values(mixed([], points), limit=2)
+    assert "points[1].x" in rows
+    assert "points[2].x" not in rows
+    assert any(path == "" for path in rows)
+    assert reader.value(rows["last"]) == 9
+
+
+def test_big_endian() -> None:
+    data = b"\0\0\0\0" + struct.pack(">d", 1.5) + struct.pack(">d", -2.0)
+    reader, rows = values(data, "test_msgs/msg/Point")
+    assert reader.value(rows["x"]) == 1.5
+    assert reader.value(rows["y"]) == -2.0
+
+
+def test_rejected_buffers() -> None:
+    with pytest.raises(ValueError):
+        CdrReader(b"\0\2\0\0", layout)
+    with pytest.raises(ValueError):
+        CdrReader(b"\0", layout)
+    wide = Writer().pack("I", 0).pack("B", 1).bytes()
+    with pytest.raises(ValueError, match="wstring"):
+        values(wide, "test_msgs/msg/Wide")
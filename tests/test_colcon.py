@@ -0,0 +1,254 @@
+"""Tests of finding, ordering and building colcon packages."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from textual.app import App
+
+from r2s.screens.colcon import discovery
+from r2s.screens.colcon.build_runner import JOB_LINE, BuildRunnerScreen, LineBuffer
+from r2s.screens.colcon.build_state import BuildLog, Duration
+from r2s.screens.colcon.discovery import (
+    Package,
+    PackageCache,
+    find_manifests,
+    parse_manifest,
+)
+from r2s.screens.colcon.graph import PackageGraph
+
+PACKAGE_XML = """<package format="3">
+  <name>{name}</name>
+  <version>1.2.3</version>
+  <depend>rclcpp</depend>
+  <exec_depend> std_msgs </exec_depend>
+  <export><build_type>ament_cmake</build_type></export>
+</package>
+"""
+
+
+def write(path: Path, text: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def test_parse_package_xml(tmp_path) -> None:
+    package = parse_manifest(
+        write(tmp_path / "a/package.xml", PACKAGE_XML.format(name="a"))
+    )
+    assert package.name == "a"
+    assert package.type == "ros.ament_cmake"
+    assert package.version == "1.2.3"
+    assert package.dependencies == ("rclcpp", "std_msgs")
+    assert parse_manifest(write(tmp_path / "b/package.xml", "<package>")) is None
+
+
+def test_parse_setup_py(tmp_path) -> None:
+    literal = write(
+        tmp_path / "a/setup.py", "from setuptools import setup\nsetup(name='pkg_a')\n"
+    )
+    assert parse_manifest(literal).name == "pkg_a"
+    variable = write(
+        tmp_path / "b/setup.py",
+        "package_name = 'pkg_b'\n\n"
+        "setup(\n    name=package_name,\n    version='1.0',\n)\n",
+    )
+    assert parse_manifest(variable).name == "pkg_b"
+    computed = write(tmp_path / "c/setup.py", "setup(\n    name=get_name(),\n)\n")
+    assert parse_manifest(computed).name == "c"
+    assert parse_manifest(write(tmp_path / "d/setup.py", "print()\n")) is None
+    setup_cfg = write(tmp_path / "e/setup.cfg", "[metadata]\nname = pkg_e\n")
+    assert parse_manifest(setup_cfg).name == "pkg_e"
+    cmake = write(tmp_path / "f/CMakeLists.txt", "project(pkg_f CXX)\n")
+    assert parse_manifest(cmake).type == "cmake"
+
+
+def test_find_manifests(tmp_path) -> None:
+    write(tmp_path / "a/package.xml", PACKAGE_XML.format(name="a"))
+    write(tmp_path / "a/nested/package.xml", PACKAGE_XML.format(name="nested"))
+    write(tmp_path / "b/setup.py", "setup(name='b')\n")
+    write(tmp_path / "b/package.xml", PACKAGE_XML.format(name="b"))
+    write(tmp_path / "ignored/COLCON_IGNORE", "")
+    write(tmp_path / "ignored/package.xml", PACKAGE_XML.format(name="ignored"))
+    write(tmp_path / ".hidden/package.xml", PACKAGE_XML.format(name="hidden"))
+    manifests = list(find_manifests(tmp_path))
+    assert manifests == [tmp_path / "a/package.xml", tmp_path / "b/package.xml"]
+
+
+def test_package_cache_checks_stamps(tmp_path, monkeypatch) -> None:
+    manifest = write(tmp_path / "src/a/package.xml", PACKAGE_XML.format(name="a"))
+    cache_path = tmp_path / "cache.json"
+    assert [p.name for p in PackageCache(tmp_path, cache_path).discover()] == ["a"]
+
+    parsed = []
+    parse = discovery.parse_manifest
+    monkeypatch.setattr(
+        discovery, "parse_manifest", lambda path: parsed.append(path) or parse(path)
+    )
+    # A warm start reads the cache rather than the manifest.
+    cache = PackageCache(tmp_path, cache_path)
+    assert [p.name for p in cache.discover()] == ["a"]
+    assert parsed == []
+    assert not cache.dirty
+
+    # Rewriting the manifest changes its size, so it is parsed again.
+    write(manifest, PACKAGE_XML.format(name="renamed"))
+    assert [p.name for p in cache.discover()] == ["renamed"]
+    assert parsed == [manifest]
+
+    # The same size with a new modification time is also noticed.
+    write(manifest, PACKAGE_XML.format(name="abcdefg"))
+    stat = manifest.stat()
+    os.utime(manifest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert [p.name for p in PackageCache(tmp_path, cache_path).discover()] == [
+        "abcdefg"
+    ]
+    assert len(parsed) == 2
+
+    manifest.unlink()
+    cache = PackageCache(tmp_path, cache_path)
+    assert cache.discover() == []
+    assert cache.entries == {}
+
+
+def package_graph(**dependencies) -> PackageGraph:
+    return PackageGraph(
+        Package(name, Path(name), "ros.ament_cmake", None, tuple(deps))
+        for name, deps in dependencies.items()
+    )
+
+
+def test_package_graph_order_and_closure() -> None:
+    graph = package_graph(
+        app=("nav", "msgs", "rclcpp"), nav=("msgs",), msgs=(), tools=(), viz=("nav",)
+    )
+    assert graph.order == ["msgs", "tools", "nav", "app", "viz"]
+    assert graph.acyclic == 5
+    assert graph.depth == {"msgs": 0, "tools": 0, "nav": 1, "app": 2, "viz": 2}
+    # Packages outside the workspace are ignored.
+    assert graph.dependencies_of("app") == ["msgs", "nav"]
+    assert graph.dependents_of("msgs") == ["nav", "app", "viz"]
+    assert graph.rebuild_set("nav") == ["nav", "app", "viz"]
+    assert graph.dependent_count("tools") == 0
+    assert "rclcpp" not in graph
+
+
+def test_package_graph_cycles() -> None:
+    graph = package_graph(
+        a=("b",), b=("a",), base=(), top=("a", "base"), self=("self",)
+    )
+    assert graph.order == ["base", "self", "a", "b", "top"]
+    assert graph.acyclic == 2
+    assert graph.depth["self"] == 0
+    assert graph.depth["a"] is None
+    assert graph.depth["top"] is None
+    assert "base" in graph.dependencies_of("top")
+
+
+def append(path: Path, text: str) -> None:
+    with open(path, "a") as events:
+        events.write(text)
+
+
+def test_build_log_reads_incrementally(tmp_path) -> None:
+    path = tmp_path / "events.log"
+    log = BuildLog(path)
+    assert not log.update()
+
+    append(path, "[1.0] (a) JobStarted: {'identifier': 'a'}\n[1.5] (a) StdoutLine: x\n")
+    assert log.update()
+    assert log.started == {"a": 1.0}
+    assert not log.update()
+
+    # A line split across reads is parsed once it is complete.
+    append(path, "[3.5] (a) JobEnded: {'identifier': 'a', ")
+    assert log.update()
+    assert log.ended == {}
+    append(path, "'rc': 2}\n[4.0] (b) JobStarted: {}\n")
+    offset = log._offset
+    assert log.update()
+    assert log.ended == {"a": (3.5, "2")}
+    assert log.started == {"a": 1.0, "b": 4.0}
+    assert log._offset == path.stat().st_size > offset
+
+    # A new build replaces the file and starts over.
+    replacement = tmp_path / "new.log"
+    replacement.write_text("[0.5] (c) JobStarted: {}\n")
+    os.replace(replacement, path)
+    assert log.update()
+    assert log.started == {"c": 0.5}
+    assert log.ended == {}
+    path.unlink()
+    assert log.update()
+    assert log.started == {}
+
+
+def test_duration() -> None:
+    assert str(Duration(5.25)) == "5.2s"
+    assert str(Duration(65.2)) == "1m 05.2s"
+    assert Duration(1) < Duration(2)
+
+
+def test_parse_manifests_reuses_pool(tmp_path, monkeypatch) -> None:
+    manifests = [
+        write(tmp_path / f"p{i}/package.xml", PACKAGE_XML.format(name=f"p{i}"))
+        for i in range(4)
+    ]
+    monkeypatch.setattr(discovery, "POOL_THRESHOLD", 2)
+    monkeypatch.setattr(discovery, "POOL_WORKERS", 2)
+    try:
+        names = [package.name for package in discovery.parse_manifests(manifests)]
+        assert names == ["p0", "p1", "p2", "p3"]
+        pool = discovery.parse_pool()
+        assert pool is not None
+        discovery.parse_manifests(manifests[:3])
+        assert discovery.parse_pool() is pool
+        # Too few manifests to be worth sending to the pool.
+        assert discovery.parse_manifests(manifests[:1])[0].name == "p0"
+    finally:
+        discovery.close_parse_pool()
+    assert discovery._pool is None
+
+
+def test_line_buffer() -> None:
+    buffer = LineBuffer(limit=8)
+    assert buffer.feed(b"one\r\ntw") == ["one"]
+    assert buffer.feed(b"o\nthr") == ["two"]
+    assert buffer.flush() == ["thr"]
+    assert buffer.flush() == []
+    # A line without an end is cut once it outgrows the limit.
+    assert buffer.feed(b"0123456789") == ["0123456789"]
+    assert buffer.feed(b"\xff\n") == ["\ufffd"]
+
+
+def test_job_lines() -> None:
+    assert JOB_LINE.match("Starting >>> my_pkg").groups() == ("Starting >>>", "my_pkg")
+    assert JOB_LINE.match("Finished <<< my_pkg [1.2s]")[2] == "my_pkg"
+    assert (
+        JOB_LINE.match("Failed   <<< my_pkg [0.5s, exited with code 2]")[2] == "my_pkg"
+    )
+    assert JOB_LINE.match("Aborted  <<< other")[2] == "other"
+    assert JOB_LINE.match("--- stderr: my_pkg") is None
+
+
+class SleepRunner(BuildRunnerScreen):
+    def command(self):
+        return [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+@pytest.mark.asyncio
+async def test_back_asks_before_stopping_a_build(tmp_path) -> None:
+    app = App()
+    async with app.run_test() as pilot:
+        screen = SleepRunner(tmp_path, "build", ["a"])
+        await app.push_screen(screen)
+        while not screen.running():
+            await pilot.pause(0.01)
+        await pilot.press("escape")
+        assert app.screen is screen
+        await pilot.press("escape")
+        await pilot.pause()
+        assert app.screen is not screen
+        assert screen.process.returncode is not None
@@ -0,0 +1,97 @@
+"""Tests of the data structures behind DataGrid."""
+
+from r2s.widgets.data_grid.search import SearchIndex
+from r2s.widgets.data_grid.sort import Descending, SortedIndex, sort_value
+from r2s.widgets.data_grid.store import RowStore
+
+
+def test_row_store_reuses_slots() -> None:
+    store = RowStore(2)
+    assert store.set("a", ("alpha", 1))
+    assert store.set("b", ("beta", 2))
+    assert not store.set("a", ("alpha", 1))
+    assert store.row("a") == ("alpha", 1)
+
+    slot = store.slot("a")
+    assert store.remove("a")
+    assert not store.remove("a")
+    assert "a" not in store
+    store.set("c", ("gamma", 3))
+    assert store.slot("c") == slot
+    assert sorted(store) == ["b", "c"]
+    assert store.widths == [5, 1]
+
+
+def test_row_store_versions() -> None:
+    store = RowStore(1)
+    store.set("a", ("x",))
+    version = store.version("a")
+    store.set("a", ("x",))
+    assert store.version("a") == version
+    store.set("a", ("y",))
+    assert store.version("a") == version + 1
+    assert store.value("a", 0) == "y"
+
+
+def search_index(**rows) -> SearchIndex:
+    index = SearchIndex()
+    for key, texts in rows.items():
+        index.update(key, texts)
+    return index
+
+
+def test_search_index_modes() -> None:
+    index = search_index(a=("/camera/image",), b=("/camera/info",), c=("/tf",))
+    assert index.search("camera") == {"a", "b"}
+    assert index.search("ca") == {"a", "b"}
+    assert index.search("image$", "regex") == {"a"}
+    assert index.search("(", "regex") == frozenset()
+    assert index.search("cmif", "fuzzy") == {"b"}
+    assert index.matches("c", "tf")
+    assert not index.matches("c", "camera")
+
+
+def test_search_index_updates_cached_results() -> None:
+    index = search_index(a=("/camera/image",), b=("/tf",))
+    assert index.search("camera") == {"a"}
+    index.update("b", ("/camera/depth",))
+    assert index.search("camera") == {"a", "b"}
+    index.remove("a")
+    assert index.search("camera") == {"b"}
+    assert index.search("image") == frozenset()
+    assert "ima" not in index.postings
+
+
+def test_search_index_narrows_cached_results() -> None:
+    index = search_index(a=("/camera/image",), b=("/camera/info",), c=("/tf",))
+    index.search("cam")
+    # A longer query only checks the rows the shorter one matched.
+    assert set(index._candidates("camera/i", "literal")) <= {"a", "b"}
+    assert index.search("camera/i") == {"a", "b"}
+    index.search("cm", "fuzzy")
+    assert set(index._candidates("cmim", "fuzzy")) <= {"a", "b"}
+    assert index.search("cmim", "fuzzy") == {"a"}
+
+
+def test_sorted_index_moves_rows() -> None:
+    index = SortedIndex([((2,), "b"), ((1,), "a")])
+    assert list(index.keys()) == ["a", "b"]
+    assert index.insert("c", (1,))
+    assert list(index.keys()) == ["a", "c", "b"]
+    assert not index.insert("c", (1,))
+    assert index.insert("a", (3,))
+    assert list(index.keys()) == ["c", "b", "a"]
+    assert index.entry("a") == ((3,), "a")
+    assert index.remove("b")
+    assert not index.remove("b")
+    assert list(index.keys()) == ["c", "a"]
+    assert len(index) == 2
+
+
+def test_sort_keys() -> None:
+    values = ["b", "", "a", None, "c"]
+    assert sorted(values, key=sort_value)[:3] == ["a", "b", "c"]
+    descending = sorted(values, key=lambda value: Descending(sort_value(value)))
+    assert descending[2:] == ["c", "b", "a"]
+    assert Descending(1) == Descending(1)
+    assert Descending(2) < Descending(1)
@@ -0,0 +1,110 @@
+"""Tests of the line store and search behind LogView."""
+
+from r2s.widgets.log_view.search import LogSearch, compile_search
+from r2s.widgets.log_view.store import LineStore, index_lines
+
+
+def test_index_lines() -> None:
+    assert list(index_lines(b"")) == []
+    assert list(index_lines(b"a\nbc\n")) == [0, 2]
+    assert list(index_lines(b"a\n\nb")) == [0, 2, 3]
+
+
+def test_line_store_spills_to_mmap(tmp_path) -> None:
+    store = LineStore(memory_limit=16, spill_dir=tmp_path)
+    lines = [f"line {i}" for i in range(20)]
+    store.extend(lines[:10])
+    assert store._segments
+    assert len(store._tail) <= 16
+    # Spill files are unlinked once mapped.
+    assert not list(tmp_path.iterdir())
+    store.extend(lines[10:])
+    assert [store.line(i) for i in range(len(store))] == lines
+    # A read spanning segments and the tail is stitched together.
+    assert store.read(0, store.size).decode().splitlines() == lines
+    assert store.longest == len("line 10")
+    store.close()
+
+
+def test_line_store_maps_files(tmp_path) -> None:
+    path = tmp_path / "log.txt"
+    path.write_bytes("first\nsecond é\r\nlongest line\n".encode())
+    (tmp_path / "empty.txt").write_bytes(b"")
+    store = LineStore()
+    store.append("before")
+    store.add_file(str(path))
+    store.add_file(str(tmp_path / "empty.txt"))
+    store.append("after")
+    assert [store.line(i) for i in range(len(store))] == [
+        "before",
+        "first",
+        "second é",
+        "longest line",
+        "after",
+    ]
+    assert store.longest >= len("longest line")
+    store.close()
+
+
+def log_search(lines, chunk_lines: int = 4) -> LogSearch:
+    store = LineStore()
+    store.extend(lines)
+    return LogSearch(store, chunk_lines)
+
+
+def test_compile_search() -> None:
+    assert compile_search("a.b", "literal").search(b"a.b")
+    assert not compile_search("a.b", "literal").search(b"axb")
+    assert compile_search("a.b", "regex").search(b"axb")
+    assert compile_search("ab", "fuzzy").search(b"A-B")
+    assert compile_search("(", "regex") is None
+
+
+def test_log_search_scans_chunks() -> None:
+    search = log_search(["error one", "ok", "error two", "ok", "ok", "error three"])
+    assert list(search.chunks(len(search.store))) == [0, 1]
+    assert list(search.scan("error", "literal", 0, 4)) == [0, 2]
+    assert list(search.scan("error", "literal", 1, 6)) == [5]
+    # A cached chunk answers for any end within what it scanned.
+    assert list(search.scan("error", "literal", 0, 2)) == [0]
+    assert list(search.scan("e.*t", "regex", 1, 6)) == [5]
+    # Like grep, a regex matching the empty string matches every line.
+    assert list(search.scan("x*", "regex", 0, 4)) == [0, 1, 2, 3]
+    assert list(search.scan("(", "regex", 0, 4)) == []
+
+
+def test_log_search_regex_matches_lines_alone() -> None:
+    search = log_search(["a1", "a2", "b3", "a4", "", "b\r"])
+    # A match running to the end of the chunk does not hide later lines.
+    assert list(search.scan("a[^z]*", "regex", 0, 4)) == [0, 1, 3]
+    # Nor does a match cross a line break.
+    assert list(search.scan("1\\s+a", "regex", 0, 4)) == []
+    assert list(search.scan("^$", "regex", 1, 6)) == [4]
+    assert list(search.scan("^b$", "regex", 1, 6)) == [5]
+    assert list(search.scan("a1", "literal", 0, 4)) == [0]
+    assert list(search.scan("", "literal", 0, 4)) == []
+
+
+def test_log_search_extends_partial_chunk() -> None:
+    search = log_search(["error", "ok"])
+    assert list(search.scan("error", "literal", 0, 2)) == [0]
+    search.store.extend(["error again", "ok"])
+    assert search._cache[("error", "literal")][0][0] == 2
+    assert list(search.scan("error", "literal", 0, 4)) == [0, 2]
+    assert search._cache[("error", "literal")][0][0] == 4
+
+
+def test_log_search_narrows_literal_queries() -> None:
+    search = log_search(["error one", "error two", "ok", "one"])
+    assert list(search.scan("one", "literal", 0, 4)) == [0, 3]
+    scanned = []
+    scan_lines = search._scan_lines
+
+    def record(pattern, lines):
+        scanned.extend(int(line) for line in lines)
+        return scan_lines(pattern, lines)
+
+    search._scan_lines = record
+    assert list(search.scan("error one", "literal", 0, 4)) == [0]
+    # Only the lines matching "one" were rescanned.
+    assert scanned == [0, 3]
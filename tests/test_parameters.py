@@ -0,0 +1,148 @@
+"""Tests of the parameter cache, with fake service clients."""
+
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+from r2s.screens.ros2.parameters import Parameter, ParameterCache
+
+
+def value(integer: int) -> SimpleNamespace:
+    return SimpleNamespace(type=2, integer_value=integer)
+
+
+def event(node: str, new=(), changed=(), deleted=()) -> SimpleNamespace:
+    return SimpleNamespace(
+        node=node,
+        new_parameters=[SimpleNamespace(name=n, value=value(v)) for n, v in new],
+        changed_parameters=[
+            SimpleNamespace(name=n, value=value(v)) for n, v in changed
+        ],
+        deleted_parameters=[SimpleNamespace(name=n) for n in deleted],
+    )
+
+
+def parameter(node: str, name: str, integer: int, **kwargs) -> Parameter:
+    return Parameter(node, name, "integer", str(integer), **kwargs)
+
+
+class Listener:
+    def __init__(self) -> None:
+        self.refreshes = 0
+
+    def refresh(self) -> None:
+        self.refreshes += 1
+
+
+def cache() -> ParameterCache:
+    parameters = ParameterCache(node=None)
+    parameters.listeners.append(Listener())
+    return parameters
+
+
+def test_receive_updates_cached_nodes() -> None:
+    parameters = cache()
+    parameters._store(
+        ["/a"], {"/a": {"x": parameter("/a", "x", 1, description="speed")}}, {}
+    )
+    generation = parameters.generation
+    parameters.receive(event("/a", new=[("y", 2)], changed=[("x", 3)]))
+    assert parameters.parameters("/a") == {
+        "x": parameter("/a", "x", 3, description="speed"),
+        "y": parameter("/a", "y", 2),
+    }
+    parameters.receive(event("/a", deleted=["y"]))
+    assert parameters.parameters("/a").keys() == {"x"}
+    assert parameters.generation == generation + 2
+    # Nodes that were never fetched are left alone.
+    parameters.receive(event("/b", new=[("z", 1)]))
+    assert parameters.parameters("/b") is None
+    assert parameters.generation == generation + 2
+
+
+def test_events_during_a_fetch_are_applied_after_it() -> None:
+    parameters = cache()
+    parameters._pending.add("/a")
+    assert parameters.status("/a") == "fetching"
+    parameters.receive(event("/a", changed=[("x", 5)]))
+    parameters.receive(event("/a", new=[("y", 1)]))
+    # The fetch read x before it changed.
+    parameters._store(["/a"], {"/a": {"x": parameter("/a", "x", 4)}}, {})
+    assert parameters.parameters("/a") == {
+        "x": parameter("/a", "x", 5),
+        "y": parameter("/a", "y", 1),
+    }
+    assert parameters.status("/a") is None
+    assert parameters._held == {}
+
+    # A failed fetch drops the events held for it.
+    parameters._pending.add("/b")
+    parameters.receive(event("/b", new=[("y", 1)]))
+    parameters._store(["/b"], {}, {"/b": "no parameter services"})
+    assert parameters.parameters("/b") is None
+    assert parameters.status("/b") == "no parameter services"
+    assert parameters._held == {}
+
+
+def test_invalidate_and_retain() -> None:
+    parameters = cache()
+    parameters._store(
+        ["/a", "/b", "/c"],
+        {"/a": {}, "/b": {"x": parameter("/b", "x", 1)}},
+        {"/c": "timed out"},
+    )
+    generation = parameters.generation
+    parameters.invalidate(["/b", "/c"])
+    assert parameters.parameters("/b") is None
+    assert parameters.status("/c") is None
+    assert parameters.parameters("/a") == {}
+    assert parameters.generation == generation + 1
+
+    parameters._store(["/b"], {"/b": {}}, {})
+    parameters._pending.add("/gone")
+    parameters.receive(event("/gone", new=[("x", 1)]))
+    generation = parameters.generation
+    parameters.retain(["/b"])
+    assert parameters.parameters("/a") is None
+    assert parameters.parameters("/b") == {}
+    assert "/gone" not in parameters._held
+    assert parameters.generation == generation + 1
+    parameters.retain(["/b"])
+    assert parameters.generation == generation + 1
+
+
+class Client:
+    """Answers requests with `answer`, or never if it is None."""
+
+    def __init__(self, answer=None) -> None:
+        self.answer = answer
+        self.abandoned = []
+
+    def call_async(self, request) -> Future:
+        future = Future()
+        if isinstance(self.answer, Exception):
+            future.set_exception(self.answer)
+        elif self.answer is not None:
+            future.set_result(self.answer)
+        return future
+
+    def remove_pending_request(self, future: Future) -> None:
+        self.abandoned.append(future)
+
+
+def test_call_all_times_out() -> None:
+    parameters = cache()
+    parameters.timeout = 0.05
+    silent = Client()
+    failure = RuntimeError("service failed")
+    answers = parameters._call_all(
+        {
+            "answered": (Client("response"), "request"),
+            "failed": (Client(failure), "request"),
+            "silent": (silent, "request"),
+        }
+    )
+    assert answers["answered"] == "response"
+    assert answers["failed"] is failure
+    assert isinstance(answers["silent"], TimeoutError)
+    assert len(silent.abandoned) == 1
+    assert parameters._call_all({}) == {}
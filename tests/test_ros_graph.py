@@ -0,0 +1,176 @@
+"""Tests of the indexes built from a snapshot of the ROS graph."""
+
+from dataclasses import replace
+
+from r2s.diff import SnapshotDiff
+
+from r2s.screens.ros2.graph import (
+    GraphCache,
+    GraphIndex,
+    GraphSnapshot,
+    NodeInfo,
+    TopicInfo,
+    fully_qualified_name,
+    is_hidden_name,
+)
+from r2s.screens.ros2.interfaces import InterfaceIndex, snapshot_interfaces
+from tests.simulated_graph import FakeNodeWrapper, SimulatedGraph
+
+GET_STATE = ("lifecycle_msgs/srv/GetState",)
+SEND_GOAL = ("example/action/Fibonacci_SendGoal",)
+
+
+def node(full_name: str, servers=(), clients=()) -> NodeInfo:
+    namespace, _, name = full_name.rpartition("/")
+    return NodeInfo(
+        name=name,
+        namespace=namespace or "/",
+        full_name=full_name,
+        servers={service: ("example/srv/Type",) for service in servers},
+        clients={service: ("example/srv/Type",) for service in clients},
+    )
+
+
+def topic(name: str, publishers=(), subscribers=()) -> TopicInfo:
+    return TopicInfo(
+        name, ("std_msgs/msg/String",), frozenset(publishers), frozenset(subscribers)
+    )
+
+
+def snapshot() -> GraphSnapshot:
+    talker = node(
+        "/demo/talker",
+        servers=(
+            "/demo/talker/describe",
+            "/demo/talker/_private",
+            "/fib/_action/send_goal",
+        ),
+    )
+    talker.servers["/demo/talker/get_state"] = GET_STATE
+    listener = node(
+        "/listener", clients=("/demo/talker/describe", "/fib/_action/send_goal")
+    )
+    return GraphSnapshot(
+        generation=3,
+        nodes={n.full_name: n for n in (talker, listener)},
+        topics={
+            "/chatter": topic("/chatter", ["/demo/talker"], ["/listener", "/late"]),
+            "/_hidden": topic("/_hidden", ["/demo/talker"], ["/listener"]),
+            "/rosout": topic("/rosout", ["/demo/talker", "/listener"]),
+        },
+        services={
+            "/demo/talker/describe": ("example/srv/Type",),
+            "/demo/talker/get_state": GET_STATE,
+        },
+        actions={"/fib": SEND_GOAL},
+    )
+
+
+def test_names() -> None:
+    assert fully_qualified_name("/", "talker") == "/talker"
+    assert fully_qualified_name("/demo", "talker") == "/demo/talker"
+    assert fully_qualified_name("/demo/", "talker") == "/demo/talker"
+    assert is_hidden_name("/a/_b/c")
+    assert not is_hidden_name("/a/b_c")
+
+
+def test_graph_index_counts() -> None:
+    index = GraphIndex(snapshot())
+    assert index.generation == 3
+    talker = index.node_counts("/demo/talker")
+    # Hidden topics and services are not counted.
+    assert (talker.publishers, talker.subscribers) == (2, 0)
+    assert (talker.service_servers, talker.service_clients) == (2, 0)
+    listener = index.node_counts("/listener")
+    assert (listener.publishers, listener.subscribers) == (1, 1)
+    assert listener.service_clients == 1
+    # A node seen only as an endpoint still gets counts.
+    assert index.node_counts("/late").subscribers == 1
+    assert index.node_counts("/missing").subscribers == 0
+    assert index.lifecycle_nodes == {"/demo/talker"}
+
+
+def test_graph_index_endpoints() -> None:
+    index = GraphIndex(snapshot())
+    assert index.service_endpoints("/demo/talker/describe") == (
+        {"/demo/talker"},
+        {"/listener"},
+    )
+    assert index.service_endpoints("/missing") == (frozenset(), frozenset())
+    assert index.action_endpoints("/fib") == ({"/demo/talker"}, {"/listener"})
+
+
+def test_snapshot_interfaces() -> None:
+    graph = snapshot()
+    interfaces = snapshot_interfaces(graph, GraphIndex(graph))
+    assert interfaces["/chatter"].nodes == {"/demo/talker", "/listener", "/late"}
+    assert interfaces["/chatter"].providers == {"/demo/talker"}
+    assert interfaces["/_hidden"].hidden
+    assert interfaces["/demo/talker/describe"].type == "service"
+    assert interfaces["/demo/talker/describe"].consumers == {"/listener"}
+    assert interfaces["/fib"].type == "action"
+    assert interfaces["/fib"].interface == SEND_GOAL[0]
+
+
+def test_interface_index_follows_changes() -> None:
+    graph = snapshot()
+    diff = SnapshotDiff()
+    index = InterfaceIndex()
+    index.apply(diff.update(snapshot_interfaces(graph, GraphIndex(graph))))
+    assert index.interfaces_of("late") == {"/chatter"}
+    assert index.has("demo/talker", "/fib")
+    assert index.interfaces_of("/listener") == {
+        "/chatter",
+        "/_hidden",
+        "/rosout",
+        "/demo/talker/describe",
+        "/fib",
+    }
+
+    # The late subscriber leaves and the listener stops logging.
+    topics = dict(graph.topics)
+    topics["/chatter"] = topic("/chatter", ["/demo/talker"], ["/listener"])
+    topics["/rosout"] = topic("/rosout", ["/demo/talker"])
+    del topics["/_hidden"]
+    graph = replace(graph, generation=4, topics=topics)
+    index.apply(diff.update(snapshot_interfaces(graph, GraphIndex(graph))))
+    assert "/late" not in index.by_node
+    assert not index.has("/listener", "/rosout")
+    assert "/_hidden" not in index.by_interface
+    assert index.interfaces_of("/demo/talker") == {
+        "/chatter",
+        "/rosout",
+        "/demo/talker/describe",
+        "/demo/talker/get_state",
+        "/fib",
+    }
+
+
+def test_graph_cache_follows_churn() -> None:
+    graph = SimulatedGraph(nodes=20, topics=40, actions=2)
+    cache = GraphCache(FakeNodeWrapper(graph))
+    assert cache.poll()
+    assert not cache.poll()
+    graph.churn(0.2)
+    assert cache.poll()
+    topics = cache.snapshot().topics
+    for name in graph.topics:
+        assert topics[name].publishers == graph.publishers[name]
+        assert topics[name].subscribers == graph.subscribers[name]
+    assert cache.snapshot().nodes.keys() == graph.nodes.keys()
+
+
+def test_graph_cache_sees_swaps_on_full_refresh() -> None:
+    graph = SimulatedGraph(nodes=20, topics=40)
+    cache = GraphCache(FakeNodeWrapper(graph))
+    cache.poll()
+    topic = next(name for name, nodes in graph.publishers.items() if nodes)
+    old, new = graph.swap_publisher(topic)
+    # The counts are unchanged, so the swap is not seen right away...
+    assert not cache.poll()
+    assert old in cache.snapshot().topics[topic].publishers
+    # ...but it is once every topic is fetched again.
+    cache._refreshed_at = 0.0
+    assert cache.poll()
+    assert cache.snapshot().topics[topic].publishers == graph.publishers[topic]
+    assert new in cache.index().counts
@@ -0,0 +1,167 @@
+"""Tests of drawing the topic graph, incrementally and from scratch."""
+
+import pytest
+
+from r2s.screens.ros2.graph import GraphCache, GraphSnapshot, TopicInfo
+from r2s.screens.ros2.topic_graph import (
+    NODE,
+    TOPIC,
+    TopicGraph,
+    TopicGraphChanged,
+    TopicGraphWatcher,
+    collapse,
+    layout,
+)
+from tests.simulated_graph import FakeNodeWrapper, SimulatedGraph
+
+
+def snapshot(generation: int, *topics) -> GraphSnapshot:
+    infos = {
+        name: TopicInfo(name, ("t",), frozenset(pubs), frozenset(subs))
+        for name, pubs, subs in topics
+    }
+    nodes = {node for info in infos.values() for node in info.publishers}
+    nodes.update(node for info in infos.values() for node in info.subscribers)
+    return GraphSnapshot(generation, nodes=dict.fromkeys(nodes), topics=infos)
+
+
+def test_collapse() -> None:
+    assert collapse("/a/b/c", 0) == "/a/b/c"
+    assert collapse("/a/b/c", 1) == "/a/*"
+    assert collapse("/a/b", 2) == "/a/b"
+
+
+def test_topic_graph_update_reports_touched_vertices() -> None:
+    graph = TopicGraph()
+    touched = graph.update(snapshot(1, ("/t", ["/a"], ["/b"]), ("/u", ["/b"], [])))
+    assert touched == {(TOPIC, "/t"), (TOPIC, "/u"), (NODE, "/a"), (NODE, "/b")}
+    assert graph.out[(NODE, "/a")] == {(TOPIC, "/t")}
+    assert graph.update(snapshot(1)) == set()
+
+    touched = graph.update(snapshot(2, ("/t", ["/a"], ["/c"]), ("/u", ["/b"], [])))
+    assert touched == {(TOPIC, "/t"), (NODE, "/b"), (NODE, "/c")}
+    assert graph.edges((TOPIC, "/t")) == {
+        ((NODE, "/a"), (TOPIC, "/t")),
+        ((TOPIC, "/t"), (NODE, "/c")),
+    }
+    touched = graph.update(snapshot(3, ("/t", ["/a"], ["/c"])))
+    assert touched == {(TOPIC, "/u"), (NODE, "/b")}
+    assert not graph.has((TOPIC, "/u"))
+    assert not graph.has((NODE, "/b"))
+
+
+def test_topic_graph_within() -> None:
+    graph = TopicGraph()
+    graph.update(
+        snapshot(
+            1, ("/t", ["/a"], ["/b"]), ("/u", ["/b"], ["/c"]), ("/hub", ["/a"], ["/c"])
+        )
+    )
+    assert graph.within((NODE, "/a"), 1) == {
+        (NODE, "/a"),
+        (TOPIC, "/t"),
+        (TOPIC, "/hub"),
+    }
+    assert (NODE, "/c") in graph.within((NODE, "/a"), 2)
+    no_hub = graph.within((NODE, "/a"), 2, skip=lambda v: v == (TOPIC, "/hub"))
+    assert no_hub == {(NODE, "/a"), (TOPIC, "/t"), (NODE, "/b")}
+    assert graph.find("hub") == (TOPIC, "/hub")
+    assert graph.find("/missing") is None
+
+
+def test_layout_draws_both_directions() -> None:
+    a, b, t = (NODE, "/a"), (NODE, "/b"), (TOPIC, "/t")
+    # /a publishes and subscribes to /t, and /b subscribes to it.
+    block = layout(frozenset({a, b, t}), frozenset({(a, t), (t, a), (t, b)}))
+    assert block.lines[0].startswith("(/a)")
+    arrows = "".join(block.lines)
+    assert arrows.count("▶") == 2
+    assert arrows.count("◀") == 1
+    row = next(line for line in block.lines if "◀" in line)
+    # The ◀ sits next to the ▶, right of the lanes, not on them.
+    assert "◀▶" in row
+    assert {kind for _, _, _, kind in block.labels} == {NODE, TOPIC}
+
+
+class Sink:
+    def __init__(self) -> None:
+        self.messages = []
+
+    def post_message(self, message) -> bool:
+        self.messages.append(message)
+        return True
+
+
+def draw(watcher: TopicGraphWatcher) -> TopicGraphChanged:
+    watcher.target = Sink()
+    watcher.poll()
+    (message,) = watcher.target.messages
+    return message
+
+
+def fresh(cache: GraphCache, **settings) -> TopicGraphChanged:
+    watcher = TopicGraphWatcher(cache)
+    watcher.hub_degree = 6
+    watcher.configure(**settings)
+    return draw(watcher)
+
+
+def same(incremental: TopicGraphChanged, rebuilt: TopicGraphChanged) -> None:
+    assert incremental.drawing == rebuilt.drawing
+    # Titles differ only in how many components had to be laid out.
+    assert incremental.title.split(" (")[0] == rebuilt.title.split(" (")[0]
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {},
+        {"show_hubs": True},
+        {"collapse_depth": 2},
+        {"show_hidden": True},
+        {"center": "topic_1", "hops": 3},
+    ],
+)
+def test_incremental_drawing_matches_rebuild(settings) -> None:
+    graph = SimulatedGraph(nodes=30, topics=90, endpoints=2, seed=3)
+    cache = GraphCache(FakeNodeWrapper(graph))
+    cache.poll()
+    watcher = TopicGraphWatcher(cache)
+    watcher.hub_degree = 6
+    watcher.configure(**settings)
+    same(draw(watcher), fresh(cache, **settings))
+
+    for step in range(6):
+        graph.churn(0.1)
+        topic = next(name for name, nodes in graph.publishers.items() if nodes)
+        graph.swap_publisher(topic)
+        if step % 2:
+            # Make a hub out of a quiet topic, and a hidden node.
+            hub = f"/sim/topic_{step}"
+            for node in list(graph.nodes.values())[:8]:
+                node.subscribes.add(hub)
+                graph.subscribers[hub].add(node.full_name)
+            graph.add_node("_hidden")
+        cache._refreshed_at = 0.0
+        assert cache.poll()
+        same(draw(watcher), fresh(cache, **settings))
+
+
+def test_incremental_drawing_lays_out_only_changes() -> None:
+    graph = SimulatedGraph(nodes=200, topics=800, endpoints=1, seed=1)
+    cache = GraphCache(FakeNodeWrapper(graph))
+    cache.poll()
+    watcher = TopicGraphWatcher(cache)
+    draw(watcher)
+    components = len(watcher.members)
+    graph.churn(0.01)
+    cache.poll()
+    draw(watcher)
+    laid_out = int(watcher.target.messages[0].title.split("(")[1].split()[0])
+    assert 0 < laid_out < components // 4
+
+    # Settings put back reuse the layouts kept from before.
+    watcher.configure(collapse_depth=1)
+    draw(watcher)
+    watcher.configure(collapse_depth=0)
+    assert "(0 laid out)" in draw(watcher).title
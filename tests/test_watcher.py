@@ -0,0 +1,89 @@
+"""Tests of the scheduler that polls watchers."""
+
+import threading
+import time
+
+from r2s.screens.ros2.graph import GraphCache
+from r2s.watcher import Scheduler, WatcherBase
+from tests.simulated_graph import FakeNodeWrapper, SimulatedGraph
+
+
+class Counter(WatcherBase):
+    interval = 0.001
+    max_interval = 0.001
+
+    def __init__(self, scheduler: Scheduler, block: threading.Event | None = None):
+        self.polls = 0
+        self.active = 0
+        self.overlapped = False
+        self.block = block
+        super().__init__(scheduler)
+
+    def poll(self) -> bool:
+        self.active += 1
+        self.overlapped |= self.active > 1
+        if self.block is not None:
+            self.block.wait()
+        self.polls += 1
+        self.active -= 1
+        return True
+
+
+def wait_until(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_slow_poll_does_not_hold_up_others() -> None:
+    scheduler = Scheduler()
+    release = threading.Event()
+    slow = Counter(scheduler, release)
+    fast = Counter(scheduler)
+    try:
+        slow.start()
+        fast.start()
+        wait_until(lambda: slow.active == 1 and fast.polls >= 10)
+        assert slow.polls == 0
+        release.set()
+        wait_until(lambda: slow.polls >= 3)
+        assert not slow.overlapped
+    finally:
+        release.set()
+        scheduler.close()
+
+
+def test_paused_watchers_are_not_polled() -> None:
+    scheduler = Scheduler()
+    watcher = Counter(scheduler)
+    try:
+        watcher.pause()
+        watcher.start()
+        time.sleep(0.02)
+        assert watcher.polls == 0
+        watcher.resume()
+        wait_until(lambda: watcher.polls > 0)
+    finally:
+        scheduler.close()
+
+
+def test_graph_cache_pauses_with_its_listeners() -> None:
+    scheduler = Scheduler()
+    cache = GraphCache(FakeNodeWrapper(SimulatedGraph(nodes=5, topics=10)))
+    listeners = [Counter(scheduler), Counter(scheduler)]
+    try:
+        # Nothing shows the graph yet.
+        assert cache.paused
+        assert not cache.due(time.monotonic())
+        cache.listeners.extend(listeners)
+        assert not cache.paused
+        listeners[0].pause()
+        assert not cache.paused
+        listeners[1].pause()
+        assert cache.paused
+        assert cache.next_poll() is None
+        listeners[1].resume()
+        assert cache.due(time.monotonic())
+    finally:
+        scheduler.close()